@@ -0,0 +1,37 @@
+"""Przepustowość (dni na sekundę) modeli SIR/SEIR liczonych dzień po dniu i połączonym jądrem wielu dni."""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import SIMULATION_CONFIG
+from simulation.disease_simulation import DiseaseSimulation
+from simulation.fused import numba_available
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark połączonego jądra wielu dni")
+    parser.add_argument("--algorithm", choices=["SIR", "SEIR"], default="SIR")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    modes = [None, "numpy"] + (["numba"] if numba_available() else [])
+    if not numba_available():
+        print("Pakiet numba nie jest zainstalowany - pomijam jądro skompilowane")
+    for size in args.sizes:
+        rates = {}
+        for mode in modes:
+            config = dict(SIMULATION_CONFIG, algorithm=args.algorithm, population_size=size,
+                          initial_infected=max(1, size // 100), simulation_days=args.days, seed=0, fused_kernel=mode)
+            simulation = DiseaseSimulation(config)
+            if mode == "numba":
+                #Kompilacja jądra (lub wczytanie z pamięci podręcznej) poza pomiarem
+                DiseaseSimulation(dict(config, population_size=10, initial_infected=1)).advance(1)
+            start = time.perf_counter()
+            simulation.run_simulation(verbose=False)
+            rates[mode] = args.days / (time.perf_counter() - start)
+        summary = ", ".join(f"{mode or 'dzień po dniu'}: {rate:.1f} dni/s (x{rate / rates[None]:.1f})"
+                            for mode, rate in rates.items())
+        print(f"Populacja {size:>8}: {summary}")
@@ -0,0 +1,55 @@
+"""Porównanie ruchu pojedynczych osób (Person.move) z wektorowym PopulationArrays.move."""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from models.population_arrays import PopulationArrays, INFECTED
+
+def make_population(size, seed=None):
+    population = PopulationArrays.random(size, rng=np.random.default_rng(seed))
+    population.status[:size // 10] = INFECTED
+    return population
+
+def displacement(population, step):
+    x0, y0 = population.x.copy(), population.y.copy()
+    step(population)
+    return np.hypot(population.x - x0, population.y - y0)
+
+def per_object_step(population):
+    for person in population:
+        person.move()
+
+def batch_step(population):
+    population.move()
+
+def time_step(step, size, repeats):
+    population = make_population(size)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        step(population)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark kroku ruchu")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    
+    #Porównanie statystyczne przemieszczeń z tego samego stanu początkowego
+    loop_moves = displacement(make_population(args.size, seed=0), per_object_step)
+    batch_moves = displacement(make_population(args.size, seed=0), batch_step)
+    print(f"Średnie przemieszczenie: pętla {loop_moves.mean():.4f}, wektorowo {batch_moves.mean():.4f}")
+    print(f"Odchylenie przemieszczenia: pętla {loop_moves.std():.4f}, wektorowo {batch_moves.std():.4f}")
+    
+    loop_time = time_step(per_object_step, args.size, 1)
+    batch_time = time_step(batch_step, args.size, args.repeats)
+    
+    print(f"Populacja {args.size}: pętla {loop_time:.3f} s, wektorowo {batch_time:.4f} s, "
+          f"przyspieszenie {loop_time / batch_time:.0f}x")
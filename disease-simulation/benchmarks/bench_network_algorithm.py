@@ -0,0 +1,77 @@
+"""Pomiar dnia algorytmu sieciowego (CSR) oraz porównanie z pętlą po chorych o semantyce pierwotnej wersji."""
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import SIMULATION_CONFIG
+from models.population_arrays import SUSCEPTIBLE, INFECTED
+from simulation.disease_simulation import DiseaseSimulation
+from simulation.rates import contact_reduction
+
+def make_simulation(population_size, infected_fraction, distancing):
+    config = SIMULATION_CONFIG.copy()
+    config["algorithm"] = "network"
+    config["population_size"] = population_size
+    config["initial_infected"] = max(1, int(population_size * infected_fraction))
+    config["social_distancing"] = distancing
+    return DiseaseSimulation(config)
+
+def loop_new_infections(simulation):
+    """Liczba nowych zakażeń wg pętli po chorych (losowanie kontaktów i odległości osobno)."""
+    pop = simulation.population
+    reduction = contact_reduction(simulation.config)
+    newly_infected = set()
+    for i in pop.members(INFECTED):
+        connections = pop.network.neighbors(i)
+        daily_contacts = int(len(connections) * reduction)
+        if daily_contacts > 0:
+            for contact in np.random.choice(connections, daily_contacts, replace=False):
+                if pop.status[contact] == SUSCEPTIBLE:
+                    distance = ((pop.x[i] - pop.x[contact])**2 + (pop.y[i] - pop.y[contact])**2)**0.5
+                    if np.random.random() < simulation.config["infection_rate"] * (10 / (distance + 1))**2:
+                        newly_infected.add(contact)
+    return len(newly_infected)
+
+def vectorized_new_infections(simulation):
+    """Liczba nowych zakażeń wg network_algorithm (na kopii symulacji)."""
+    trial = copy.deepcopy(simulation)
+    trial.random.transmission = np.random.default_rng()
+    before = trial.population.status.copy()
+    trial.network_algorithm()
+    return int(np.count_nonzero((before == SUSCEPTIBLE) & (trial.population.status == INFECTED)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark algorytmu sieciowego")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--infected-fraction", type=float, default=0.05)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--check-size", type=int, default=20000)
+    parser.add_argument("--check-trials", type=int, default=30)
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    simulation = make_simulation(args.size, args.infected_fraction, distancing=True)
+    network = simulation.population.network
+    print(f"Sieć: {args.size} osób, średni stopień {network.degree().mean():.2f}, "
+          f"budowa {time.perf_counter() - start:.2f} s")
+    
+    timings = []
+    for _ in range(args.days):
+        start = time.perf_counter()
+        simulation.network_algorithm()
+        timings.append(time.perf_counter() - start)
+        simulation.record_stats()
+    print(f"Dzień algorytmu sieciowego: min {min(timings):.3f} s, średnio {np.mean(timings):.3f} s")
+    
+    #Porównanie średniej liczby nowych zakażeń z tego samego stanu
+    check = make_simulation(args.check_size, args.infected_fraction, distancing=True)
+    loop = [loop_new_infections(check) for _ in range(args.check_trials)]
+    vectorized = [vectorized_new_infections(check) for _ in range(args.check_trials)]
+    print(f"Nowe zakażenia ({args.check_size} osób): pętla {np.mean(loop):.1f} ± {np.std(loop):.1f}, "
+          f"wektorowo {np.mean(vectorized):.1f} ± {np.std(vectorized):.1f}")
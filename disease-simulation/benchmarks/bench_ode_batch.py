@@ -0,0 +1,39 @@
+"""Czas całkowania partii trajektorii modelu ODE i zgodność z pojedynczymi przebiegami."""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import SIMULATION_CONFIG
+from simulation.ode import integrate_batch
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark partii modelu ODE")
+    parser.add_argument("--algorithm", choices=["SIR-ode", "SEIR-ode"], default="SIR-ode")
+    parser.add_argument("--batch", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--step", type=float, default=None, help="Krok RK4 (dni), domyślnie ode_step z konfiguracji")
+    args = parser.parse_args()
+    
+    config = dict(SIMULATION_CONFIG, algorithm=args.algorithm, population_size=100000, initial_infected=1000,
+                  simulation_days=args.days)
+    rng = np.random.default_rng(0)
+    for size in args.batch:
+        parameters = {
+            "infection_rate": rng.uniform(0.01, 0.05, size),
+            "recovery_rate": rng.uniform(0.02, 0.1, size),
+            "contacts_per_day": rng.uniform(5, 15, size),
+        }
+        start = time.perf_counter()
+        trajectories = integrate_batch(config, parameters, step=args.step)
+        elapsed = time.perf_counter() - start
+        
+        #Trajektoria z partii musi odpowiadać osobnemu przebiegowi z tymi samymi parametrami
+        single = integrate_batch(dict(config, **{name: values[0] for name, values in parameters.items()}), step=args.step)
+        error = np.abs(single[0] - trajectories[0]).max()
+        print(f"Partia {size:>6}: {elapsed:.3f} s ({elapsed / size * 1e6:.1f} us na trajektorię), "
+              f"różnica względem pojedynczego przebiegu: {error:.2e}")
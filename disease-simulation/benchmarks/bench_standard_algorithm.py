@@ -0,0 +1,37 @@
+"""Pomiar czasu jednego dnia algorytmu standardowego w zależności od wielkości populacji."""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import SIMULATION_CONFIG
+from simulation.disease_simulation import DiseaseSimulation
+
+def time_day(population_size, infected_fraction, days):
+    config = SIMULATION_CONFIG.copy()
+    config["algorithm"] = "standard"
+    config["population_size"] = population_size
+    config["initial_infected"] = max(1, int(population_size * infected_fraction))
+    simulation = DiseaseSimulation(config)
+    
+    timings = []
+    for _ in range(days):
+        start = time.perf_counter()
+        simulation.simulate_day()
+        timings.append(time.perf_counter() - start)
+        simulation.record_stats()
+    return min(timings), sum(timings) / len(timings)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark algorytmu standardowego")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 50000])
+    parser.add_argument("--infected-fraction", type=float, default=0.01)
+    parser.add_argument("--days", type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"{'populacja':>10} {'min [s]':>10} {'średnio [s]':>12}")
+    for size in args.sizes:
+        best, mean = time_day(size, args.infected_fraction, args.days)
+        print(f"{size:>10} {best:>10.4f} {mean:>12.4f}")
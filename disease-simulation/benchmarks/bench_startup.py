@@ -0,0 +1,53 @@
+"""Czas startu procesu main.py bez ekranu (ważny przy tysiącach krótkich uruchomień w zadaniach wsadowych).
+
+Przykład:
+    python benchmarks/bench_startup.py --repeat 10 --population 1000 --days 1
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+#Uruchomienie main.py, po którym na stderr wypisywane jest, czy wczytano matplotlib
+CHECK_MATPLOTLIB = (
+    "import runpy, sys; sys.argv = ['main.py'] + sys.argv[1:]; runpy.run_path('main.py', run_name='__main__'); "
+    "print('matplotlib' in sys.modules, file=sys.stderr)"
+)
+
+def measure(command, repeat):
+    """Czasy [s] kolejnych uruchomień polecenia w katalogu projektu."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark czasu startu main.py")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--population", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--algorithm", default="SIR")
+    args = parser.parse_args()
+
+    run = ["--headless", "--quiet", "--population", str(args.population), "--days", str(args.days),
+           "--algorithm", args.algorithm, "--seed", "0"]
+    cases = {
+        "interpreter": [sys.executable, "-c", "pass"],
+        "import main": [sys.executable, "-c", "import main"],
+        "main.py --headless --quiet": [sys.executable, "main.py"] + run,
+    }
+    print(f"{'przypadek':<28} {'min [ms]':>10} {'mediana [ms]':>13}")
+    for name, command in cases.items():
+        timings = measure(command, args.repeat)
+        print(f"{name:<28} {min(timings) * 1000:>10.1f} {np.median(timings) * 1000:>13.1f}")
+
+    check = subprocess.run([sys.executable, "-c", CHECK_MATPLOTLIB] + run, cwd=ROOT, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    print(f"matplotlib wczytany w trybie bez ekranu: {'tak' if check.stderr.strip().endswith('True') else 'nie'}")
@@ -0,0 +1,220 @@
+"""Zestaw benchmarków głównych etapów symulacji z raportem JSON i porównaniem z wynikiem bazowym.
+
+Przykład:
+    python benchmarks/suite.py --output wyniki.json
+    python benchmarks/suite.py --baseline wyniki.json --threshold 0.2
+"""
+import argparse
+import collections
+import copy
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import SIMULATION_CONFIG
+from simulation.disease_simulation import DiseaseSimulation
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+#Mierzona funkcja z zasobami zwalnianymi po pomiarach (np. procesy i pamięć współdzielona kafelków)
+#i przygotowaniem stanu przed każdym wywołaniem (reset, poza mierzonym czasem)
+Measured = collections.namedtuple("Measured", ["function", "close", "reset"], defaults=[None, None])
+
+def make_simulation(size, algorithm="SIR", initialize=True, **overrides):
+    config = dict(SIMULATION_CONFIG, population_size=size, algorithm=algorithm,
+                  initial_infected=max(1, size // 100), seed=0, **overrides)
+    return DiseaseSimulation(config, initialize=initialize)
+
+#Każdy przypadek przygotowuje symulację i zwraca mierzoną funkcję (bez przygotowania w pomiarze)
+def case_initialize_population(size):
+    simulation = make_simulation(size, initialize=False)
+    return simulation.initialize_population
+
+def case_create_social_network(size):
+    simulation = make_simulation(size, algorithm="network")
+    return simulation._create_social_network
+
+def case_move(size):
+    simulation = make_simulation(size)
+    return lambda: simulation.population.move(rng=simulation.random.movement)
+
+def case_person_move(size):
+    #Ruch osoba po osobie przez widoki Person - każde wywołanie deleguje do PopulationArrays.move
+    simulation = make_simulation(size)
+    people = list(simulation.population)
+    rng = simulation.random.movement
+    def move():
+        for person in people:
+            person.move(rng=rng)
+    return move
+
+def make_algorithm_case(algorithm, **overrides):
+    """Dzień algorytmu liczony zawsze od tego samego stanu początkowego (ziarno 0).
+
+    Kolejne wywołania na jednej symulacji mierzyłyby coraz późniejsze etapy epidemii, więc przed
+    każdym wywołaniem symulacja jest odtwarzana z kopii stanu - a z kafelkami (procesy i pamięć
+    współdzielona) tworzona od nowa.
+    """
+    def prepare(size):
+        simulation = make_simulation(size, algorithm=algorithm, **overrides)
+        if simulation.spatial_index is not None:
+            simulation.spatial_index.rebuild(simulation.population.x, simulation.population.y)
+        return simulation
+
+    def case(size):
+        template = prepare(size)
+        current = [template]
+        def reset():
+            if current[0].tiles is not None:
+                current[0].tiles.release()
+                current[0] = prepare(size)
+            else:
+                current[0] = copy.deepcopy(template)
+        def close():
+            if current[0].tiles is not None:
+                current[0].tiles.release()
+        return Measured(lambda: current[0].simulation_algorithm(), close, reset)
+    return case
+
+def case_apply_vaccinations(size):
+    #Zerowa skuteczność - losowanie i próba szczepienia bez zmiany stanu, więc każde wywołanie kosztuje tyle samo
+    simulation = make_simulation(size, vaccination_rate=0.5, vaccination_effectiveness=0.0)
+    return simulation._apply_vaccinations
+
+def case_vaccination_campaign(size):
+    simulation = make_simulation(size, vaccination_campaign={"daily_doses": max(1, size // 100)})
+    campaign = simulation.campaign
+    def apply():
+        #Zerowa skuteczność i zawinięcie kolejki priorytetów - każde wywołanie podaje tyle samo dawek
+        campaign.position %= len(campaign.order)
+        campaign.apply(simulation.population, 0, 0.0, simulation.random.vaccination)
+    return apply
+
+def case_record_stats(size):
+    simulation = make_simulation(size)
+    return simulation.record_stats
+
+#Nazwa przypadku -> (funkcja przygotowująca, największa domyślna populacja lub None)
+CASES = {
+    "initialize_population": (case_initialize_population, None),
+    "create_social_network": (case_create_social_network, None),
+    "move": (case_move, None),
+    #Pętla po widokach Person ma stały narzut Pythona na osobę - powyżej 10 tys. osób trwa zbyt długo
+    "person_move": (case_person_move, 10000),
+    #Algorytm standardowy przetwarza chorych po kolei, a w gęstej populacji zarażenia w ciągu dnia
+    #narastają lawinowo - powyżej 100 tys. osób pojedynczy pomiar trwałby zbyt długo
+    "standard_algorithm": (make_algorithm_case("standard"), 100000),
+    #Dzień algorytmu standardowego (z ruchem osób) w czterech kafelkach liczonych w osobnych procesach
+    "tiled_standard_algorithm": (make_algorithm_case("standard", tiles=4), 100000),
+    #Model budżetu kontaktów - wszyscy chorzy losują partnerów z siatki naraz (wektorowo)
+    "standard_budget_algorithm": (make_algorithm_case("standard", contact_model="budget", contact_dispersion=0.3), None),
+    "sir_algorithm": (make_algorithm_case("SIR"), None),
+    "seir_algorithm": (make_algorithm_case("SEIR"), None),
+    "network_algorithm": (make_algorithm_case("network"), None),
+    #Metoda bezpośrednia wykonuje każde zdarzenie osobno - czas dnia rośnie z liczbą chorych
+    "sir_gillespie_algorithm": (make_algorithm_case("SIR-gillespie"), 100000),
+    "sir_tau_leap_algorithm": (make_algorithm_case("SIR-gillespie", tau_leap=0.1), None),
+    "sir_ode_algorithm": (make_algorithm_case("SIR-ode"), None),
+    "apply_vaccinations": (case_apply_vaccinations, None),
+    "vaccination_campaign": (case_vaccination_campaign, None),
+    "record_stats": (case_record_stats, None),
+}
+
+#Minimalny czas jednego pomiaru - krótkie operacje są wywoływane wielokrotnie, by ograniczyć szum
+MIN_MEASUREMENT_TIME = 0.05
+
+def time_case(setup, size, repeat):
+    """Czas jednego wywołania: min, mediana i średnia z repeat pomiarów (po number wywołań każdy)."""
+    case = setup(size)
+    function, close, reset = case if isinstance(case, Measured) else (case, None, None)
+    def measure():
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+
+    try:
+        number = max(1, int(MIN_MEASUREMENT_TIME / max(measure(), 1e-9)))
+        timings = [sum(measure() for _ in range(number)) / number for _ in range(repeat)]
+    finally:
+        if close is not None:
+            close()
+    return {"min": min(timings), "median": float(np.median(timings)), "mean": float(np.mean(timings)), "number": number}
+
+def environment():
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def run_suite(cases, sizes, repeat, all_sizes=False, progress=None):
+    results = []
+    for name in cases:
+        setup, max_size = CASES[name]
+        for size in sizes:
+            if max_size is not None and size > max_size and not all_sizes:
+                continue
+            timing = time_case(setup, size, repeat)
+            result = {"case": name, "size": size, "repeat": repeat, **timing}
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return {"environment": environment(), "results": results}
+
+def compare(report, baseline, threshold):
+    """Porównuje mediany z raportem bazowym; zwraca wiersze (przypadek, rozmiar, bazowy, obecny, stosunek, regresja)."""
+    reference = {(result["case"], result["size"]): result["median"] for result in baseline["results"]}
+    rows = []
+    for result in report["results"]:
+        key = (result["case"], result["size"])
+        if key not in reference:
+            continue
+        ratio = result["median"] / reference[key] if reference[key] > 0 else float("inf")
+        rows.append((*key, reference[key], result["median"], ratio, ratio > 1 + threshold))
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarki etapów symulacji")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=5, help="Liczba pomiarów każdego przypadku")
+    parser.add_argument("--all-sizes", action="store_true", help="Nie pomijaj dużych populacji dla wolnych przypadków")
+    parser.add_argument("--output", help="Plik raportu JSON")
+    parser.add_argument("--baseline", help="Raport JSON, z którym porównywane są wyniki")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Dopuszczalny względny wzrost mediany czasu przed zgłoszeniem regresji")
+    args = parser.parse_args()
+
+    print(f"{'przypadek':<24} {'populacja':>10} {'min [ms]':>10} {'mediana [ms]':>13}")
+    report = run_suite(
+        args.cases, args.sizes, args.repeat, args.all_sizes,
+        progress=lambda r: print(f"{r['case']:<24} {r['size']:>10} {r['min'] * 1000:>10.3f} {r['median'] * 1000:>13.3f}")
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nRaport zapisano do {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        rows = compare(report, baseline, args.threshold)
+        print(f"\n{'przypadek':<24} {'populacja':>10} {'bazowo [ms]':>12} {'teraz [ms]':>11} {'stosunek':>9}")
+        for name, size, before, after, ratio, regression in rows:
+            flag = "  REGRESJA" if regression else ""
+            print(f"{name:<24} {size:>10} {before * 1000:>12.3f} {after * 1000:>11.3f} {ratio:>9.2f}{flag}")
+        regressions = sum(row[-1] for row in rows)
+        print(f"\nRegresje (wzrost mediany o ponad {args.threshold:.0%}): {regressions}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,74 @@
+"""Porównanie rozkładów wyników trybu agentowego i zagregowanego (SIR/SEIR) oraz czas dnia dla 10^8 osób."""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import SIMULATION_CONFIG
+from simulation.disease_simulation import DiseaseSimulation
+
+COMPARTMENTS = ("susceptible", "infected", "recovered", "deceased", "exposed")
+
+def final_counts(config, resolution, replicates, days):
+    results = []
+    for _ in range(replicates):
+        simulation = DiseaseSimulation(dict(config, model_resolution=resolution))
+        for _ in range(days):
+            simulation.simulate_day()
+            simulation.record_stats()
+        stats = simulation.stats_history[-1]
+        results.append([stats[name] for name in COMPARTMENTS])
+    return np.array(results)
+
+def ks_statistic(a, b):
+    """Dwupróbkowa statystyka Kołmogorowa-Smirnowa."""
+    values = np.sort(np.concatenate((a, b)))
+    cdf_a = np.searchsorted(np.sort(a), values, side="right") / len(a)
+    cdf_b = np.searchsorted(np.sort(b), values, side="right") / len(b)
+    return np.max(np.abs(cdf_a - cdf_b))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walidacja trybu zagregowanego")
+    parser.add_argument("--algorithm", choices=["SIR", "SEIR"], default="SIR")
+    parser.add_argument("--population", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--replicates", type=int, default=200)
+    parser.add_argument("--large-population", type=int, default=10**8)
+    args = parser.parse_args()
+    
+    config = SIMULATION_CONFIG.copy()
+    config["algorithm"] = args.algorithm
+    config["population_size"] = args.population
+    config["initial_infected"] = max(1, args.population // 100)
+    
+    agent = final_counts(config, "agent", args.replicates, args.days)
+    aggregate = final_counts(config, "aggregate", args.replicates, args.days)
+    
+    #Wartość krytyczna testu KS dla poziomu istotności 0.01
+    critical = 1.628 * np.sqrt(2.0 / args.replicates)
+    agree = True
+    print(f"{'przedział':>12} {'agent (śr.)':>12} {'agregat (śr.)':>14} {'KS':>6}")
+    for k, name in enumerate(COMPARTMENTS):
+        if agent[:, k].max() == 0 and aggregate[:, k].max() == 0:
+            continue
+        statistic = ks_statistic(agent[:, k], aggregate[:, k])
+        agree &= statistic < critical
+        print(f"{name:>12} {agent[:, k].mean():>12.1f} {aggregate[:, k].mean():>14.1f} {statistic:>6.3f}")
+    print(f"Wartość krytyczna KS (alfa=0.01): {critical:.3f} - rozkłady {'zgodne' if agree else 'NIEZGODNE'}")
+    
+    #Czas jednego dnia w trybie zagregowanym dla bardzo dużej populacji
+    large = dict(config, population_size=args.large_population,
+                 initial_infected=args.large_population // 1000, model_resolution="aggregate")
+    simulation = DiseaseSimulation(large)
+    start = time.perf_counter()
+    for _ in range(args.days):
+        simulation.simulate_day()
+        simulation.record_stats()
+    elapsed = (time.perf_counter() - start) / args.days
+    print(f"Populacja {args.large_population}: {elapsed * 1000:.3f} ms na dzień")
+    
+    sys.exit(0 if agree else 1)
@@ -0,0 +1,73 @@
+"""Porównanie rozkładów wyników modelu zdarzeniowego (metoda bezpośrednia i tau-leaping) z modelem zagregowanym."""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import SIMULATION_CONFIG
+from simulation.disease_simulation import DiseaseSimulation
+from validate_aggregate import COMPARTMENTS, ks_statistic
+
+def final_counts(config, replicates, days):
+    results = []
+    for seed in range(replicates):
+        simulation = DiseaseSimulation(dict(config, seed=seed))
+        for _ in range(days):
+            simulation.simulate_day()
+            simulation.record_stats()
+        stats = simulation.stats_history[-1]
+        results.append([stats[name] for name in COMPARTMENTS])
+    return np.array(results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walidacja modelu zdarzeniowego (Gillespie)")
+    parser.add_argument("--algorithm", choices=["SIR", "SEIR"], default="SIR")
+    parser.add_argument("--population", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--replicates", type=int, default=200)
+    parser.add_argument("--tau", type=float, default=0.1)
+    parser.add_argument("--large-population", type=int, default=10**7)
+    args = parser.parse_args()
+    
+    config = SIMULATION_CONFIG.copy()
+    config["population_size"] = args.population
+    config["initial_infected"] = max(1, args.population // 100)
+    
+    variants = {
+        "bezpośrednia": dict(config, algorithm=f"{args.algorithm}-gillespie"),
+        "tau-leaping": dict(config, algorithm=f"{args.algorithm}-gillespie", tau_leap=args.tau),
+    }
+    reference = final_counts(dict(config, algorithm=args.algorithm, model_resolution="aggregate"), args.replicates, args.days)
+    
+    #Model zdarzeniowy zmienia intensywności w trakcie dnia, więc zgodność z modelem dziennym jest przybliżona -
+    #statystyka KS pokazuje skalę różnic, a rozbieżność metody bezpośredniej i tau-leapingu świadczy o zbyt dużym kroku
+    results = {name: final_counts(variant, args.replicates, args.days) for name, variant in variants.items()}
+    critical = 1.628 * np.sqrt(2.0 / args.replicates)
+    agree = True
+    print(f"{'przedział':>12} {'agregat (śr.)':>14} {'bezpośr. (śr.)':>15} {'tau (śr.)':>10} {'KS tau/bezpośr.':>16} {'KS bezpośr./agregat':>20}")
+    for k, name in enumerate(COMPARTMENTS):
+        direct, leap = results["bezpośrednia"][:, k], results["tau-leaping"][:, k]
+        if max(reference[:, k].max(), direct.max(), leap.max()) == 0:
+            continue
+        statistic = ks_statistic(direct, leap)
+        agree &= statistic < critical
+        print(f"{name:>12} {reference[:, k].mean():>14.1f} {direct.mean():>15.1f} {leap.mean():>10.1f} "
+              f"{statistic:>16.3f} {ks_statistic(direct, reference[:, k]):>20.3f}")
+    print(f"Wartość krytyczna KS (alfa=0.01): {critical:.3f} - tau-leaping {'zgodny' if agree else 'NIEZGODNY'} z metodą bezpośrednią")
+    
+    #Czas jednego dnia tau-leapingu dla dużej populacji
+    large = dict(variants["tau-leaping"], population_size=args.large_population,
+                 initial_infected=args.large_population // 1000)
+    simulation = DiseaseSimulation(large)
+    start = time.perf_counter()
+    for _ in range(args.days):
+        simulation.simulate_day()
+        simulation.record_stats()
+    elapsed = (time.perf_counter() - start) / args.days
+    print(f"Populacja {args.large_population}: {elapsed * 1000:.3f} ms na dzień (tau = {args.tau})")
+    
+    sys.exit(0 if agree else 1)
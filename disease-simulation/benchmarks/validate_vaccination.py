@@ -0,0 +1,78 @@
+"""Sprawdzenie kolejki kampanii szczepień: osoby niepodatne w swojej kolejce dostają dawkę, gdy znów są podatne.
+
+Przykład:
+    python benchmarks/validate_vaccination.py
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from models.population_arrays import PopulationArrays, SUSCEPTIBLE, INFECTED, RECOVERED, DECEASED
+from simulation.vaccination import VaccinationCampaign
+
+def check(name, passed):
+    print(f"{'OK  ' if passed else 'BŁĄD'} {name}")
+    return passed
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    population = PopulationArrays.random(200, rng=rng)
+    campaign = VaccinationCampaign(population, {"daily_doses": 10, "priority": "sociability"}, rng)
+    priority = campaign.order[:10]
+    others = campaign.order[10:20]
+
+    #Grupa o najwyższym priorytecie choruje w dniu swojej kolejki, kolejna dziesiątka jest już odporna
+    population.set_status(priority, INFECTED)
+    population.set_status(others, RECOVERED)
+    population.immune_days[others] = 30
+    population.set_status(campaign.order[20:21], DECEASED)
+    given = campaign.apply(population, 0, 1.0, rng)
+    results = [
+        check("dawki dnia 0 trafiają tylko do osób podatnych",
+              given == 10 and np.all(campaign.doses[priority] == 0) and np.all(campaign.doses[others] == 0)),
+        check("chorzy i odporni czekają w odłożonych (bez zmarłych)",
+              np.array_equal(campaign.deferred, np.concatenate((priority, others)))),
+    ]
+
+    #Wyzdrowienie i utrata odporności grupy priorytetowej (zgłoszona jak w _wane_immunity) - dostaje dawki
+    #przed dalszą częścią kolejki; jedna osoba zgłoszona dwukrotnie i ponownie narażona przed dniem szczepień
+    population.set_status(priority, SUSCEPTIBLE)
+    campaign.requeue(priority)
+    campaign.requeue(priority[:1])
+    population.set_status(others[:1], SUSCEPTIBLE)
+    campaign.requeue(others[:1])
+    population.set_exposed(others[:1], True)
+    position = campaign.position
+    given = campaign.apply(population, 1, 1.0, rng)
+    results += [
+        check("grupa priorytetowa zaszczepiona po powrocie do podatnych",
+              given == 10 and np.all(campaign.doses[priority] == 1) and np.all(population.status[priority] == RECOVERED)),
+        check("kolejka nie przesuwa się, gdy dawki zużyli odłożeni", campaign.position == position),
+        check("odporni i ponownie narażeni pozostają w odłożonych", np.array_equal(campaign.deferred, others)),
+        check("zgłoszony ponownie nie jest dublowany", np.array_equal(campaign.ready, others[:1])),
+    ]
+
+    #Stan kampanii (z odłożonymi) przechodzi przez punkt kontrolny
+    restored = VaccinationCampaign.from_state(population, campaign.settings, campaign.get_state())
+    results.append(check("odłożeni i gotowi odtworzeni z get_state()", np.array_equal(restored.deferred, campaign.deferred)
+                         and np.array_equal(restored.ready, campaign.ready)))
+
+    #Ponownie narażony gotowy nie dostaje dawki i opuszcza gotowych (czeka na kolejne zgłoszenie)
+    campaign.position = len(campaign.order)
+    given = campaign.apply(population, 2, 1.0, rng)
+    results.append(check("narażony z gotowych pominięty", given == 0 and len(campaign.ready) == 0
+                         and campaign.doses[others[0]] == 0 and campaign.waiting[others[0]]))
+
+    #Zgłoszenie odłożonych w odwrotnej kolejności - dawki i tak w kolejności priorytetów
+    population.set_status(others, SUSCEPTIBLE)
+    population.set_exposed(others[:1], False)
+    campaign.requeue(others[::-1])
+    results.append(check("gotowi w kolejności priorytetów", np.array_equal(campaign.ready, others)))
+    campaign.settings["daily_doses"] = 4
+    given = campaign.apply(population, 3, 1.0, rng)
+    results.append(check("dawki dla najważniejszych gotowych", given == 4 and np.all(campaign.doses[others[:4]] == 1)
+                         and np.array_equal(campaign.ready, others[4:])))
+    sys.exit(0 if all(results) else 1)
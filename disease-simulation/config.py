@@ -14,18 +14,50 @@ SIMULATION_CONFIG = {
     "contacts_per_day": 10,        #Średnia liczba kontaktów dziennie
     "social_distancing": False,    #Czy stosowane jest dystansowanie społeczne
     "quarantine_infected": False,  #Czy zarażeni są kwarantannowani (ograniczenie kontaktów)
+    "contact_model": "distance",   #Algorytm standardowy: "distance" (zarażanie sąsiadów zależne od odległości) lub "budget" (dzienny budżet kontaktów zależny od sociability)
+    "contact_dispersion": 0.0,     #Kształt szumu gamma liczby kontaktów w modelu "budget" - małe wartości to superroznosiciele (0 - rozkład Poissona)
     
     #Parametry interwencji
     "vaccination_rate": 0.0,       #Tempo szczepienia populacji (0-1)
     "vaccination_effectiveness": 0.95, #Skuteczność szczepień (0-1)
+    "policies": [],                #Polityki interwencji, np. [{"type": "lockdown", "release": 0.02}, {"type": "quarantine", "threshold": 0.01, "delay": 7}]
+    "vaccination_campaign": None,  #Kampania szczepień, np. {"daily_doses": 100, "priority": "sociability", "second_dose_interval": 21} (None - vaccination_rate)
     
     #Parametry algorytmów
-    "algorithm": "SIR",           #Dostępne: "standard", "SIR", "SEIR", "network"
-    "lockdown_threshold": 0.1,     #Próg zakażeń dla automatycznej blokady (0-1)
+    "algorithm": "SIR",           #Dostępne: "standard", "SIR", "SEIR", "network", "SIR-gillespie", "SEIR-gillespie", "SIR-ode", "SEIR-ode"
+    "lockdown_threshold": 0.1,     #Próg zakażeń dla automatycznej blokady (0-1), domyślny dla polityki "lockdown"
+    "model_resolution": "agent",   #"agent" (pojedyncze osoby) lub "aggregate" (liczebności, tylko SIR/SEIR)
+    "tau_leap": 0.0,               #Krok tau-leapingu (dni) dla algorytmów *-gillespie (0 - dokładna metoda bezpośrednia)
+    "ode_step": 1.0,               #Krok całkowania RK4 (dni) dla algorytmów *-ode
+    "fused_kernel": None,          #Połączone jądro wielu dni dla SIR/SEIR: "auto", "numba", "numpy" (None - dzień po dniu)
+    "tiles": 0,                    #Liczba kafelków płaszczyzny liczonych w osobnych procesach (algorytm standardowy, 0 - bez podziału)
+    "network_topology": "small_world", #Sieć dla modelu sieciowego: "small_world", "watts_strogatz", "barabasi_albert", "edge_list"
+    "network_rewire_prob": 0.1,    #Prawdopodobieństwo przepięcia krawędzi w sieci Wattsa-Strogatza
+    "network_edge_list": None,     #Plik z listą krawędzi (pary indeksów osób) dla topologii "edge_list"
+    "seed": None,                  #Ziarno generatora liczb losowych (None - losowe przy każdym uruchomieniu)
+    "debug_consistency_checks": False, #Sprawdzanie liczników przedziałów po każdym dniu (diagnostyka, wolne)
+    "profile": False,              #Pomiar czasu, liczby osób i pamięci każdego etapu dnia (simulation.profiling)
+    "profile_allocations": False,  #Pomiar pamięci przydzielanej w etapach (tracemalloc, wyraźnie spowalnia)
+    "profile_prometheus": None,    #Plik z metrykami etapów w formacie tekstowym Prometheusa (None - brak)
+    "profile_trace": None,         #Plik JSON z etapami w formacie Chrome Trace (None - brak)
     
     #Parametry symulacji
     "simulation_days": 365,        #Całkowity czas symulacji w dniach
     "plot_results": True,          #Czy wyświetlać wykres
     "save_to_file": False,         #Czy zapisywać wykres do pliku
-    "real_time_visualization": True #Czy używać wizualizacji w czasie rzeczywistym
+    "real_time_visualization": True, #Czy używać wizualizacji w czasie rzeczywistym
+    "quiet": False,                #Bez komunikatów o każdym dniu i postępie powtórzeń
+    "heatmap_threshold": 20000,    #Liczba osób, powyżej której wizualizacja pokazuje mapę gęstości zamiast kropek
+    "export_path": None,           #Eksport animacji bez ekranu: katalog klatek PNG, plik .gif lub .mp4 (None - brak)
+    "export_fps": 10,              #Liczba klatek na sekundę eksportowanej animacji
+    "replicates": 1,               #Liczba niezależnych powtórzeń (Monte Carlo) - powyżej 1 liczone są pasma kwantyli
+    "workers": None,               #Liczba procesów dla powtórzeń (None - wszystkie rdzenie)
+    "checkpoint_path": None,       #Plik .npz, do którego zapisywany jest stan symulacji (None - bez zapisu)
+    "checkpoint_interval": 0,      #Co ile dni zapisywać punkt kontrolny (0 - tylko na końcu symulacji)
+    
+    #Parametry zapisu wyników
+    "output_path": None,           #Plik dziennych statystyk zapisywanych na bieżąco (.csv, .parquet, .arrow)
+    "snapshot_path": None,         #Plik .npy z migawkami atrybutów osób (mapowany w pamięci)
+    "snapshot_interval": 10,       #Co ile dni zapisywać migawkę osób
+    "keep_history": True           #Czy przechowywać w pamięci statystyki wszystkich dni (False - tylko ostatni dzień)
 }
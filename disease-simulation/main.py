@@ -1,12 +1,21 @@
-import random
-import matplotlib.pyplot as plt
-import numpy as np
 import argparse
-import time
+import json
+import os
+import tempfile
+import zipfile
 from config import SIMULATION_CONFIG
-from models.person import Person
-from simulation.disease_simulation import DiseaseSimulation
-from utils.visualization import plot_simulation_results, create_real_time_visualization
+from simulation.disease_simulation import DiseaseSimulation, checkpoint_overrides, load_checkpoint_config
+from simulation.gillespie import GILLESPIE_ALGORITHMS
+from simulation.ode import ODE_ALGORITHMS
+from utils.output_sinks import create_sinks
+
+def load_json_argument(parser, path, option):
+    """Wczytuje plik JSON podany w opcji - błąd odczytu kończy program komunikatem argparse."""
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError) as error:
+        parser.error(f"{option}: nie można wczytać pliku {path} ({error})")
 
 def parse_arguments():
     """Parsowanie argumentów linii poleceń dla łatwiejszej konfiguracji."""
@@ -15,10 +24,52 @@ def parse_arguments():
     parser.add_argument("--population", type=int, help="Wielkość populacji")
     parser.add_argument("--days", type=int, help="Liczba dni symulacji")
     parser.add_argument("--infected", type=int, help="Początkowa liczba zarażonych")
-    parser.add_argument("--algorithm", choices=["standard", "SIR", "SEIR", "network"], 
+    parser.add_argument("--algorithm", choices=["standard", "SIR", "SEIR", "network", "SIR-gillespie", "SEIR-gillespie",
+                                                "SIR-ode", "SEIR-ode"], 
                         help="Algorytm symulacji")
     parser.add_argument("--visual", action="store_true", help="Uruchom wizualizację w czasie rzeczywistym")
+    parser.add_argument("--headless", action="store_true", help="Bez wizualizacji i wykresów (matplotlib nie jest wczytywany)")
+    parser.add_argument("--quiet", action="store_true", help="Bez komunikatów o każdym dniu i postępie powtórzeń")
     parser.add_argument("--distancing", action="store_true", help="Aktywuj dystans społeczny")
+    parser.add_argument("--contact-model", choices=["distance", "budget"],
+                        help="Model kontaktów algorytmu standardowego (budget - dzienny budżet kontaktów zależny od sociability)")
+    parser.add_argument("--contact-dispersion", type=float,
+                        help="Kształt szumu gamma liczby kontaktów w modelu budget (małe wartości - superroznosiciele)")
+    parser.add_argument("--policies", help="Plik JSON z listą polityk interwencji (blokada z histerezą, kwarantanna z opóźnieniem)")
+    parser.add_argument("--lockdown", action="store_true",
+                        help="Automatyczna blokada (dystans społeczny) po przekroczeniu progu zakażeń")
+    parser.add_argument("--lockdown-threshold", type=float, help="Udział zarażonych, przy którym włączana jest blokada")
+    parser.add_argument("--vaccination-campaign",
+                        help="Plik JSON z kampanią szczepień (dzienna liczba dawek, priorytet, druga dawka, wygasanie)")
+    parser.add_argument("--resolution", choices=["agent", "aggregate"],
+                        help="Poziom modelu SIR/SEIR: pojedyncze osoby lub liczebności przedziałów")
+    parser.add_argument("--tau-leap", type=float,
+                        help="Krok tau-leapingu (dni) dla algorytmów *-gillespie; bez niego - dokładna metoda bezpośrednia")
+    parser.add_argument("--fused", nargs="?", const="auto", choices=["auto", "numba", "numpy"],
+                        help="Połączone jądro wielu dni dla modeli SIR/SEIR (numba; auto bez numba liczy dzień po dniu, numpy - wektorowo)")
+    parser.add_argument("--tiles", type=int,
+                        help="Liczba kafelków płaszczyzny liczonych w osobnych procesach (algorytm standardowy)")
+    parser.add_argument("--network-topology", choices=["small_world", "watts_strogatz", "barabasi_albert", "edge_list"],
+                        help="Topologia sieci kontaktów dla modelu sieciowego")
+    parser.add_argument("--edge-list", help="Plik z listą krawędzi sieci kontaktów (wymusza topologię edge_list)")
+    parser.add_argument("--replicates", type=int, help="Liczba niezależnych powtórzeń symulacji (Monte Carlo)")
+    parser.add_argument("--workers", type=int, help="Liczba procesów dla powtórzeń (domyślnie wszystkie rdzenie)")
+    parser.add_argument("--seed", type=int, help="Ziarno generatora liczb losowych (powtarzalne wyniki)")
+    parser.add_argument("--sweep", help="Plik JSON z planem przeszukiwania parametrów (siatka lub hiperkostka łacińska)")
+    parser.add_argument("--checkpoint", help="Plik .npz, do którego zapisywany jest stan symulacji")
+    parser.add_argument("--checkpoint-every", type=int, help="Co ile dni zapisywać punkt kontrolny")
+    parser.add_argument("--resume", help="Wznowienie symulacji z pliku punktu kontrolnego")
+    parser.add_argument("--output", help="Plik dziennych statystyk zapisywanych w trakcie symulacji (.csv, .parquet, .arrow)")
+    parser.add_argument("--snapshots", help="Plik .npy z migawkami atrybutów osób")
+    parser.add_argument("--snapshot-every", type=int, help="Co ile dni zapisywać migawkę osób")
+    parser.add_argument("--no-history", action="store_true", help="Nie przechowuj w pamięci statystyk wszystkich dni")
+    parser.add_argument("--heatmap-threshold", type=int, help="Liczba osób, powyżej której wizualizacja pokazuje mapę gęstości")
+    parser.add_argument("--export", help="Eksport animacji bez ekranu: katalog klatek PNG, plik .gif lub .mp4")
+    parser.add_argument("--fps", type=int, help="Liczba klatek na sekundę eksportowanej animacji")
+    parser.add_argument("--profile", action="store_true", help="Pomiar czasu i liczby osób w każdym etapie dnia symulacji")
+    parser.add_argument("--profile-allocations", action="store_true", help="Pomiar pamięci przydzielanej w etapach (wolne)")
+    parser.add_argument("--profile-prometheus", help="Plik tekstowy z metrykami etapów w formacie Prometheusa")
+    parser.add_argument("--profile-trace", help="Plik JSON z przebiegiem etapów w formacie Chrome Trace")
     
     args = parser.parse_args()
     
@@ -34,27 +85,188 @@ def parse_arguments():
         config["algorithm"] = args.algorithm
     if args.visual:
         config["real_time_visualization"] = True
+    if args.headless:
+        config["real_time_visualization"] = False
+        config["plot_results"] = False
+    if args.quiet:
+        config["quiet"] = True
     if args.distancing:
         config["social_distancing"] = True
+    if args.contact_model:
+        config["contact_model"] = args.contact_model
+    if args.contact_dispersion is not None:
+        config["contact_dispersion"] = args.contact_dispersion
+    if args.policies:
+        config["policies"] = load_json_argument(parser, args.policies, "--policies")
+    if args.lockdown_threshold is not None:
+        config["lockdown_threshold"] = args.lockdown_threshold
+    if args.lockdown:
+        config["policies"] = list(config["policies"]) + [{"type": "lockdown"}]
+    if args.vaccination_campaign:
+        config["vaccination_campaign"] = load_json_argument(parser, args.vaccination_campaign, "--vaccination-campaign")
+    if args.resolution:
+        config["model_resolution"] = args.resolution
+    if args.tau_leap is not None:
+        config["tau_leap"] = args.tau_leap
+    if args.fused:
+        config["fused_kernel"] = args.fused
+    if args.tiles:
+        config["tiles"] = args.tiles
+    if args.network_topology:
+        config["network_topology"] = args.network_topology
+    if args.edge_list:
+        config["network_topology"] = "edge_list"
+        config["network_edge_list"] = args.edge_list
+    if args.replicates:
+        config["replicates"] = args.replicates
+    if args.workers:
+        config["workers"] = args.workers
+    if args.sweep:
+        config["sweep"] = args.sweep
+    if args.seed is not None:
+        config["seed"] = args.seed
+    if args.checkpoint:
+        config["checkpoint_path"] = args.checkpoint
+    if args.checkpoint_every:
+        config["checkpoint_interval"] = args.checkpoint_every
+    if args.output:
+        config["output_path"] = args.output
+    if args.snapshots:
+        config["snapshot_path"] = args.snapshots
+    if args.snapshot_every:
+        config["snapshot_interval"] = args.snapshot_every
+    if args.no_history:
+        config["keep_history"] = False
+    if args.heatmap_threshold is not None:
+        config["heatmap_threshold"] = args.heatmap_threshold
+    if args.export:
+        config["export_path"] = args.export
+        #Domyślnie jedna klatka na dzień symulacji
+        if not args.snapshot_every:
+            config["snapshot_interval"] = 1
+    if args.fps:
+        config["export_fps"] = args.fps
+    if args.profile or args.profile_allocations or args.profile_prometheus or args.profile_trace:
+        config["profile"] = True
+        config["profile_allocations"] = args.profile_allocations
+        config["profile_prometheus"] = args.profile_prometheus
+        config["profile_trace"] = args.profile_trace
+    if args.resume:
+        #Stan i parametry populacji pochodzą z punktu kontrolnego, pozostałe argumenty zmieniają dalszy przebieg
+        try:
+            checkpoint_config = load_checkpoint_config(args.resume)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as error:
+            parser.error(f"--resume: nie można wczytać punktu kontrolnego {args.resume} ({error})")
+        config = dict(checkpoint_config, **checkpoint_overrides(config), resume=args.resume)
         
     return config
 
+def progress_printer(config, message):
+    """Funkcja wypisująca postęp (done, total) według wzorca message - w trybie --quiet brak komunikatów."""
+    if config.get("quiet", False):
+        return None
+    return lambda done, total: print(message.format(done=done, total=total))
+
+def create_simulation(config):
+    """Tworzy nową symulację albo wczytuje ją z punktu kontrolnego (--resume) i dołącza ujścia wyników."""
+    if config.get("resume"):
+        simulation = DiseaseSimulation.load_checkpoint(config["resume"], config)
+        print(f"- Wznowiono od dnia {simulation.day}")
+    else:
+        simulation = DiseaseSimulation(config)
+    for sink in create_sinks(config):
+        simulation.add_sink(sink)
+    return simulation
+
+def report_profile(simulation, config):
+    """Wypisuje sumy etapów dnia i zapisuje metryki do plików wskazanych w konfiguracji."""
+    if not simulation.profiler.enabled:
+        return
+    metrics = simulation.profiler.metrics
+    summary = metrics.summary()
+    total = sum(phase["seconds"] for name, phase in summary.items() if name == "day") or 1.0
+    print(f"\n{'etap':<18} {'wywołania':>10} {'czas [s]':>10} {'udział':>8} {'osoby':>14} {'pamięć [MB]':>12}")
+    for name, phase in sorted(summary.items(), key=lambda item: -item[1]["seconds"]):
+        memory = f"{phase['allocated_bytes'] / 2**20:>12.1f}" if config.get("profile_allocations") else f"{'-':>12}"
+        print(f"{name:<18} {phase['calls']:>10} {phase['seconds']:>10.3f} {phase['seconds'] / total:>8.1%} {phase['agents']:>14} {memory}")
+    if config.get("profile_prometheus"):
+        metrics.write_prometheus(config["profile_prometheus"])
+        print(f"Metryki etapów zapisano do {config['profile_prometheus']}")
+    if config.get("profile_trace"):
+        metrics.write_chrome_trace(config["profile_trace"])
+        print(f"Przebieg etapów zapisano do {config['profile_trace']}")
+
+def run_export(config):
+    """Symulacja bez ekranu z zapisem migawek osób, a następnie równoległe renderowanie animacji."""
+    from utils.export import export_animation, stats_array
+    with tempfile.TemporaryDirectory() as directory:
+        #Migawki w pliku tymczasowym, chyba że wskazano plik do zachowania (--snapshots)
+        config = dict(config, keep_history=True)
+        config.setdefault("snapshot_path", None)
+        if not config["snapshot_path"]:
+            config["snapshot_path"] = os.path.join(directory, "snapshots.npy")
+        simulation = create_simulation(config)
+        results = simulation.run_simulation(verbose=False)
+        report_profile(simulation, config)
+        print(f"Symulacja zakończona, renderowanie klatek (procesy: {config.get('workers') or os.cpu_count()})...")
+        
+        outputs = export_animation(
+            config["snapshot_path"], stats_array(results), config["export_path"],
+            fps=config["export_fps"], workers=config.get("workers"),
+            heatmap_threshold=config["heatmap_threshold"],
+            progress=progress_printer(config, "Klatki: {done}/{total}")
+        )
+    print(f"Zapisano animację: {config['export_path']} ({len(outputs)} plików)")
+
+def run_ensemble(config):
+    """Uruchamia serię powtórzeń i wypisuje pasma kwantyli wyników końcowych."""
+    from simulation.ensemble import EnsembleRunner
+    runner = EnsembleRunner(config, config["replicates"], config.get("workers"), seed=config.get("seed"))
+    print(f"- Powtórzenia: {runner.replicates} (procesy: {runner.workers})")
+    result = runner.run(progress=progress_printer(config, "Powtórzenie {done}/{total} zakończone"))
+    
+    bands = result.quantile_bands()
+    labels = {"susceptible": "Podatni", "infected": "Zarażeni", "recovered": "Ozdrowieńcy", "deceased": "Zmarli"}
+    print("\nWyniki końcowe (mediana, przedział 5%-95%):")
+    for name, label in labels.items():
+        low, median, high = bands[name][:, -1]
+        print(f"{label}: {median:.0f} osób ({low:.0f}-{high:.0f})")
+    
+    if config["plot_results"]:
+        from utils.visualization import plot_ensemble_bands
+        plot_ensemble_bands(result, config)
+
+def run_sweep(config):
+    """Przelicza plan parametrów, korzystając z wyników zapisanych wcześniej na dysku."""
+    from simulation.sweep import SweepRunner, load_sweep_spec
+    base_config = {key: value for key, value in config.items() if key != "sweep"}
+    spec, parameters, points = load_sweep_spec(config["sweep"], base_config)
+    runner = SweepRunner(
+        points,
+        replicates=spec.get("replicates", config.get("replicates", 1)),
+        workers=config.get("workers"),
+        cache_dir=spec.get("cache_dir", "sweep_cache"),
+        seed=spec["seed"]
+    )
+    pending = len(runner.pending_tasks())
+    print(f"- Punkty planu: {len(points)}, powtórzenia: {len(runner.seeds)}, ziarno planu: {runner.seed}, "
+          f"do policzenia: {pending} przebiegów")
+    result = runner.run(progress=progress_printer(config, "Przebieg {done}/{total} zakończony"))
+    
+    summary = spec.get("summary", os.path.join(runner.cache.directory, "summary.csv"))
+    result.write_csv(summary, parameters)
+    print(f"\nPodsumowanie (mediany wyników końcowych) zapisano do {summary}")
+    for row in result.summary_rows(parameters):
+        settings = ", ".join(f"{name}={row[name]}" for name in parameters)
+        print(f"{settings}: zarażeni {row['infected']:.0f}, ozdrowieńcy {row['recovered']:.0f}, zmarli {row['deceased']:.0f}")
+
 if __name__ == "__main__":
     #Parsowanie argumentów linii poleceń
-    try:
-        config = parse_arguments()
-    except:
-        config = SIMULATION_CONFIG
+    config = parse_arguments()
 
-    # Automatyczne wyłączenie graficznej wizualizacji dla dużych populacji
-    if config["population_size"] > 2000:
-        if config["real_time_visualization"]:
-            print("\n==============================================================")
-            print("Graficzna wizualizacja (kropeczki) jest dostępna tylko dla populacji do 2000 osób.")
-            print("Dla większych populacji wyświetlany jest tylko wykres liczbowy/statystyki.")
-            print("==============================================================\n")
-            print("Trwa przetwarzanie...\n")
-            time.sleep(5)
+    #Modele zagregowany, zdarzeniowy i ODE nie mają pozycji osób do wyświetlenia
+    if (config.get("model_resolution") == "aggregate" and config["algorithm"] in ("SIR", "SEIR")
+            or config["algorithm"] in GILLESPIE_ALGORITHMS or config["algorithm"] in ODE_ALGORITHMS):
         config["real_time_visualization"] = False
 
     print("Uruchamianie symulacji rozprzestrzeniania się choroby...")
@@ -63,13 +275,23 @@ if __name__ == "__main__":
     print(f"- Początkowe zarażenia: {config['initial_infected']} osób")
     print(f"- Czas symulacji: {config['simulation_days']} dni")
     
-    simulation = DiseaseSimulation(config)
-    
-    if config["real_time_visualization"]:
+    if config.get("sweep"):
+        run_sweep(config)
+    elif config.get("replicates", 1) > 1:
+        run_ensemble(config)
+    elif config.get("export_path"):
+        run_export(config)
+    elif config["real_time_visualization"]:
+        simulation = create_simulation(config)
         print("Uruchamianie wizualizacji w czasie rzeczywistym...")
+        #Matplotlib jest wczytywany tylko wtedy, gdy jest potrzebny (szybki start uruchomień bez ekranu)
+        from utils.visualization import create_real_time_visualization
         animation = create_real_time_visualization(simulation)
+        report_profile(simulation, config)
     else:
-        results = simulation.run_simulation()
+        simulation = create_simulation(config)
+        results = simulation.run_simulation(verbose=not config.get("quiet", False))
+        report_profile(simulation, config)
         
         final_stats = results[-1]
         print("\nWyniki końcowe:")
@@ -77,6 +299,12 @@ if __name__ == "__main__":
         print(f"Zarażeni: {final_stats['infected']} osób ({final_stats['infected']/config['population_size']:.1%})")
         print(f"Ozdrowieńcy: {final_stats['recovered']} osób ({final_stats['recovered']/config['population_size']:.1%})")
         print(f"Zmarli: {final_stats['deceased']} osób ({final_stats['deceased']/config['population_size']:.1%})")
+        if simulation.policies is not None:
+            print("\nZmiany polityk:")
+            for day, name, active in simulation.policies.events:
+                print(f"Dzień {day + 1}: {name} {'WŁ' if active else 'WYŁ'}")
         
-        #Wyświetlenie wykresu
-        plot_simulation_results(results, config)
+        #Wyświetlenie wykresu (wymaga statystyk wszystkich dni)
+        if config["plot_results"] and config["keep_history"]:
+            from utils.visualization import plot_simulation_results
+            plot_simulation_results(results, config)
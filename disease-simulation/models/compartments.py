@@ -0,0 +1,97 @@
+import numpy as np
+
+class CompartmentIndex:
+    """Zbiory indeksów osób w każdym przedziale, aktualizowane przy każdej zmianie stanu."""
+
+    #Każdy przedział to gęsta tablica indeksów z usuwaniem przez przeniesienie elementów z końca,
+    #więc liczebności są dostępne w O(1), a przeniesienie k osób kosztuje O(k)
+    def __init__(self, compartment, n_compartments):
+        self.compartment = np.array(compartment, dtype=np.int8)
+        size = len(self.compartment)
+        self._members = [np.empty(size, dtype=np.int64) for _ in range(n_compartments)]
+        self._sizes = np.zeros(n_compartments, dtype=np.int64)
+        #Pozycja osoby w tablicy jej przedziału
+        self._position = np.empty(size, dtype=np.int64)
+
+        for c in range(n_compartments):
+            self._add(c, np.flatnonzero(self.compartment == c))
+
+    @classmethod
+    def from_state(cls, state):
+        """Odtwarza indeks z get_state() razem z kolejnością osób w przedziałach (wpływa na kolejne losowania)."""
+        index = cls(state["compartment"], len(state["sizes"]))
+        offsets = np.concatenate(([0], np.cumsum(index._sizes)))
+        for c in range(len(index._sizes)):
+            index._members[c][:index._sizes[c]] = state["members"][offsets[c]:offsets[c + 1]]
+        index._position[:] = state["position"]
+        return index
+
+    def get_state(self):
+        """Kody przedziałów, liczebności, pozycje i połączone tablice osób (np. do zapisu punktu kontrolnego)."""
+        members = np.concatenate([self._members[c][:self._sizes[c]] for c in range(len(self._sizes))])
+        return {"compartment": self.compartment, "sizes": self._sizes, "position": self._position, "members": members}
+
+    def count(self, compartment):
+        return int(self._sizes[compartment])
+
+    def counts(self):
+        return self._sizes.copy()
+
+    def members(self, compartment):
+        """Kopia indeksów osób w przedziale (kolejność nie jest określona)."""
+        return self._members[compartment][:self._sizes[compartment]].copy()
+
+    def sample(self, compartment, k, rng):
+        """Losuje k różnych osób z przedziału bez przeglądania całej populacji."""
+        positions = rng.choice(self.count(compartment), k, replace=False)
+        return self._members[compartment][positions]
+
+    def move(self, indices, new_compartment):
+        """Przenosi osoby (unikalne indeksy) do nowych przedziałów."""
+        indices = np.asarray(indices, dtype=np.int64)
+        new_compartment = np.broadcast_to(np.asarray(new_compartment, dtype=np.int8), indices.shape)
+        old_compartment = self.compartment[indices]
+        changed = old_compartment != new_compartment
+        indices, old_compartment, new_compartment = indices[changed], old_compartment[changed], new_compartment[changed]
+        if len(indices) == 0:
+            return
+
+        for c in np.unique(old_compartment):
+            self._remove(c, indices[old_compartment == c])
+        for c in np.unique(new_compartment):
+            self._add(c, indices[new_compartment == c])
+        self.compartment[indices] = new_compartment
+
+    def _add(self, compartment, indices):
+        start = self._sizes[compartment]
+        end = start + len(indices)
+        self._members[compartment][start:end] = indices
+        self._position[indices] = np.arange(start, end)
+        self._sizes[compartment] = end
+
+    def _remove(self, compartment, indices):
+        members = self._members[compartment]
+        size = self._sizes[compartment]
+        new_size = size - len(indices)
+        positions = self._position[indices]
+
+        #Osoby z końca tablicy, które zostają, wypełniają luki po usuniętych z początku
+        staying_tail = np.ones(len(indices), dtype=bool)
+        staying_tail[positions[positions >= new_size] - new_size] = False
+        movers = members[new_size:size][staying_tail]
+        holes = positions[positions < new_size]
+        members[holes] = movers
+        self._position[movers] = holes
+        self._sizes[compartment] = new_size
+
+    def check(self, compartment):
+        """Porównuje indeks z przedziałami wyliczonymi od zera; zgłasza RuntimeError przy niezgodności."""
+        if not np.array_equal(self.compartment, compartment):
+            raise RuntimeError("niezgodne kody przedziałów w indeksie populacji")
+        for c in range(len(self._sizes)):
+            expected = np.flatnonzero(compartment == c)
+            actual = np.sort(self._members[c][:self._sizes[c]])
+            if not np.array_equal(expected, actual):
+                raise RuntimeError(f"niezgodny zbiór osób w przedziale {c}")
+            if not np.array_equal(self._position[self._members[c][:self._sizes[c]]], np.arange(self._sizes[c])):
+                raise RuntimeError(f"niezgodne pozycje w przedziale {c}")
@@ -1,87 +1,91 @@
-import random
 import numpy as np
+from models.population_arrays import (
+    PopulationArrays, STATUS_NAMES, STATUS_CODES, MOVEMENT_PATTERNS, MOVEMENT_CODES
+)
+
+#Generator używany przez Person.move, gdy nie podano własnego
+_default_rng = np.random.default_rng()
+
+def _array_property(name, cast):
+    """Tworzy właściwość czytającą i zapisującą pole osoby w tablicy populacji."""
+    def getter(self):
+        return cast(getattr(self._store, name)[self._index])
+
+    def setter(self, value):
+        getattr(self._store, name)[self._index] = value
+
+    return property(getter, setter)
 
 class Person:
-    def __init__(self, id):
+    """Lekki widok na jedną osobę przechowywaną w PopulationArrays."""
+    __slots__ = ("id", "_store", "_index")
+
+    def __init__(self, id, store=None):
         self.id = id
-        self.status = "susceptible"  #susceptible, infected, recovered, deceased
-        self.days_infected = 0
-        self.immune_days = 0
-        
-        #Pozycja osoby w przestrzeni 2D
-        self.x = random.uniform(0, 100)
-        self.y = random.uniform(0, 100)
-        
-        #Prędkość i kierunek ruchu
-        self.speed = random.uniform(0.5, 2.0)
-        self.direction = random.uniform(0, 2 * np.pi)
-        
-        #Atrybuty osobowości wpływające na zachowanie
-        self.sociability = random.uniform(0.2, 1.0)  #Towarzyskość wpływa na liczbę kontaktów
-        self.movement_pattern = random.choice(['normal', 'static', 'explorer'])  #Różne wzorce ruchu
-
-        #Dla modelu SEIR
-        self.exposed = False
-        self.exposure_days = 0
-
-        #Dla modelu sieciowego
-        self.connections = []
-    
-    def move(self, bounds=(100, 100)):
-        if self.status == "deceased":
-            return  #Zmarli się nie poruszają
-        
-        #Prawdopodobieństwo zmiany kierunku zależy od wzorca ruchu
-        direction_change_prob = {
-            'normal': 0.1, 
-            'static': 0.02,
-            'explorer': 0.3
-        }[self.movement_pattern]
-        
-        #Modyfikator prędkości
-        speed_modifier = 1.0
-        if self.status == "infected":
-            speed_modifier *= 0.6  #Zarażeni poruszają się wolniej
-        
-        #Losowa zmiana kierunku
-        if random.random() < direction_change_prob:
-            #Większa zmiana dla eksploratorów, mniejsza dla statycznych
-            angle_change = {
-                'normal': random.uniform(-0.5, 0.5),
-                'static': random.uniform(-0.2, 0.2),
-                'explorer': random.uniform(-1.5, 1.5)
-            }[self.movement_pattern]
-            self.direction = (self.direction + angle_change) % (2 * np.pi)
-        
-        #Prędkość zależy od wzorca ruchu
-        base_speed = {
-            'normal': self.speed,
-            'static': self.speed * 0.3,
-            'explorer': self.speed * 1.5
-        }[self.movement_pattern]
-        
-        #Ruch w wybranym kierunku z uwzględnieniem modyfikatorów
-        dx = np.cos(self.direction) * base_speed * speed_modifier
-        dy = np.sin(self.direction) * base_speed * speed_modifier
-        
-        #Dodanie niewielkiego losowego szumu do ruchu
-        dx += random.uniform(-0.5, 0.5)
-        dy += random.uniform(-0.5, 0.5)
-        
-        self.x += dx
-        self.y += dy
-        
-        #Obsługa granic - odbicie lub zawracanie
-        if self.x < 0:
-            self.x = 0
-            self.direction = np.pi - self.direction
-        elif self.x > bounds[0]:
-            self.x = bounds[0]
-            self.direction = np.pi - self.direction
-            
-        if self.y < 0:
-            self.y = 0
-            self.direction = -self.direction
-        elif self.y > bounds[1]:
-            self.y = bounds[1]
-            self.direction = -self.direction
+        if store is None:
+            #Samodzielna osoba - własna, jednoelementowa populacja
+            self._store = PopulationArrays.random(1)
+            self._index = 0
+        else:
+            self._store = store
+            self._index = id
+
+    #Pozycja osoby w przestrzeni 2D
+    x = _array_property("x", float)
+    y = _array_property("y", float)
+
+    #Prędkość i kierunek ruchu
+    speed = _array_property("speed", float)
+    direction = _array_property("direction", float)
+
+    #Towarzyskość wpływa na liczbę kontaktów
+    sociability = _array_property("sociability", float)
+
+    #Stan choroby
+    days_infected = _array_property("days_infected", int)
+    immune_days = _array_property("immune_days", int)
+
+    #Dla modelu SEIR
+    exposure_days = _array_property("exposure_days", int)
+
+    @property
+    def status(self):
+        return STATUS_NAMES[self._store.status[self._index]]  #susceptible, infected, recovered, deceased
+
+    @status.setter
+    def status(self, value):
+        self._store.set_status([self._index], STATUS_CODES[value])
+
+    @property
+    def exposed(self):
+        return bool(self._store.exposed[self._index])
+
+    @exposed.setter
+    def exposed(self, value):
+        self._store.set_exposed([self._index], value)
+
+    @property
+    def movement_pattern(self):
+        return MOVEMENT_PATTERNS[self._store.movement_pattern[self._index]]
+
+    @movement_pattern.setter
+    def movement_pattern(self, value):
+        self._store.movement_pattern[self._index] = MOVEMENT_CODES[value]
+
+    @property
+    def connections(self):
+        """Kontakty z modelu sieciowego jako widoki Person."""
+        if self._store.network is None:
+            return []
+        return [self._store.person(j) for j in self._store.network.neighbors(self._index)]
+
+    def __eq__(self, other):
+        return isinstance(other, Person) and self._store is other._store and self._index == other._index
+
+    def __hash__(self):
+        return hash((id(self._store), self._index))
+
+    def move(self, bounds=(100, 100), rng=None):
+        """Ruch pojedynczej osoby - ten sam krok co PopulationArrays.move, ograniczony do tej osoby."""
+        rng = rng if rng is not None else _default_rng
+        self._store.move(bounds, rng=rng, indices=np.array([self._index]))
@@ -0,0 +1,189 @@
+import numpy as np
+from models.compartments import CompartmentIndex
+from simulation.social_network import SocialNetwork
+
+#Kody statusów przechowywane w tablicy status
+SUSCEPTIBLE = 0
+INFECTED = 1
+RECOVERED = 2
+DECEASED = 3
+STATUS_NAMES = ("susceptible", "infected", "recovered", "deceased")
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+#Przedziały używane w statystykach - kody 0-3 jak statusy, osoby narażone (SEIR) osobno
+EXPOSED = 4
+COMPARTMENT_NAMES = STATUS_NAMES + ("exposed",)
+
+#Kody wzorców ruchu
+MOVEMENT_PATTERNS = ("normal", "static", "explorer")
+MOVEMENT_CODES = {name: code for code, name in enumerate(MOVEMENT_PATTERNS)}
+
+#Parametry ruchu indeksowane kodem wzorca (te same wartości co w Person.move)
+DIRECTION_CHANGE_PROB = np.array([0.1, 0.02, 0.3])
+MAX_ANGLE_CHANGE = np.array([0.5, 0.2, 1.5])
+SPEED_FACTOR = np.array([1.0, 0.3, 1.5])
+INFECTED_SPEED_MODIFIER = 0.6
+MOVEMENT_NOISE = 0.5
+
+#Tablice atrybutów osób zapisywane w punkcie kontrolnym
+STATE_ARRAYS = (
+    "x", "y", "speed", "direction", "sociability", "movement_pattern",
+    "status", "days_infected", "immune_days", "exposed", "exposure_days"
+)
+
+class PopulationArrays:
+    """Populacja przechowywana jako zestaw ciągłych tablic NumPy (jedna tablica na atrybut)."""
+
+    def __init__(self, size):
+        self.size = size
+
+        #Pozycja, prędkość i kierunek ruchu
+        self.x = np.zeros(size, dtype=np.float64)
+        self.y = np.zeros(size, dtype=np.float64)
+        self.speed = np.zeros(size, dtype=np.float64)
+        self.direction = np.zeros(size, dtype=np.float64)
+
+        #Atrybuty osobowości
+        self.sociability = np.zeros(size, dtype=np.float64)
+        self.movement_pattern = np.zeros(size, dtype=np.int8)
+
+        #Stan choroby
+        self.status = np.full(size, SUSCEPTIBLE, dtype=np.int8)
+        self.days_infected = np.zeros(size, dtype=np.int32)
+        self.immune_days = np.zeros(size, dtype=np.int32)
+
+        #Dla modelu SEIR
+        self.exposed = np.zeros(size, dtype=bool)
+        self.exposure_days = np.zeros(size, dtype=np.int32)
+
+        #Dla modelu sieciowego - sieć kontaktów w formacie CSR (None, gdy sieć nie istnieje)
+        self.network = None
+
+        #Bieżące liczebności i zbiory indeksów przedziałów
+        self.index = CompartmentIndex(self.compartment_codes(), len(COMPARTMENT_NAMES))
+
+    @classmethod
+    def random(cls, size, bounds=(100, 100), rng=None):
+        """Tworzy populację z losowymi atrybutami (odpowiednik Person.__init__ dla wielu osób)."""
+        rng = rng if rng is not None else np.random.default_rng()
+        population = cls(size)
+        population.x[:] = rng.uniform(0, bounds[0], size)
+        population.y[:] = rng.uniform(0, bounds[1], size)
+        population.speed[:] = rng.uniform(0.5, 2.0, size)
+        population.direction[:] = rng.uniform(0, 2 * np.pi, size)
+        population.sociability[:] = rng.uniform(0.2, 1.0, size)
+        population.movement_pattern[:] = rng.integers(0, len(MOVEMENT_PATTERNS), size)
+        return population
+
+    @classmethod
+    def from_state(cls, state):
+        """Odtwarza populację z tablic zwróconych przez get_state()."""
+        population = cls(len(state["x"]))
+        for name in STATE_ARRAYS:
+            getattr(population, name)[:] = state[name]
+        if "network_indptr" in state:
+            population.network = SocialNetwork(state["network_indptr"], state["network_indices"])
+        population.index = CompartmentIndex.from_state(
+            {key[len("index_"):]: value for key, value in state.items() if key.startswith("index_")}
+        )
+        return population
+
+    def get_state(self):
+        """Tablice atrybutów, sieci kontaktów i indeksu przedziałów (np. do zapisu punktu kontrolnego)."""
+        state = {name: getattr(self, name) for name in STATE_ARRAYS}
+        if self.network is not None:
+            state["network_indptr"] = self.network.indptr
+            state["network_indices"] = self.network.indices
+        state.update({f"index_{key}": value for key, value in self.index.get_state().items()})
+        return state
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("indeks osoby poza zakresem populacji")
+        return self.person(index)
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self.person(index)
+
+    def person(self, index):
+        """Zwraca lekki widok Person na osobę o podanym indeksie."""
+        from models.person import Person
+        return Person(index, store=self)
+
+    def move(self, bounds=(100, 100), rng=None, indices=None):
+        """Przesuwa żywe osoby jednym przebiegiem wektorowym (odpowiednik Person.move).
+
+        indices ogranicza ruch do podanych osób (np. właścicieli jednego kafelka przestrzeni).
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        #Zmarli się nie poruszają
+        if indices is None:
+            alive = np.flatnonzero(self.status != DECEASED)
+        else:
+            alive = indices[self.status[indices] != DECEASED]
+        n = len(alive)
+        pattern = self.movement_pattern[alive]
+        direction = self.direction[alive]
+
+        #Losowa zmiana kierunku - większa dla eksploratorów, mniejsza dla statycznych
+        turns = rng.random(n) < DIRECTION_CHANGE_PROB[pattern]
+        angle_change = rng.uniform(-1.0, 1.0, n) * MAX_ANGLE_CHANGE[pattern]
+        direction = np.where(turns, (direction + angle_change) % (2 * np.pi), direction)
+
+        #Prędkość zależy od wzorca ruchu, zarażeni poruszają się wolniej
+        speed = self.speed[alive] * SPEED_FACTOR[pattern]
+        speed[self.status[alive] == INFECTED] *= INFECTED_SPEED_MODIFIER
+
+        #Ruch w wybranym kierunku z niewielkim losowym szumem
+        x = self.x[alive] + np.cos(direction) * speed + rng.uniform(-MOVEMENT_NOISE, MOVEMENT_NOISE, n)
+        y = self.y[alive] + np.sin(direction) * speed + rng.uniform(-MOVEMENT_NOISE, MOVEMENT_NOISE, n)
+
+        #Obsługa granic - odbicie od ścian
+        outside_x = (x < 0) | (x > bounds[0])
+        direction[outside_x] = np.pi - direction[outside_x]
+        outside_y = (y < 0) | (y > bounds[1])
+        direction[outside_y] = -direction[outside_y]
+
+        self.x[alive] = np.clip(x, 0, bounds[0])
+        self.y[alive] = np.clip(y, 0, bounds[1])
+        self.direction[alive] = direction
+
+    def compartment_codes(self, indices=slice(None)):
+        """Kody przedziałów wyliczone ze statusu i flagi exposed (narażony podatny -> EXPOSED)."""
+        status = self.status[indices]
+        return np.where(self.exposed[indices] & (status == SUSCEPTIBLE), EXPOSED, status).astype(np.int8)
+
+    def set_status(self, indices, status):
+        """Zmienia status osób i aktualizuje liczebności przedziałów."""
+        indices = np.unique(indices)
+        self.status[indices] = status
+        self.index.move(indices, self.compartment_codes(indices))
+
+    def set_exposed(self, indices, exposed):
+        """Zmienia flagę exposed osób i aktualizuje liczebności przedziałów."""
+        indices = np.unique(indices)
+        self.exposed[indices] = exposed
+        self.index.move(indices, self.compartment_codes(indices))
+
+    def rebuild_index(self):
+        """Odtwarza indeks przedziałów z tablic statusu (po zmianach stanu wykonanych z pominięciem set_status)."""
+        self.index = CompartmentIndex(self.compartment_codes(), len(COMPARTMENT_NAMES))
+
+    def members(self, compartment):
+        """Indeksy osób w przedziale - bez przeglądania całej populacji."""
+        return self.index.members(compartment)
+
+    def counts(self):
+        """Liczebności przedziałów: susceptible (bez exposed), infected, recovered, deceased, exposed."""
+        sizes = self.index.counts()
+        return {name: int(sizes[code]) for code, name in enumerate(COMPARTMENT_NAMES)}
+
+    def check_consistency(self):
+        """Sprawdza zgodność liczników z pełnym przeliczeniem populacji (tryb diagnostyczny)."""
+        self.index.check(self.compartment_codes())
@@ -0,0 +1,98 @@
+import numpy as np
+from simulation.rates import EXPOSED_TO_INFECTED, infection_probability
+
+class AggregateCompartments:
+    """Model SIR/SEIR oparty wyłącznie na liczebnościach przedziałów - koszt dnia nie zależy od N."""
+
+    def __init__(self, population_size, initial_infected, immunity_period, seir=False):
+        self.population_size = population_size
+        self.seir = seir
+        self.susceptible = population_size - initial_infected
+        self.exposed = initial_infected if seir else 0
+        self.infected = 0 if seir else initial_infected
+        self.deceased = 0
+        #Odporność bez wygasania (szczepienia oraz immunity_period <= 0)
+        self.permanently_immune = 0
+
+        #Bufor cykliczny kohort ozdrowieńców - slot wskazuje dzień powrotu do podatnych
+        self.immunity_period = immunity_period
+        self.waning = np.zeros(max(1, immunity_period), dtype=np.int64)
+        self.waning_total = 0
+        self.day = 0
+
+    @classmethod
+    def from_state(cls, state):
+        """Odtwarza model z get_state()."""
+        aggregate = cls(state["population_size"], 0, state["immunity_period"], state["seir"])
+        for name in ("susceptible", "exposed", "infected", "deceased", "permanently_immune", "waning_total", "day"):
+            setattr(aggregate, name, state[name])
+        aggregate.waning[:] = state["waning"]
+        return aggregate
+
+    def get_state(self):
+        """Liczebności przedziałów i bufor odporności jako typy Pythona (do zapisu w JSON)."""
+        state = {name: getattr(self, name) for name in (
+            "population_size", "seir", "immunity_period", "susceptible", "exposed", "infected",
+            "deceased", "permanently_immune", "waning_total", "day"
+        )}
+        state = {name: value.item() if isinstance(value, np.generic) else value for name, value in state.items()}
+        state["waning"] = self.waning.tolist()
+        return state
+
+    @property
+    def recovered(self):
+        return self.waning_total + self.permanently_immune
+
+    def vaccinate(self, vaccination_rate, effectiveness, rng):
+        """Szczepienia podatnych - odpowiednik DiseaseSimulation._apply_vaccinations."""
+        if vaccination_rate <= 0:
+            return
+        daily_vaccinations = min(int(vaccination_rate * self.susceptible / 100), self.susceptible)
+        if daily_vaccinations > 0:
+            protected = rng.binomial(daily_vaccinations, effectiveness)
+            self.susceptible -= protected
+            self.permanently_immune += protected
+
+    def step(self, beta, recovery_rate, mortality_rate, rng):
+        """Symuluje jeden dzień: zarażenia, przejście E->I, wyzdrowienia/zgony i utratę odporności."""
+        #Zarażanie - liczba nowych przypadków wśród podatnych
+        prob = infection_probability(beta, self.infected)
+        new_cases = rng.binomial(self.susceptible, prob) if prob > 0 else 0
+
+        #Przejście exposed -> infected (tylko osoby narażone przed dzisiejszym dniem)
+        onset = rng.binomial(self.exposed, EXPOSED_TO_INFECTED) if self.seir else 0
+
+        #Wyzdrowienia/zgony wśród chorych z początku dnia
+        deaths = rng.binomial(self.infected, mortality_rate)
+        recoveries = rng.binomial(self.infected - deaths, recovery_rate)
+
+        self.susceptible -= new_cases
+        if self.seir:
+            self.exposed += new_cases - onset
+            self.infected += onset - deaths - recoveries
+        else:
+            self.infected += new_cases - deaths - recoveries
+        self.deceased += deaths
+
+        #Utrata odporności - dzisiejsi ozdrowieńcy trafiają do kohorty wygasającej za immunity_period - 1 dni
+        if self.immunity_period <= 0:
+            self.permanently_immune += recoveries
+        else:
+            slot = self.day % self.immunity_period
+            self.waning[(slot + self.immunity_period - 1) % self.immunity_period] += recoveries
+            self.waning_total += recoveries
+            expired = int(self.waning[slot])
+            self.waning[slot] = 0
+            self.waning_total -= expired
+            self.susceptible += expired
+
+        self.day += 1
+
+    def counts(self):
+        return {
+            "susceptible": int(self.susceptible),
+            "infected": int(self.infected),
+            "recovered": int(self.recovered),
+            "deceased": int(self.deceased),
+            "exposed": int(self.exposed)
+        }
@@ -1,13 +1,95 @@
-import random
-from models.person import Person
+import functools
+import heapq
+import json
+import os
+import tempfile
+import numpy as np
+from config import SIMULATION_CONFIG
+from models.population_arrays import (
+    PopulationArrays, SUSCEPTIBLE, INFECTED, RECOVERED, DECEASED, EXPOSED, COMPARTMENT_NAMES
+)
+from simulation.spatial_grid import SpatialGrid
+from simulation.aggregate import AggregateCompartments
+from simulation.gillespie import GILLESPIE_ALGORITHMS, GillespieCompartments
+from simulation.ode import ODE_ALGORITHMS, OdeCompartments
+from simulation.social_network import create_network
+from simulation.random_streams import RandomStreams
+from simulation.profiling import create_profiler
+from simulation.vaccination import VaccinationCampaign
+from simulation.policies import PolicyEngine
+from simulation.fused import advance_population, numba_available
+from simulation.rates import EXPOSED_TO_INFECTED, contact_reduction, transmission_beta, infection_probability
+
+#Promień (w jednostkach przestrzeni), w którym możliwe jest zarażenie w modelu standardowym
+INFECTION_RADIUS = 5
+#Modele kontaktów algorytmu standardowego: zarażanie sąsiadów zależne od odległości lub dzienny budżet kontaktów
+CONTACT_MODELS = ("distance", "budget")
+
+#Parametry określające zapisany stan - nie mogą się zmienić po wczytaniu punktu kontrolnego
+STATE_CONFIG_KEYS = (
+    "population_size", "initial_infected", "algorithm", "model_resolution",
+    "network_topology", "network_rewire_prob", "network_edge_list"
+)
+
+def _json_default(value):
+    #Typy NumPy (np. z planu parametrów) zapisywane jako typy Pythona
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"nie można zapisać wartości typu {type(value).__name__}")
+
+def load_checkpoint_config(path):
+    """Konfiguracja zapisana w punkcie kontrolnym (bez wczytywania tablic osób)."""
+    with np.load(path) as data:
+        return json.loads(str(data["metadata"]))["config"]
+
+@functools.lru_cache(maxsize=1)
+def _read_checkpoint(path, modified, size):
+    #Przy rozgałęzianiu wielu scenariuszy z jednego pliku jest on czytany raz na proces
+    #(czas modyfikacji i rozmiar w kluczu - nadpisany plik jest wczytywany ponownie)
+    with np.load(path) as data:
+        return str(data["metadata"]), {name: data[name] for name in data.files if name != "metadata"}
+
+def checkpoint_overrides(config):
+    """Parametry różne od domyślnych, które mogą zmienić dalszy przebieg wczytanej symulacji."""
+    return {key: value for key, value in config.items()
+            if key not in STATE_CONFIG_KEYS and key != "resume" and value != SIMULATION_CONFIG.get(key)}
 
 class DiseaseSimulation:
-    def __init__(self, config):
-        self.config = config
-        self.population = []
+    def __init__(self, config, initialize=True):
+        #Polityki zmieniają parametry interwencji w trakcie przebiegu - na własnej kopii konfiguracji
+        self.config = dict(config) if config.get("policies") else config
+        #Osobne strumienie liczb losowych dla inicjalizacji, ruchu, transmisji i szczepień
+        self.random = RandomStreams(config.get("seed"))
+        #Pomiary czasu etapów dnia (domyślnie wyłączone - bez narzutu)
+        self.profiler = create_profiler(config)
+        self.population = PopulationArrays(0)
         self.stats_history = []
+        #Numer bieżącego dnia (niezależny od długości stats_history, które może przechowywać tylko ostatni dzień)
+        self.day = 0
+        #Ujścia wyników (np. pliki CSV/Parquet/Arrow, migawki osób) zapisujące statystyki na bieżąco
+        self.sinks = []
+        #Tryb zagregowany (tylko liczebności przedziałów) dla modeli SIR/SEIR
+        self.aggregate = None
+        #Płaszczyzna podzielona na kafelki liczone w osobnych procesach (algorytm standardowy, opcja "tiles")
+        self.tiles = None
+        #Kampania szczepień z dziennym limitem dawek (opcja "vaccination_campaign", zastępuje vaccination_rate)
+        self.campaign = None
+        #Polityki interwencji oceniane na granicy dni (opcja "policies", np. blokada z histerezą)
+        self.policies = PolicyEngine(config["policies"], self.config) if config.get("policies") else None
         self.simulation_algorithm = self._get_algorithm(config["algorithm"])
-        self.initialize_population()
+        if config.get("vaccination_campaign") is not None and self.simulation_algorithm in (
+            self.aggregate_algorithm, self.gillespie_algorithm, self.ode_algorithm, self.tiled_algorithm
+        ):
+            raise ValueError("kampania szczepień wymaga modelu z pojedynczymi osobami (bez podziału na kafelki)")
+        if config.get("contact_model", "distance") not in CONTACT_MODELS:
+            raise ValueError(f"nieznany model kontaktów: {config['contact_model']}")
+        if config.get("contact_model", "distance") == "budget" and self.simulation_algorithm != self.standard_algorithm:
+            raise ValueError("model kontaktów 'budget' wymaga algorytmu standardowego (bez podziału na kafelki)")
+        #Indeks przestrzenny sąsiadów - używany tylko przez algorytm standardowy
+        self.spatial_index = SpatialGrid(cell_size=INFECTION_RADIUS) if self.simulation_algorithm == self.standard_algorithm else None
+        #Bez inicjalizacji stan jest uzupełniany przez load_checkpoint
+        if initialize:
+            self.initialize_population()
     
     def _get_algorithm(self, algorithm_name):
         """Wybiera odpowiedni algorytm symulacji."""
@@ -17,201 +99,475 @@ class DiseaseSimulation:
             "SEIR": self.seir_algorithm,
             "network": self.network_algorithm
         }
+        if self._uses_aggregate_model():
+            return self.aggregate_algorithm
+        if algorithm_name in GILLESPIE_ALGORITHMS:
+            return self.gillespie_algorithm
+        if algorithm_name in ODE_ALGORITHMS:
+            return self.ode_algorithm
+        if algorithm_name == "standard" and self.config.get("tiles", 0) > 0:
+            return self.tiled_algorithm
         return algorithms.get(algorithm_name, self.standard_algorithm)
     
+    def _uses_aggregate_model(self):
+        """Czy symulacja działa na liczebnościach przedziałów zamiast na pojedynczych osobach."""
+        return self.config.get("model_resolution", "agent") == "aggregate" and self.config["algorithm"] in ("SIR", "SEIR")
+    
     def initialize_population(self):
-        #Tworzenie populacji
-        self.population = [Person(i) for i in range(self.config["population_size"])]
+        #W trybie zagregowanym nie tworzymy pojedynczych osób
+        if self._uses_aggregate_model():
+            self.aggregate = AggregateCompartments(
+                self.config["population_size"],
+                self.config["initial_infected"],
+                self.config["immunity_period"],
+                seir=self.config["algorithm"] == "SEIR"
+            )
+            self.record_stats()
+            return
+        if self.config["algorithm"] in GILLESPIE_ALGORITHMS:
+            self.aggregate = GillespieCompartments(
+                self.config["population_size"],
+                self.config["initial_infected"],
+                self.config["immunity_period"],
+                seir=GILLESPIE_ALGORITHMS[self.config["algorithm"]] == "SEIR"
+            )
+            self.record_stats()
+            return
+        if self.config["algorithm"] in ODE_ALGORITHMS:
+            self.aggregate = OdeCompartments(
+                self.config["population_size"],
+                self.config["initial_infected"],
+                seir=ODE_ALGORITHMS[self.config["algorithm"]] == "SEIR"
+            )
+            self.record_stats()
+            return
+        
+        #Tworzenie populacji w postaci tablic NumPy
+        self.population = PopulationArrays.random(self.config["population_size"], rng=self.random.initialization)
         
         #Losowe wybranie początkowo zarażonych osób
-        initially_infected = random.sample(self.population, self.config["initial_infected"])
-        for person in initially_infected:
-            if self.config["algorithm"] == "SEIR":
-                person.exposed = True
-                person.status = "susceptible"
-                person.exposure_days = 0
-            else:
-                person.status = "infected"
+        initially_infected = self.random.initialization.choice(len(self.population), self.config["initial_infected"], replace=False)
+        if self.config["algorithm"] == "SEIR":
+            self.population.set_exposed(initially_infected, True)
+            self.population.exposure_days[initially_infected] = 0
+        else:
+            self.population.set_status(initially_infected, INFECTED)
         
         #Jeśli używamy modelu sieciowego, stwórzmy połączenia
         if self.config["algorithm"] == "network":
             self._create_social_network()
         
+        if self.config.get("vaccination_campaign") is not None:
+            self.campaign = VaccinationCampaign(self.population, self.config["vaccination_campaign"], self.random.vaccination)
+        
+        if self.simulation_algorithm == self.tiled_algorithm:
+            self._create_tiles()
+        
         #Zapisanie początkowych statystyk
         self.record_stats()
     
     def _create_social_network(self):
         """Tworzy sieć kontaktów społecznych dla modelu sieciowego."""
-        #Dodaj atrybuty sieciowe do każdej osoby
-        for person in self.population:
-            person.connections = []
-        
-        #Generuj sieć małego świata - każdy ma stałą grupę kontaktów plus kilka losowych
-        avg_connections = self.config["contacts_per_day"]
-        for i, person in enumerate(self.population):
-            #Stali sąsiedzi (np. rodzina, współpracownicy)
-            for j in range(max(0, i-5), min(len(self.population), i+6)):
-                if i != j:
-                    person.connections.append(self.population[j])
-            
-            #Kilka losowych dalekich połączeń (znajomi, przypadkowi ludzie)
-            potential_connections = [p for p in self.population if p not in person.connections and p.id != person.id]
-            random_connections = random.sample(
-                potential_connections,
-                min(int(avg_connections * 0.3), len(potential_connections))
-            )
-            person.connections.extend(random_connections)
+        #Domyślnie sieć małego świata - każdy ma stałą grupę kontaktów plus kilka losowych
+        self.population.network = create_network(self.config, len(self.population), self.random.initialization)
     
-    def run_simulation(self):
-        for day in range(self.config["simulation_days"]):
-            self.simulate_day()
-            self.record_stats()
-            print(f"Dzień {day+1} zakończony")
+    def _create_tiles(self, random_states=None):
+        """Przenosi populację do pamięci współdzielonej i dzieli płaszczyznę na kafelki procesów."""
+        #multiprocessing jest wczytywany tylko w trybie kafelków (szybszy start pozostałych uruchomień)
+        from simulation.tiles import TiledDomain
+        self.tiles = TiledDomain(self.population, self.config["tiles"], self.random.seed_sequence,
+                                 INFECTION_RADIUS, random_states=random_states)
+    
+    def run_simulation(self, verbose=True):
+        checkpoint_path = self.config.get("checkpoint_path")
+        checkpoint_interval = self.config.get("checkpoint_interval", 0)
+        #Połączone jądro wielu dni (opcja "fused_kernel") liczy od razu całe odcinki między punktami kontrolnymi
+        fused = self.config.get("fused_kernel") and self._can_fuse(self.config["fused_kernel"])
+        #Po wczytaniu punktu kontrolnego symulacja jest kontynuowana od zapisanego dnia
+        while self.day < self.config["simulation_days"]:
+            day = self.day
+            if fused:
+                days = self.config["simulation_days"] - day
+                if checkpoint_path and checkpoint_interval > 0:
+                    days = min(days, checkpoint_interval - day % checkpoint_interval)
+                self.advance(days)
+            else:
+                self.simulate_day()
+                self.record_stats()
+            if verbose:
+                for completed in range(day, self.day):
+                    print(f"Dzień {completed+1} zakończony")
+            if checkpoint_path and checkpoint_interval > 0 and self.day % checkpoint_interval == 0:
+                self.save_checkpoint(checkpoint_path)
         
+        if checkpoint_path:
+            self.save_checkpoint(checkpoint_path)
+        self.close_sinks()
+        if self.tiles is not None:
+            self.tiles.close()
         return self.stats_history
     
+    def add_sink(self, sink):
+        """Dodaje ujście wyników - od razu otrzymuje bieżący dzień, a potem statystyki każdego kolejnego."""
+        self.sinks.append(sink)
+        if self.stats_history:
+            sink.write(self.stats_history[-1], self)
+    
+    def close_sinks(self):
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+    
+    def save_checkpoint(self, path):
+        """Zapisuje pełny stan symulacji do nieskompresowanego pliku .npz.
+        
+        Tablice osób, sieć kontaktów i indeks przedziałów trafiają do osobnych tablic,
+        a konfiguracja, stan generatorów, statystyki i model zagregowany - do metadanych JSON.
+        Zapis jest atomowy - przerwanie go nie uszkadza poprzedniego punktu kontrolnego.
+        """
+        if self.tiles is not None:
+            #Procesy kafelków zmieniają statusy z pominięciem indeksu przedziałów
+            self.population.rebuild_index()
+        arrays = self.population.get_state() if self.aggregate is None else {}
+        if self.campaign is not None:
+            arrays.update({f"campaign_{name}": value for name, value in self.campaign.get_state().items()})
+        metadata = {
+            "config": self.config,
+            "random": self.random.get_state(),
+            "day": self.day,
+            "stats_history": self.stats_history,
+            "aggregate": self.aggregate.get_state() if self.aggregate is not None else None,
+            "tiles_random": self.tiles.random_states if self.tiles is not None else None,
+            "policies": self.policies.get_state() if self.policies is not None else None
+        }
+        arrays["metadata"] = np.array(json.dumps(metadata, default=_json_default))
+        
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        with os.fdopen(handle, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temporary, path)
+    
+    @classmethod
+    def load_checkpoint(cls, path, overrides=None):
+        """Odtwarza symulację z punktu kontrolnego.
+        
+        overrides zmienia parametry dalszego przebiegu (np. scenariusz interwencji lub liczbę dni).
+        Z zapisanym ziarnem przebieg jest kontynuowany dokładnie tak, jak bez przerwy; inne ziarno
+        w overrides rozpoczyna osobną gałąź losowań (rozgałęzianie wielu scenariuszy z jednego stanu).
+        """
+        overrides = overrides or {}
+        stat = os.stat(path)
+        metadata, state = _read_checkpoint(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        metadata = json.loads(metadata)
+        
+        config = metadata["config"]
+        changed = [key for key in STATE_CONFIG_KEYS if key in overrides and overrides[key] != config.get(key)]
+        if changed:
+            raise ValueError(f"parametrów {', '.join(changed)} nie można zmienić po wczytaniu punktu kontrolnego")
+        
+        simulation = cls(dict(config, **overrides), initialize=False)
+        if simulation.config.get("seed") == config.get("seed"):
+            simulation.random.set_state(metadata["random"])
+        simulation.stats_history = metadata["stats_history"]
+        simulation.day = metadata["day"]
+        if simulation.policies is not None and metadata.get("policies") is not None:
+            simulation.policies.set_state(metadata["policies"])
+        if metadata["aggregate"] is not None:
+            engines = {"gillespie": GillespieCompartments, "ode": OdeCompartments}
+            engine = engines.get(metadata["aggregate"].get("engine"), AggregateCompartments)
+            simulation.aggregate = engine.from_state(metadata["aggregate"])
+        else:
+            simulation.population = PopulationArrays.from_state(state)
+            campaign = simulation.config.get("vaccination_campaign")
+            if campaign is not None and "campaign_order" in state:
+                campaign_state = {key[len("campaign_"):]: value for key, value in state.items() if key.startswith("campaign_")}
+                simulation.campaign = VaccinationCampaign.from_state(simulation.population, campaign, campaign_state)
+            elif campaign is not None:
+                #Kampania dodana przy wznowieniu (np. scenariusz rozgałęziony z punktu kontrolnego)
+                simulation.campaign = VaccinationCampaign(simulation.population, campaign, simulation.random.vaccination)
+            if simulation.simulation_algorithm == simulation.tiled_algorithm:
+                #Stan generatorów kafelków tylko przy kontynuacji z tym samym ziarnem i podziałem
+                random_states = metadata.get("tiles_random")
+                same_run = simulation.config.get("seed") == config.get("seed") and simulation.config["tiles"] == config.get("tiles")
+                simulation._create_tiles(random_states if same_run else None)
+        return simulation
+    
     def simulate_day(self):
         """Wykonuje symulację jednego dnia według wybranego algorytmu."""
-        #Najpierw aktualizacja pozycji osób
-        for person in self.population:
-            person.move()
+        profiler = self.profiler
+        profiler.day = self.day + 1
+        agents = self.config["population_size"]
+        with profiler.phase("day", agents=agents):
+            #Polityki interwencji na podstawie liczebności z końca poprzedniego dnia
+            if self.policies is not None:
+                with profiler.phase("policies", agents=len(self.policies.policies)):
+                    self.policies.evaluate(self.day, self.stats_history[-1], self.config)
+            
+            #Najpierw aktualizacja pozycji osób (jednym przebiegiem dla całej populacji)
+            if self.aggregate is None and self.tiles is None:
+                with profiler.phase("movement", agents=agents):
+                    self.population.move(rng=self.random.movement)
+            
+            #Przebudowa indeksu przestrzennego po zmianie pozycji
+            if self.spatial_index is not None:
+                with profiler.phase("spatial_index", agents=agents):
+                    self.spatial_index.rebuild(self.population.x, self.population.y)
+            
+            #Następnie uruchomienie algorytmu symulacji
+            with profiler.phase("algorithm", agents=agents):
+                self.simulation_algorithm()
+            
+            #Diagnostyczne sprawdzenie liczników przedziałów (np. w testach)
+            if self.config.get("debug_consistency_checks", False) and self.aggregate is None:
+                with profiler.phase("consistency_check", agents=agents):
+                    if self.tiles is not None:
+                        self.tiles.check_consistency()
+                    else:
+                        self.population.check_consistency()
+        
+        self.day += 1
+    
+    def _can_fuse(self, backend="auto"):
+        """Czy dni można liczyć połączonym jądrem - model SIR/SEIR z pojedynczymi osobami bez dodatków zależnych od dnia.
+
+        "auto" wybiera jądro tylko z pakietem numba - wersja NumPy nie jest szybsza od liczenia dzień po dniu,
+        więc jest używana wyłącznie na wyraźne żądanie (backend "numpy").
+        """
+        if backend == "auto" and not numba_available():
+            return False
+        return (self.simulation_algorithm in (self.sir_algorithm, self.seir_algorithm) and self.campaign is None
+                and self.policies is None and not self.sinks and not self.config.get("debug_consistency_checks", False))
+    
+    def advance(self, days=1, out=None, backend=None):
+        """Symuluje kolejne days dni i zapisuje liczebności końca każdego dnia do out (days x COMPARTMENT_NAMES).
+        
+        Modele SIR/SEIR z pojedynczymi osobami są liczone połączonym jądrem (simulation.fused: numba,
+        a z backend="numpy" wektorowo NumPy) - przebieg jest powtarzalny dla danego ziarna, ale korzysta
+        z innych losowań niż simulate_day. Bez pakietu numba ("auto") i w pozostałych konfiguracjach
+        dni są liczone dzień po dniu.
+        """
+        if out is None:
+            out = np.empty((days, len(COMPARTMENT_NAMES)), dtype=np.int64)
+        out = out[:days]
+        backend = backend or self.config.get("fused_kernel") or "auto"
+        if self._can_fuse(backend):
+            with self.profiler.phase("fused_days", agents=self.config["population_size"] * days):
+                if advance_population(self.population, self.config, out, self.random, backend) == "numba":
+                    #Jądro numba zmienia statusy z pominięciem indeksu przedziałów
+                    self.population.rebuild_index()
+            for counts in out:
+                self.day += 1
+                stats = dict(zip(COMPARTMENT_NAMES, counts.tolist()), day=self.day)
+                if self.config.get("keep_history", True):
+                    self.stats_history.append(stats)
+                else:
+                    self.stats_history = [stats]
+        else:
+            for row in out:
+                self.simulate_day()
+                self.record_stats()
+                row[:] = [self.stats_history[-1][name] for name in COMPARTMENT_NAMES]
+        return out
+    
+    def _recover_or_die(self, infected):
+        """Aktualizuje stan chorych: upływ dni choroby, zgony i wyzdrowienia."""
+        pop = self.population
+        pop.days_infected[infected] += 1
+        dies = self.random.transmission.random(len(infected)) < self.config["mortality_rate"]
+        recovers = ~dies & (self.random.transmission.random(len(infected)) < self.config["recovery_rate"])
+        pop.set_status(infected[dies], DECEASED)
+        recovered = infected[recovers]
+        pop.set_status(recovered, RECOVERED)
+        pop.immune_days[recovered] = self.config["immunity_period"]
+        pop.days_infected[recovered] = 0
+    
+    def _wane_immunity(self):
+        """Odlicza dni odporności i przywraca podatność po ich upływie."""
+        pop = self.population
+        with self.profiler.phase("immunity", agents=pop.index.count(RECOVERED)):
+            recovered = pop.members(RECOVERED)
+            recovered = recovered[pop.immune_days[recovered] > 0]
+            pop.immune_days[recovered] -= 1
+            expired = recovered[pop.immune_days[recovered] == 0]
+            pop.set_status(expired, SUSCEPTIBLE)
+            if self.campaign is not None:
+                self.campaign.requeue(expired)
+    
+    def _contact_budget_transmission(self, contacts_today):
+        """Zarażanie w modelu budżetu kontaktów (config["contact_model"] == "budget").
+
+        Każdy chory losuje dzienną liczbę kontaktów z rozkładu Poissona o średniej contacts_today
+        przeskalowanej przez jego sociability (względem średniej w populacji). contact_dispersion > 0
+        dodaje do średniej szum gamma o takim kształcie - małe wartości dają nieliczne osoby
+        o bardzo wielu kontaktach (superroznosiciele). Partnerzy są losowani spośród osób
+        w promieniu INFECTION_RADIUS (jak w modelu odległości), z szansą proporcjonalną do ich sociability; każdy kontakt z osobą podatną zaraża
+        z prawdopodobieństwem infection_rate. Wszyscy chorzy są losowani naraz (wektorowo).
+        """
+        pop = self.population
+        infected = pop.members(INFECTED)
+        with self.profiler.phase("transmission", agents=len(infected)):
+            mean_contacts = contacts_today * pop.sociability[infected] / max(pop.sociability.mean(), 1e-12)
+            dispersion = self.config.get("contact_dispersion", 0.0)
+            if dispersion > 0:
+                mean_contacts = mean_contacts * self.random.transmission.gamma(dispersion, 1 / dispersion, len(infected))
+            contacts = self.random.transmission.poisson(mean_contacts)
+            
+            #Zmarli nie mają kontaktów - waga 0 w losowaniu partnerów
+            weights = np.where(pop.status != DECEASED, pop.sociability, 0.0)
+            source, partners = self.spatial_index.sample_neighbours(
+                pop.x[infected], pop.y[infected], contacts, weights, self.random.transmission, INFECTION_RADIUS
+            )
+            partners = partners[(partners != infected[source]) & (pop.status[partners] == SUSCEPTIBLE)]
+            newly_infected = partners[self.random.transmission.random(len(partners)) < self.config["infection_rate"]]
+            pop.set_status(newly_infected, INFECTED)
         
-        #Następnie uruchomienie algorytmu symulacji
-        self.simulation_algorithm()
+        #Zarażeni dziś chorują od następnego dnia
+        with self.profiler.phase("recovery", agents=len(infected)):
+            self._recover_or_die(infected)
     
     def standard_algorithm(self):
         """Standardowy algorytm symulacji oparty na kontaktach i odległościach."""
         #Najpierw szczepienia, jeśli są włączone
         self._apply_vaccinations()
         
-        #Symulacja interakcji między ludźmi
-        for person in self.population:
-            if person.status == "infected":
-                #Zarażona osoba może zarażać innych
-                contacts_today = self.config["contacts_per_day"]
-                if self.config["social_distancing"]:
-                    contacts_today = int(contacts_today * 0.5)  #Redukcja kontaktów
-                if self.config.get("quarantine_infected", False):
-                    contacts_today = int(contacts_today * 0.2)  #Dalsza redukcja dla kwarantanny
-                
-                #Kontakt zależy od odległości między osobami
-                for other in self.population:
-                    if other.status == "susceptible" and other.id != person.id:
-                        #Obliczenie odległości między osobami
-                        distance = ((person.x - other.x)**2 + (person.y - other.y)**2)**0.5
+        pop = self.population
+        contacts_today = self.config["contacts_per_day"]
+        if self.config["social_distancing"]:
+            contacts_today = int(contacts_today * 0.5)  #Redukcja kontaktów
+        if self.config.get("quarantine_infected", False):
+            contacts_today = int(contacts_today * 0.2)  #Dalsza redukcja dla kwarantanny
+        
+        #Osoby z odpornością na początku dnia (zarażeni dziś wyzdrowiali nie tracą jeszcze dnia odporności)
+        recovered = pop.members(RECOVERED)
+        
+        if self.config.get("contact_model", "distance") == "budget":
+            self._contact_budget_transmission(contacts_today)
+        else:
+            with self.profiler.phase("transmission", agents=pop.index.count(INFECTED)):
+                #Chorzy przetwarzani w kolejności indeksów - zarażeni dziś przez osobę o niższym
+                #indeksie mogą jeszcze tego samego dnia zarażać innych
+                pending = list(np.sort(pop.members(INFECTED)))
+                while pending:
+                    i = heapq.heappop(pending)
+                    
+                    #Kontakt zależy od odległości między osobami - sprawdzamy tylko sąsiadów z siatki
+                    others = self.spatial_index.query_radius(pop.x[i], pop.y[i], INFECTION_RADIUS)
+                    others = others[(pop.status[others] == SUSCEPTIBLE) & (others != i)]
+                    if len(others) > 0:
+                        distance = np.sqrt((pop.x[others] - pop.x[i])**2 + (pop.y[others] - pop.y[i])**2)
                         
                         #Prawdopodobieństwo zarażenia maleje z kwadratem odległości
                         infection_chance = self.config["infection_rate"] * (10 / (distance + 1))**2
-                        
-                        if distance < 5 and random.random() < infection_chance:
-                            other.status = "infected"
-                
-                #Aktualizacja stanu choroby
-                person.days_infected += 1
-                
-                #Możliwość wyzdrowienia lub śmierci
-                if random.random() < self.config["mortality_rate"]:
-                    person.status = "deceased"
-                elif random.random() < self.config["recovery_rate"]:
-                    person.status = "recovered"
-                    person.immune_days = self.config["immunity_period"]
-                    person.days_infected = 0
+                        newly_infected = others[self.random.transmission.random(len(others)) < infection_chance]
+                        pop.set_status(newly_infected, INFECTED)
+                        for j in newly_infected[newly_infected > i]:
+                            heapq.heappush(pending, j)
+                    
+                    #Aktualizacja stanu choroby - możliwość wyzdrowienia lub śmierci
+                    self._recover_or_die(np.array([i]))
             
-            #Aktualizacja odporności
-            elif person.status == "recovered":
-                if person.immune_days > 0:
-                    person.immune_days -= 1
-                else:
-                    person.status = "susceptible"  #Utrata odporności
+        #Aktualizacja odporności
+        with self.profiler.phase("immunity", agents=len(recovered)):
+            expired = recovered[pop.immune_days[recovered] == 0]
+            pop.immune_days[recovered[pop.immune_days[recovered] > 0]] -= 1
+            pop.set_status(expired, SUSCEPTIBLE)  #Utrata odporności
+            if self.campaign is not None:
+                self.campaign.requeue(expired)
     
     def sir_algorithm(self):
         """Implementacja klasycznego modelu SIR."""
         #Model SIR (Susceptible-Infected-Recovered)
         self._apply_vaccinations()
-        N = len(self.population)
-        susceptible = [p for p in self.population if p.status == "susceptible"]
-        infected = [p for p in self.population if p.status == "infected"]
-
-        beta = self.config["infection_rate"] * self.config["contacts_per_day"] / N
-        gamma = self.config["recovery_rate"]
-
-        if self.config["social_distancing"]:
-            beta *= 0.5
-        if self.config.get("quarantine_infected", False):
-            beta *= 0.2
-
+        pop = self.population
+        N = len(pop)
+        susceptible = pop.members(SUSCEPTIBLE)
+        infected = pop.members(INFECTED)
+        
+        beta = transmission_beta(self.config, N)
+        
         #Zarażanie
-        for person in susceptible:
-            prob = 1 - (1 - beta) ** len(infected)
-            if random.random() < prob and len(infected) > 0:
-                person.status = "infected"
-
+        if len(infected) > 0:
+            with self.profiler.phase("transmission", agents=len(susceptible)):
+                prob = infection_probability(beta, len(infected))
+                pop.set_status(susceptible[self.random.transmission.random(len(susceptible)) < prob], INFECTED)
+        
         #Wyzdrowienia/zgony
-        for person in infected:
-            person.days_infected += 1
-            if random.random() < self.config["mortality_rate"]:
-                person.status = "deceased"
-            elif random.random() < gamma:
-                person.status = "recovered"
-                person.immune_days = self.config["immunity_period"]
-                person.days_infected = 0
-
+        with self.profiler.phase("recovery", agents=len(infected)):
+            self._recover_or_die(infected)
+        
         #Utrata odporności
-        for person in self.population:
-            if person.status == "recovered" and person.immune_days > 0:
-                person.immune_days -= 1
-                if person.immune_days == 0:
-                    person.status = "susceptible"
+        self._wane_immunity()
     
     def seir_algorithm(self):
         """Implementacja modelu SEIR z dodatkową fazą ekspozycji."""
         #Model SEIR (Susceptible-Exposed-Infected-Recovered)
         self._apply_vaccinations()
-        N = len(self.population)
-        susceptible = [p for p in self.population if p.status == "susceptible" and not p.exposed]
-        exposed = [p for p in self.population if p.exposed]
-        infected = [p for p in self.population if p.status == "infected"]
-
-        beta = self.config["infection_rate"] * self.config["contacts_per_day"] / N
-        alpha = 0.2  #przejście exposed->infected
-        gamma = self.config["recovery_rate"]
-
-        if self.config["social_distancing"]:
-            beta *= 0.5
-        if self.config.get("quarantine_infected", False):
-            beta *= 0.2
-
+        pop = self.population
+        N = len(pop)
+        susceptible = pop.members(SUSCEPTIBLE)
+        exposed = pop.members(EXPOSED)
+        infected = pop.members(INFECTED)
+        
+        beta = transmission_beta(self.config, N)
+        alpha = EXPOSED_TO_INFECTED  #przejście exposed->infected
+        
         #Zarażanie (susceptible -> exposed)
-        for person in susceptible:
-            prob = 1 - (1 - beta) ** len(infected)
-            if random.random() < prob and len(infected) > 0:
-                person.exposed = True
-                person.exposure_days = 0
-
+        if len(infected) > 0:
+            with self.profiler.phase("transmission", agents=len(susceptible)):
+                prob = infection_probability(beta, len(infected))
+                newly_exposed = susceptible[self.random.transmission.random(len(susceptible)) < prob]
+                pop.set_exposed(newly_exposed, True)
+                pop.exposure_days[newly_exposed] = 0
+        
         #Przejście exposed -> infected
-        for person in exposed:
-            person.exposure_days += 1
-            if random.random() < alpha:
-                person.exposed = False
-                person.status = "infected"
-                person.days_infected = 0
-
+        with self.profiler.phase("incubation", agents=len(exposed)):
+            pop.exposure_days[exposed] += 1
+            onset = exposed[self.random.transmission.random(len(exposed)) < alpha]
+            pop.exposed[onset] = False
+            pop.set_status(onset, INFECTED)
+            pop.days_infected[onset] = 0
+        
         #Wyzdrowienia/zgony
-        for person in infected:
-            person.days_infected += 1
-            if random.random() < self.config["mortality_rate"]:
-                person.status = "deceased"
-            elif random.random() < gamma:
-                person.status = "recovered"
-                person.immune_days = self.config["immunity_period"]
-                person.days_infected = 0
-
+        with self.profiler.phase("recovery", agents=len(infected)):
+            self._recover_or_die(infected)
+        
         #Utrata odporności
-        for person in self.population:
-            if person.status == "recovered" and person.immune_days > 0:
-                person.immune_days -= 1
-                if person.immune_days == 0:
-                    person.status = "susceptible"
+        self._wane_immunity()
+    
+    def aggregate_algorithm(self):
+        """Model SIR/SEIR na liczebnościach przedziałów - losowania dwumianowe zamiast pojedynczych osób."""
+        with self.profiler.phase("vaccination"):
+            self.aggregate.vaccinate(self.config["vaccination_rate"], self.config["vaccination_effectiveness"], self.random.vaccination)
+        with self.profiler.phase("transmission"):
+            self.aggregate.step(
+                transmission_beta(self.config, self.config["population_size"]),
+                self.config["recovery_rate"],
+                self.config["mortality_rate"],
+                self.random.transmission
+            )
+    
+    def gillespie_algorithm(self):
+        """Model SIR/SEIR liczony zdarzeniami w czasie ciągłym (Gillespie lub tau-leaping), statystyki co dzień."""
+        with self.profiler.phase("vaccination"):
+            self.aggregate.vaccinate(self.config["vaccination_rate"], self.config["vaccination_effectiveness"], self.random.vaccination)
+        with self.profiler.phase("transmission"):
+            self.aggregate.step(
+                transmission_beta(self.config, self.config["population_size"]),
+                self.config["recovery_rate"],
+                self.config["mortality_rate"],
+                self.random.transmission,
+                tau=self.config.get("tau_leap", 0.0)
+            )
+    
+    def ode_algorithm(self):
+        """Deterministyczny model średniopolowy SIR/SEIR (RK4) - szczepienia są częścią równań."""
+        with self.profiler.phase("transmission"):
+            self.aggregate.step(self.config)
+    
+    def tiled_algorithm(self):
+        """Algorytm standardowy (razem z ruchem osób) liczony równolegle w kafelkach płaszczyzny."""
+        with self.profiler.phase("tiles", agents=len(self.population)):
+            self.tiles.simulate_day(self.config)
     
     def network_algorithm(self):
         """Implementacja modelu opartego na sieci społecznej."""
@@ -220,76 +576,81 @@ class DiseaseSimulation:
         #Najpierw szczepienia, jeśli są włączone
         self._apply_vaccinations()
         
-        #Propagacja infekcji przez sieć kontaktów
-        newly_infected = []
-        for person in [p for p in self.population if p.status == "infected"]:
-            #Modyfikatory kontaktów
-            contact_reduction = 1.0
-            if self.config["social_distancing"]:
-                contact_reduction *= 0.5
-            if self.config.get("quarantine_infected", False):
-                contact_reduction *= 0.2
+        pop = self.population
+        network = pop.network
+        infected = pop.members(INFECTED)
+        
+        #Modyfikatory kontaktów
+        reduction = contact_reduction(self.config)
+        
+        with self.profiler.phase("transmission", agents=len(infected)):
+            #Zebranie krawędzi wszystkich chorych z tablic CSR - wiersz r to kontakty osoby infected[r]
+            starts = network.indptr[infected]
+            degree = network.indptr[infected + 1] - starts
+            row_offsets = np.cumsum(degree) - degree
+            row = np.repeat(np.arange(len(infected)), degree)
+            edge_offsets = np.arange(len(row)) - row_offsets[row]
+            contacts = network.indices[starts[row] + edge_offsets]
             
-            #Określenie liczby kontaktów danego dnia
-            daily_contacts = int(len(person.connections) * contact_reduction)
-            if daily_contacts > 0:
-                contacts_today = random.sample(person.connections, daily_contacts)
-                
-                #Próba zarażenia kontaktów
-                for contact in contacts_today:
-                    if contact.status == "susceptible":
-                        #Uwzględnienie odległości fizycznej
-                        distance = ((person.x - contact.x)**2 + (person.y - contact.y)**2)**0.5
-                        infection_chance = self.config["infection_rate"] * (10 / (distance + 1))**2
-                        
-                        if random.random() < infection_chance:
-                            newly_infected.append(contact)
+            #Określenie liczby kontaktów danego dnia - losowy wybór int(stopień * redukcja) kontaktów bez powtórzeń
+            daily_contacts = (degree * reduction).astype(np.int64)
+            if reduction < 1.0:
+                order = np.lexsort((self.random.transmission.random(len(row)), row))
+                rank = np.empty(len(row), dtype=np.int64)
+                rank[order] = edge_offsets
+                chosen = rank < daily_contacts[row]
+                row, contacts = row[chosen], contacts[chosen]
             
-            #Aktualizacja stanu choroby
-            person.days_infected += 1
-            if random.random() < self.config["mortality_rate"]:
-                person.status = "deceased"
-            elif random.random() < self.config["recovery_rate"]:
-                person.status = "recovered"
-                person.immune_days = self.config["immunity_period"]
-                person.days_infected = 0
+            #Próba zarażenia kontaktów (podatnych) z uwzględnieniem odległości fizycznej
+            susceptible = pop.status[contacts] == SUSCEPTIBLE
+            row, contacts = row[susceptible], contacts[susceptible]
+            source = infected[row]
+            distance = np.sqrt((pop.x[source] - pop.x[contacts])**2 + (pop.y[source] - pop.y[contacts])**2)
+            infection_chance = self.config["infection_rate"] * (10 / (distance + 1))**2
+            newly_infected = contacts[self.random.transmission.random(len(contacts)) < infection_chance]
+        
+        #Aktualizacja stanu choroby
+        with self.profiler.phase("recovery", agents=len(infected)):
+            self._recover_or_die(infected)
         
         #Zaraźmy nowo zainfekowane osoby
-        for person in newly_infected:
-            person.status = "infected"
+        pop.set_status(newly_infected, INFECTED)
         
         #Aktualizacja odporności
-        for person in self.population:
-            if person.status == "recovered" and person.immune_days > 0:
-                person.immune_days -= 1
-                if person.immune_days == 0:
-                    person.status = "susceptible"
+        self._wane_immunity()
     
     def _apply_vaccinations(self):
         """Stosuje szczepienia do podatnej populacji."""
-        if self.config["vaccination_rate"] > 0:
-            susceptible = [p for p in self.population if p.status == "susceptible"]
-            daily_vaccinations = int(self.config["vaccination_rate"] * len(susceptible) / 100)
+        if self.campaign is not None:
+            with self.profiler.phase("vaccination", agents=self.campaign.settings["daily_doses"]):
+                self.campaign.apply(self.population, self.day, self.config["vaccination_effectiveness"], self.random.vaccination)
+        elif self.config["vaccination_rate"] > 0:
+            pop = self.population
+            susceptible_count = pop.index.count(SUSCEPTIBLE)
+            daily_vaccinations = int(self.config["vaccination_rate"] * susceptible_count / 100)
             
             if daily_vaccinations > 0:
-                vaccinated = random.sample(susceptible, min(daily_vaccinations, len(susceptible)))
-                for person in vaccinated:
+                with self.profiler.phase("vaccination", agents=daily_vaccinations):
+                    vaccinated = pop.index.sample(SUSCEPTIBLE, min(daily_vaccinations, susceptible_count), self.random.vaccination)
                     #Skuteczność szczepienia
-                    if random.random() < self.config["vaccination_effectiveness"]:
-                        person.status = "recovered"
-                        person.immune_days = 10000  #Długotrwała odporność szczepionkowa
+                    vaccinated = vaccinated[self.random.vaccination.random(len(vaccinated)) < self.config["vaccination_effectiveness"]]
+                    pop.set_status(vaccinated, RECOVERED)
+                    pop.immune_days[vaccinated] = 10000  #Długotrwała odporność szczepionkowa
     
     def record_stats(self):
-        susceptible = sum(1 for p in self.population if p.status == "susceptible" and not getattr(p, "exposed", False))
-        infected = sum(1 for p in self.population if p.status == "infected")
-        recovered = sum(1 for p in self.population if p.status == "recovered")
-        deceased = sum(1 for p in self.population if p.status == "deceased")
-        exposed = sum(1 for p in self.population if getattr(p, "exposed", False))
-        self.stats_history.append({
-            "susceptible": susceptible,
-            "infected": infected,
-            "recovered": recovered,
-            "deceased": deceased,
-            "exposed": exposed,
-            "day": len(self.stats_history)
-        })
+        with self.profiler.phase("stats", agents=self.config["population_size"]):
+            if self.aggregate is not None:
+                stats = self.aggregate.counts()
+            elif self.tiles is not None:
+                stats = self.tiles.counts()
+            else:
+                stats = self.population.counts()
+            stats["day"] = self.day
+            #Bez pełnej historii pamięć nie rośnie z liczbą dni - wyniki trafiają do ujść
+            if self.config.get("keep_history", True):
+                self.stats_history.append(stats)
+            else:
+                self.stats_history = [stats]
+        with self.profiler.phase("output", agents=len(self.sinks)):
+            for sink in self.sinks:
+                sink.write(stats, self)
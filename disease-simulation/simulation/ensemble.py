@@ -0,0 +1,85 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from models.population_arrays import COMPARTMENT_NAMES
+from simulation.disease_simulation import DiseaseSimulation, checkpoint_overrides
+
+def stats_to_array(stats_history):
+    """Zamienia stats_history na tablicę (dni x przedziały) w kolejności COMPARTMENT_NAMES."""
+    return np.array([[stats[name] for name in COMPARTMENT_NAMES] for stats in stats_history], dtype=np.int64)
+
+def run_replicate(config, seed):
+    """Uruchamia jedną niezależną symulację z własnym ziarnem (także w procesie roboczym).
+
+    Z kluczem "resume" powtórzenie jest gałęzią wyprowadzoną z zapisanego punktu kontrolnego.
+    """
+    #Powtórzenia nie nadpisują wspólnego pliku punktu kontrolnego i potrzebują pełnej historii statystyk
+    settings = {"seed": seed, "checkpoint_path": None, "keep_history": True}
+    config = dict(config, **settings)
+    if config.get("resume"):
+        simulation = DiseaseSimulation.load_checkpoint(config["resume"], dict(checkpoint_overrides(config), **settings))
+    else:
+        simulation = DiseaseSimulation(config)
+    return stats_to_array(simulation.run_simulation(verbose=False))
+
+class EnsembleResult:
+    """Trajektorie wszystkich powtórzeń: tablica (powtórzenia x dni x przedziały) od dnia start_day."""
+
+    def __init__(self, trajectories, seeds, start_day=0):
+        self.trajectories = trajectories
+        self.seeds = seeds
+        self.start_day = start_day
+
+    def quantile_bands(self, quantiles=(0.05, 0.5, 0.95)):
+        """Pasma kwantyli dla każdego przedziału: słownik nazwa -> tablica (kwantyle x dni)."""
+        bands = np.quantile(self.trajectories, quantiles, axis=0)
+        return {name: bands[:, :, k] for k, name in enumerate(COMPARTMENT_NAMES)}
+
+    def mean(self):
+        means = self.trajectories.mean(axis=0)
+        return {name: means[:, k] for k, name in enumerate(COMPARTMENT_NAMES)}
+
+class EnsembleRunner:
+    """Uruchamia wiele niezależnych symulacji (Monte Carlo) w puli procesów."""
+
+    def __init__(self, config, replicates, workers=None, seed=None):
+        self.config = dict(config)
+        self.replicates = replicates
+        self.workers = workers or os.cpu_count() or 1
+        #Każde powtórzenie dostaje własne ziarno wyprowadzone z jednego ziarna głównego
+        children = np.random.SeedSequence(seed).spawn(replicates)
+        self.seeds = [int(child.generate_state(1)[0]) for child in children]
+
+    def iter_results(self):
+        """Zwraca (numer powtórzenia, trajektoria) w kolejności zakończenia obliczeń."""
+        if self.workers == 1:
+            for replicate, seed in enumerate(self.seeds):
+                yield replicate, run_replicate(self.config, seed)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(run_replicate, self.config, seed): replicate
+                for replicate, seed in enumerate(self.seeds)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def run(self, progress=None):
+        """Uruchamia wszystkie powtórzenia i zbiera trajektorie do wspólnej tablicy.
+
+        Powtórzenia wznowione z punktu kontrolnego zapisanego bez historii (keep_history=False) zaczynają
+        się od dnia punktu kontrolnego - tablica ma wtedy simulation_days - start_day + 1 dni.
+        """
+        #Liczba dni znana dopiero z pierwszej trajektorii (wszystkie powtórzenia startują z tego samego dnia)
+        trajectories = np.zeros((self.replicates, self.config["simulation_days"] + 1, len(COMPARTMENT_NAMES)), dtype=np.int64)
+        for done, (replicate, trajectory) in enumerate(self.iter_results(), start=1):
+            if done == 1:
+                trajectories = np.zeros((self.replicates,) + trajectory.shape, dtype=np.int64)
+            trajectories[replicate] = trajectory
+            if progress is not None:
+                progress(done, self.replicates)
+        start_day = self.config["simulation_days"] - trajectories.shape[1] + 1
+        return EnsembleResult(trajectories, self.seeds, start_day)
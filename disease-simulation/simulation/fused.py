@@ -0,0 +1,235 @@
+import importlib.util
+import math
+
+import numpy as np
+from models.population_arrays import (
+    SUSCEPTIBLE, INFECTED, RECOVERED, DECEASED, EXPOSED, COMPARTMENT_NAMES,
+    DIRECTION_CHANGE_PROB, MAX_ANGLE_CHANGE, SPEED_FACTOR, INFECTED_SPEED_MODIFIER, MOVEMENT_NOISE
+)
+from simulation.rates import EXPOSED_TO_INFECTED, infection_probability, transmission_beta
+
+#Algorytmy (modele z pojedynczymi osobami), dla których istnieje połączone jądro wielu dni
+FUSED_ALGORITHMS = ("SIR", "SEIR")
+FUSED_BACKENDS = ("auto", "numba", "numpy")
+
+#Odporność szczepionkowa bez wygasania (jak w DiseaseSimulation._apply_vaccinations)
+VACCINE_IMMUNITY = 10000
+
+#Numba jest opcjonalna - bez niej wielodniowe kroki liczy wektorowa wersja NumPy
+def numba_available():
+    return importlib.util.find_spec("numba") is not None
+
+#Stałe generatora SplitMix64 używanego w jądrze (kilkukrotnie szybszy od np.random w numba)
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+def _random(state):
+    """Następny stan generatora SplitMix64 i liczba z przedziału [0, 1)."""
+    state = state + _GOLDEN_GAMMA
+    z = (state ^ (state >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    z = z ^ (z >> np.uint64(31))
+    return state, (z >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+
+def _fused_days(x, y, speed, direction, pattern, status, days_infected, immune_days, exposed, exposure_days,
+                out, seeds, bounds_x, bounds_y, beta, alpha, mortality_rate, recovery_rate, immunity_period,
+                vaccination_rate, effectiveness, seir):
+    """Jądro dni: ruch, szczepienia, zarażenia, przejście E->I, wyzdrowienia/zgony i utrata odporności.
+
+    Każdy dzień to jeden przebieg po osobach - stan osoby zmienia się w tej samej kolejności co
+    w sir_algorithm/seir_algorithm, a liczebności końca dnia są zliczane w tym samym przebiegu.
+    Szczepieni są wybierani metodą selekcji sekwencyjnej (dokładnie k spośród podatnych).
+    """
+    size = len(status)
+    counts = np.zeros(5, dtype=np.int64)
+    for i in range(size):
+        code = status[i]
+        if code == SUSCEPTIBLE and exposed[i]:
+            code = EXPOSED
+        counts[code] += 1
+
+    for day in range(out.shape[0]):
+        #Osobne ziarno każdego dnia - wynik nie zależy od podziału przebiegu na wywołania
+        state = np.uint64(seeds[day])
+        susceptible = counts[SUSCEPTIBLE]
+        vaccinations = min(int(vaccination_rate * susceptible / 100), susceptible)
+        probability = 0.0
+        if counts[INFECTED] > 0:
+            probability = 1.0 - (1.0 - beta) ** counts[INFECTED]
+        seen = 0
+        chosen = 0
+        counts[:] = 0
+        for i in range(size):
+            current = status[i]
+            if current == DECEASED:
+                counts[DECEASED] += 1
+                continue
+
+            #Ruch (jak PopulationArrays.move)
+            p = pattern[i]
+            angle = direction[i]
+            state, u = _random(state)
+            if u < DIRECTION_CHANGE_PROB[p]:
+                state, u = _random(state)
+                angle = (angle + (2.0 * u - 1.0) * MAX_ANGLE_CHANGE[p]) % (2 * np.pi)
+            step = speed[i] * SPEED_FACTOR[p]
+            if current == INFECTED:
+                step *= INFECTED_SPEED_MODIFIER
+            state, u = _random(state)
+            new_x = x[i] + math.cos(angle) * step + (2.0 * u - 1.0) * MOVEMENT_NOISE
+            state, u = _random(state)
+            new_y = y[i] + math.sin(angle) * step + (2.0 * u - 1.0) * MOVEMENT_NOISE
+            if new_x < 0 or new_x > bounds_x:
+                angle = np.pi - angle
+            if new_y < 0 or new_y > bounds_y:
+                angle = -angle
+            x[i] = min(max(new_x, 0.0), bounds_x)
+            y[i] = min(max(new_y, 0.0), bounds_y)
+            direction[i] = angle
+
+            if current == SUSCEPTIBLE and not exposed[i]:
+                protected = False
+                if chosen < vaccinations:
+                    state, u = _random(state)
+                    if u * (susceptible - seen) < vaccinations - chosen:
+                        chosen += 1
+                        state, u = _random(state)
+                        if u < effectiveness:
+                            status[i] = RECOVERED
+                            immune_days[i] = VACCINE_IMMUNITY
+                            protected = True
+                    seen += 1
+                if not protected and probability > 0:
+                    state, u = _random(state)
+                    if u < probability:
+                        if seir:
+                            exposed[i] = True
+                            exposure_days[i] = 0
+                        else:
+                            status[i] = INFECTED
+            elif current == SUSCEPTIBLE:
+                exposure_days[i] += 1
+                state, u = _random(state)
+                if u < alpha:
+                    exposed[i] = False
+                    status[i] = INFECTED
+                    days_infected[i] = 0
+            elif current == INFECTED:
+                days_infected[i] += 1
+                state, u = _random(state)
+                if u < mortality_rate:
+                    status[i] = DECEASED
+                else:
+                    state, u = _random(state)
+                    if u < recovery_rate:
+                        status[i] = RECOVERED
+                        immune_days[i] = immunity_period
+                        days_infected[i] = 0
+
+            #Utrata odporności - także ozdrowieńców i zaszczepionych z tego dnia
+            if status[i] == RECOVERED and immune_days[i] > 0:
+                immune_days[i] -= 1
+                if immune_days[i] == 0:
+                    status[i] = SUSCEPTIBLE
+
+            code = status[i]
+            if code == SUSCEPTIBLE and exposed[i]:
+                code = EXPOSED
+            counts[code] += 1
+        out[day, :] = counts
+
+_fused_days_compiled = None
+
+def _compiled_kernel():
+    #Numba jest wczytywana (kilkaset ms) i kompiluje jądro dopiero przy pierwszym użyciu
+    global _random, _fused_days_compiled
+    if _fused_days_compiled is None:
+        import numba
+        _random = numba.njit(cache=True)(_random)
+        _fused_days_compiled = numba.njit(cache=True, nogil=True, error_model="numpy")(_fused_days)
+    return _fused_days_compiled
+
+def _fused_days_numpy(population, config, out, random, seir, bounds):
+    """Te same przejścia co _fused_days, wektorowo dla całych przedziałów.
+
+    Osoby w przedziałach pochodzą z utrzymywanego indeksu (bez sortowania populacji co dzień),
+    a zmiany stanu przechodzą przez set_status, więc indeks pozostaje aktualny.
+    """
+    status = population.status
+    no_one = np.empty(0, dtype=np.int64)
+    for day in range(out.shape[0]):
+        population.move(bounds, rng=random.movement)
+
+        susceptible = population.members(SUSCEPTIBLE)
+        infected = population.members(INFECTED)
+        exposed = population.members(EXPOSED) if seir else no_one
+
+        vaccinations = int(config["vaccination_rate"] * len(susceptible) / 100)
+        if vaccinations > 0:
+            chosen = random.vaccination.choice(len(susceptible), min(vaccinations, len(susceptible)), replace=False)
+            vaccinated = susceptible[chosen]
+            vaccinated = vaccinated[random.vaccination.random(len(vaccinated)) < config["vaccination_effectiveness"]]
+            population.set_status(vaccinated, RECOVERED)
+            population.immune_days[vaccinated] = VACCINE_IMMUNITY
+            susceptible = susceptible[status[susceptible] == SUSCEPTIBLE]
+
+        if len(infected) > 0:
+            prob = infection_probability(transmission_beta(config, len(population)), len(infected))
+            newly_infected = susceptible[random.transmission.random(len(susceptible)) < prob]
+            if seir:
+                population.set_exposed(newly_infected, True)
+                population.exposure_days[newly_infected] = 0
+            else:
+                population.set_status(newly_infected, INFECTED)
+
+        if seir:
+            population.exposure_days[exposed] += 1
+            onset = exposed[random.transmission.random(len(exposed)) < EXPOSED_TO_INFECTED]
+            population.exposed[onset] = False
+            population.set_status(onset, INFECTED)
+            population.days_infected[onset] = 0
+
+        population.days_infected[infected] += 1
+        dies = random.transmission.random(len(infected)) < config["mortality_rate"]
+        recovers = ~dies & (random.transmission.random(len(infected)) < config["recovery_rate"])
+        population.set_status(infected[dies], DECEASED)
+        recovered = infected[recovers]
+        population.set_status(recovered, RECOVERED)
+        population.immune_days[recovered] = config["immunity_period"]
+        population.days_infected[recovered] = 0
+
+        #Ozdrowieńcy razem z zaszczepionymi i wyleczonymi tego dnia (jak w jądrze numba)
+        immune = population.members(RECOVERED)
+        immune = immune[population.immune_days[immune] > 0]
+        population.immune_days[immune] -= 1
+        population.set_status(immune[population.immune_days[immune] == 0], SUSCEPTIBLE)
+
+        out[day] = population.index.counts()
+
+def advance_population(population, config, out, random, backend="auto", bounds=(100, 100)):
+    """Symuluje out.shape[0] dni modelu SIR/SEIR naraz, zapisując liczebności końca dnia do out.
+
+    backend: "numba" (skompilowane jądro), "numpy" (wektorowo) lub "auto" (numba, jeśli jest zainstalowana).
+    Zwraca użyty sposób liczenia. Jądro numba nie aktualizuje indeksu przedziałów populacji -
+    po nim należy go odtworzyć (rebuild_index); wersja NumPy utrzymuje indeks na bieżąco.
+    """
+    if backend not in FUSED_BACKENDS:
+        raise ValueError(f"nieznany sposób liczenia wielu dni: {backend}")
+    if backend == "numba" and not numba_available():
+        raise ImportError("jądro wielu dni wymaga pakietu numba (pip install numba)")
+    seir = config["algorithm"] == "SEIR"
+    if backend == "numpy" or not numba_available():
+        _fused_days_numpy(population, config, out, random, seir, bounds)
+        return "numpy"
+    #Ziarna dni jądra pochodzą ze strumienia transmisji - przebieg jest powtarzalny
+    seeds = random.transmission.integers(2**63, size=len(out), dtype=np.uint64)
+    _compiled_kernel()(
+        population.x, population.y, population.speed, population.direction, population.movement_pattern,
+        population.status, population.days_infected, population.immune_days, population.exposed,
+        population.exposure_days, out, seeds, float(bounds[0]), float(bounds[1]),
+        transmission_beta(config, len(population)), EXPOSED_TO_INFECTED, config["mortality_rate"],
+        config["recovery_rate"], config["immunity_period"], config["vaccination_rate"],
+        config["vaccination_effectiveness"], seir
+    )
+    return "numba"
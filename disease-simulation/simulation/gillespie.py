@@ -0,0 +1,194 @@
+import collections
+import math
+
+import numpy as np
+from simulation.rates import EXPOSED_TO_INFECTED, daily_hazard
+
+#Algorytmy zdarzeniowe (wybierane przez --algorithm) i odpowiadające im modele przedziałowe
+GILLESPIE_ALGORITHMS = {"SIR-gillespie": "SIR", "SEIR-gillespie": "SEIR"}
+
+#Liczba liczb losowych losowanych naraz w metodzie bezpośredniej (niewykorzystane przepadają na końcu dnia)
+RANDOM_BATCH = 4096
+
+class GillespieCompartments:
+    """Model SIR/SEIR liczony zdarzeniami w czasie ciągłym (metoda bezpośrednia Gillespiego).
+
+    Dzienne prawdopodobieństwa przejść z konfiguracji są zamieniane na intensywności, więc
+    pojedynczy dzień ma te same rozkłady brzegowe co modele dzienne, ale zarażenia, wyzdrowienia
+    i zgony zmieniają intensywności już w trakcie dnia. Utrata odporności następuje dokładnie
+    immunity_period dni po wyzdrowieniu (kolejka FIFO momentów wyzdrowień). Z krokiem tau > 0
+    zdarzenia są losowane zbiorczo (dwumianowy tau-leaping) - koszt dnia nie zależy od liczby
+    zdarzeń ani od wielkości populacji.
+    """
+
+    def __init__(self, population_size, initial_infected, immunity_period, seir=False):
+        self.population_size = population_size
+        self.seir = seir
+        self.susceptible = population_size - initial_infected
+        self.exposed = initial_infected if seir else 0
+        self.infected = 0 if seir else initial_infected
+        self.deceased = 0
+        #Odporność bez wygasania (szczepienia oraz immunity_period <= 0)
+        self.permanently_immune = 0
+
+        #Kohorty ozdrowieńców: [moment utraty odporności, liczba osób], od najwcześniejszej
+        self.immunity_period = immunity_period
+        self.waning = collections.deque()
+        self.waning_total = 0
+        self.time = 0.0
+        self.day = 0
+        #Liczba wykonanych zdarzeń (metoda bezpośrednia) lub kroków (tau-leaping)
+        self.events = 0
+
+    @classmethod
+    def from_state(cls, state):
+        """Odtwarza model z get_state()."""
+        model = cls(state["population_size"], 0, state["immunity_period"], state["seir"])
+        for name in ("susceptible", "exposed", "infected", "deceased", "permanently_immune",
+                     "waning_total", "time", "day", "events"):
+            setattr(model, name, state[name])
+        model.waning.extend(tuple(cohort) for cohort in state["waning"])
+        return model
+
+    def get_state(self):
+        """Liczebności przedziałów i kohorty odporności jako typy Pythona (do zapisu w JSON)."""
+        state = {name: getattr(self, name) for name in (
+            "population_size", "seir", "immunity_period", "susceptible", "exposed", "infected",
+            "deceased", "permanently_immune", "waning_total", "time", "day", "events"
+        )}
+        state = {name: value.item() if isinstance(value, np.generic) else value for name, value in state.items()}
+        state["engine"] = "gillespie"
+        state["waning"] = [list(cohort) for cohort in self.waning]
+        return state
+
+    @property
+    def recovered(self):
+        return self.waning_total + self.permanently_immune
+
+    def vaccinate(self, vaccination_rate, effectiveness, rng):
+        """Szczepienia podatnych na początku dnia - jak w AggregateCompartments.vaccinate."""
+        if vaccination_rate <= 0:
+            return
+        daily_vaccinations = min(int(vaccination_rate * self.susceptible / 100), self.susceptible)
+        if daily_vaccinations > 0:
+            protected = rng.binomial(daily_vaccinations, effectiveness)
+            self.susceptible -= protected
+            self.permanently_immune += protected
+
+    def _recover(self, count, time):
+        if self.immunity_period <= 0:
+            self.permanently_immune += count
+            return
+        self.waning_total += count
+        expires = time + self.immunity_period
+        if self.waning and self.waning[-1][0] == expires:
+            self.waning[-1] = (expires, self.waning[-1][1] + count)
+        else:
+            self.waning.append((expires, count))
+
+    def _lose_immunity(self, until):
+        """Ozdrowieńcy, których odporność wygasła do chwili until, wracają do podatnych."""
+        while self.waning and self.waning[0][0] <= until:
+            _, count = self.waning.popleft()
+            self.waning_total -= count
+            self.susceptible += count
+
+    def step(self, beta, recovery_rate, mortality_rate, rng, tau=0.0):
+        """Symuluje jeden dzień: metodą bezpośrednią (tau = 0) lub dwumianowym tau-leapingiem z krokiem tau dni."""
+        #Intensywności przejść: zarażenie (na parę podatny-chory), E->I, opuszczenie przedziału chorych
+        infection = float(daily_hazard(beta))
+        onset = float(daily_hazard(EXPOSED_TO_INFECTED)) if self.seir else 0.0
+        leave_probability = mortality_rate + (1 - mortality_rate) * recovery_rate
+        removal = float(daily_hazard(leave_probability))
+        #Zgon i wyzdrowienie konkurują - udział zgonów wśród osób opuszczających przedział chorych
+        death_share = mortality_rate / leave_probability if leave_probability > 0 else 0.0
+
+        if tau > 0:
+            self._leap_day(infection, onset, removal, death_share, rng, tau)
+        else:
+            self._direct_day(infection, onset, removal, death_share, rng)
+        self.day += 1
+        self.time = float(self.day)
+
+    def _direct_day(self, infection, onset, removal, death_share, rng):
+        end = float(self.day + 1)
+        uniforms = rng.random(RANDOM_BATCH)
+        used = 0
+        time = self.time
+        while True:
+            rate_infection = infection * self.susceptible * self.infected
+            rate_onset = onset * self.exposed
+            rate_removal = removal * self.infected
+            total = rate_infection + rate_onset + rate_removal
+            if used + 2 > len(uniforms):
+                uniforms = rng.random(RANDOM_BATCH)
+                used = 0
+
+            #Czas do następnego zdarzenia - rozkład wykładniczy z łączną intensywnością
+            if total > 0:
+                time -= math.log(1.0 - uniforms[used]) / total
+            else:
+                time = math.inf
+            used += 1
+
+            #Utrata odporności przed zdarzeniem zmienia intensywności - czas losujemy od nowa (brak pamięci)
+            if self.waning and self.waning[0][0] <= min(time, end):
+                time = self.waning[0][0]
+                self._lose_immunity(time)
+                continue
+            if time >= end:
+                break
+
+            #Wybór zdarzenia proporcjonalnie do intensywności
+            choice = uniforms[used] * total
+            used += 1
+            self.events += 1
+            if choice < rate_infection:
+                self.susceptible -= 1
+                if self.seir:
+                    self.exposed += 1
+                else:
+                    self.infected += 1
+            elif choice < rate_infection + rate_onset:
+                self.exposed -= 1
+                self.infected += 1
+            else:
+                self.infected -= 1
+                if (choice - rate_infection - rate_onset) < death_share * rate_removal:
+                    self.deceased += 1
+                else:
+                    self._recover(1, time)
+
+    def _leap_day(self, infection, onset, removal, death_share, rng, tau):
+        #Krok dopasowany tak, by dzień dzielił się na całkowitą liczbę kroków
+        steps = max(1, math.ceil(1 / tau - 1e-9))
+        dt = 1.0 / steps
+        for k in range(steps):
+            time = self.day + k * dt
+            self._lose_immunity(time)
+            #Liczby zdarzeń w kroku - losowania dwumianowe nie mogą opróżnić przedziału poniżej zera
+            new_cases = rng.binomial(self.susceptible, -math.expm1(-infection * self.infected * dt))
+            onsets = rng.binomial(self.exposed, -math.expm1(-onset * dt)) if self.seir else 0
+            leaving = rng.binomial(self.infected, -math.expm1(-removal * dt))
+            deaths = rng.binomial(leaving, death_share)
+
+            self.susceptible -= new_cases
+            if self.seir:
+                self.exposed += new_cases - onsets
+                self.infected += onsets - leaving
+            else:
+                self.infected += new_cases - leaving
+            self.deceased += deaths
+            self.events += 1
+            if leaving > deaths:
+                self._recover(int(leaving - deaths), self.day + (k + 1) * dt)
+        self._lose_immunity(self.day + 1)
+
+    def counts(self):
+        return {
+            "susceptible": int(self.susceptible),
+            "infected": int(self.infected),
+            "recovered": int(self.recovered),
+            "deceased": int(self.deceased),
+            "exposed": int(self.exposed)
+        }
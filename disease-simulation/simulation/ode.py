@@ -0,0 +1,190 @@
+import math
+
+import numpy as np
+from models.population_arrays import COMPARTMENT_NAMES
+from simulation.rates import EXPOSED_TO_INFECTED, daily_hazard, transmission_beta
+
+#Algorytmy średniopolowe (wybierane przez --algorithm) i odpowiadające im modele przedziałowe
+ODE_ALGORITHMS = {"SIR-ode": "SIR", "SEIR-ode": "SEIR"}
+
+#Parametry konfiguracji, które mogą się różnić w obrębie partii trajektorii
+BATCH_PARAMETERS = (
+    "infection_rate", "recovery_rate", "mortality_rate", "contacts_per_day",
+    "immunity_period", "vaccination_rate", "vaccination_effectiveness"
+)
+
+#Stała odporność immunity_period jest przybliżana łańcuchem etapów (rozkład Erlanga o tej samej średniej)
+IMMUNITY_STAGES = 8
+#Domyślny krok całkowania RK4 (dni)
+ODE_STEP = 1.0
+
+#Liczba trajektorii całkowanych naraz - bufory RK4 mieszczą się w pamięci podręcznej procesora
+BATCH_CHUNK = 2048
+
+#Kolumny stanu: podatni, narażeni, chorzy, zmarli, zaszczepieni, etapy odporności ozdrowieńców
+S, E, I, D, V = range(5)
+R = 5
+
+def ode_rates(config, population_size, seir, parameters=None):
+    """Intensywności przejść (na dzień) dla partii parametrów - te same beta/gamma/alpha co w sir_algorithm/seir_algorithm.
+
+    parameters: słownik nazwa -> tablica (partia) nadpisujący BATCH_PARAMETERS z config.
+    Zwraca słownik tablic o długości partii.
+    """
+    config = dict(config, **{name: np.asarray(value, dtype=np.float64) for name, value in (parameters or {}).items()})
+    batch = np.broadcast(*(np.asarray(config[name], dtype=np.float64) for name in BATCH_PARAMETERS)).shape or (1,)
+    ones = np.ones(batch)
+
+    recovery_rate, mortality_rate = config["recovery_rate"] * ones, config["mortality_rate"] * ones
+    leave_probability = mortality_rate + (1 - mortality_rate) * recovery_rate
+    immunity_period = config["immunity_period"] * ones
+    vaccination = config["vaccination_rate"] / 100 * config["vaccination_effectiveness"] * ones
+    return {
+        #Zarażenie: intensywność na parę podatny-chory (średnia z dziennej szansy 1 - (1 - beta)^I)
+        "infection": daily_hazard(transmission_beta(config, population_size) * ones),
+        "onset": daily_hazard(EXPOSED_TO_INFECTED * ones) if seir else np.zeros(batch),
+        "removal": daily_hazard(leave_probability),
+        #Zgon i wyzdrowienie konkurują - udział zgonów wśród osób opuszczających przedział chorych
+        "death_share": np.divide(mortality_rate, leave_probability, out=np.zeros(batch), where=leave_probability > 0),
+        "waning": np.divide(IMMUNITY_STAGES, immunity_period, out=np.zeros(batch), where=immunity_period > 0),
+        "vaccination": daily_hazard(vaccination),
+    }
+
+def _derivative(state, rates, seir, out, work):
+    """Pochodna stanu (kolumny x partia) układu równań SIR/SEIR zapisywana do out (bez nowych tablic).
+
+    work: bufor (2 + IMMUNITY_STAGES) x partia na zakażenia, odejścia z przedziału chorych i przepływy etapów odporności.
+    """
+    infections, removals, stages = work[0], work[1], work[2:]
+    np.multiply(rates["infection"], state[S], out=infections)
+    infections *= state[I]
+    np.multiply(rates["removal"], state[I], out=removals)
+    np.multiply(rates["waning"], state[R:], out=stages)
+
+    np.multiply(rates["vaccination"], state[S], out=out[V])
+    np.subtract(stages[-1], infections, out=out[S])
+    out[S] -= out[V]
+    if seir:
+        np.multiply(rates["onset"], state[E], out=out[E])
+        np.subtract(out[E], removals, out=out[I])
+        np.subtract(infections, out[E], out=out[E])
+    else:
+        out[E] = 0.0
+        np.subtract(infections, removals, out=out[I])
+    np.multiply(rates["death_share"], removals, out=out[D])
+    np.subtract(removals, out[D], out=out[R])
+    out[R] -= stages[0]
+    np.subtract(stages[:-1], stages[1:], out=out[R + 1:])
+
+def _rk4_buffers(state):
+    """Bufory RK4 (k1..k4, stan próbny, bufor pochodnej) dla stanu o danym kształcie - przydzielane raz na partię."""
+    return tuple(np.empty_like(state) for _ in range(5)) + (np.empty((2 + IMMUNITY_STAGES, state.shape[1])),)
+
+def _rk4_day(state, rates, seir, steps, buffers=None):
+    """Całkuje stan o jeden dzień klasyczną metodą Rungego-Kutty czwartego rzędu (w miejscu)."""
+    h = 1.0 / steps
+    k1, k2, k3, k4, trial, work = buffers or _rk4_buffers(state)
+    for _ in range(steps):
+        _derivative(state, rates, seir, k1, work)
+        np.multiply(k1, h / 2, out=trial)
+        trial += state
+        _derivative(trial, rates, seir, k2, work)
+        np.multiply(k2, h / 2, out=trial)
+        trial += state
+        _derivative(trial, rates, seir, k3, work)
+        np.multiply(k3, h, out=trial)
+        trial += state
+        _derivative(trial, rates, seir, k4, work)
+        #state += h/6 * (k1 + 2*(k2 + k3) + k4)
+        k2 += k3
+        k2 *= 2
+        k2 += k1
+        k2 += k4
+        k2 *= h / 6
+        state += k2
+    return state
+
+def _initial_state(population_size, initial_infected, seir, batch):
+    state = np.zeros((R + IMMUNITY_STAGES, batch))
+    state[S] = population_size - initial_infected
+    state[E if seir else I] = initial_infected
+    return state
+
+def _counts(state, out=None):
+    """Liczebności przedziałów (COMPARTMENT_NAMES x partia) ze stanu układu, opcjonalnie zapisywane do out."""
+    out = np.empty((len(COMPARTMENT_NAMES), state.shape[1])) if out is None else out
+    out[0], out[1], out[3], out[4] = state[S], state[I], state[D], state[E]
+    np.sum(state[R:], axis=0, out=out[2])
+    out[2] += state[V]
+    return out
+
+def integrate_batch(config, parameters=None, days=None, step=None):
+    """Trajektorie średniopolowe dla całej partii parametrów naraz.
+
+    parameters: słownik nazwa -> tablica wartości (np. {"infection_rate": [...], "recovery_rate": [...]}),
+    pozostałe parametry pochodzą z config. Model (SIR/SEIR) wynika z config["algorithm"].
+    Zwraca tablicę (partia x dni x przedziały) w kolejności COMPARTMENT_NAMES - jak trajektorie EnsembleResult.
+    """
+    seir = ODE_ALGORITHMS.get(config["algorithm"], config["algorithm"]) == "SEIR"
+    days = config["simulation_days"] if days is None else days
+    steps = max(1, math.ceil(1 / (step or config.get("ode_step", ODE_STEP)) - 1e-9))
+    rates = ode_rates(config, config["population_size"], seir, parameters)
+    batch = len(rates["infection"])
+
+    trajectories = np.empty((batch, days + 1, len(COMPARTMENT_NAMES)))
+    #Partia dzielona na równe fragmenty (najwyżej BATCH_CHUNK), aby ostatni nie był krótki i kosztowny w narzutach
+    size = -(-batch // -(-batch // BATCH_CHUNK))
+    for start in range(0, batch, size):
+        chunk = {name: values[start:start + size] for name, values in rates.items()}
+        #Intensywność wygasania rozwinięta na wszystkie etapy - mnożenie bez rozgłaszania jest wyraźnie szybsze
+        chunk["waning"] = np.tile(chunk["waning"], (IMMUNITY_STAGES, 1))
+        state = _initial_state(config["population_size"], config["initial_infected"], seir, len(chunk["infection"]))
+        daily = np.empty((days + 1, len(COMPARTMENT_NAMES), state.shape[1]))
+        buffers = _rk4_buffers(state)
+        _counts(state, daily[0])
+        for day in range(1, days + 1):
+            _rk4_day(state, chunk, seir, steps, buffers)
+            _counts(state, daily[day])
+        trajectories[start:start + size] = daily.transpose(2, 0, 1)
+    return trajectories
+
+def stats_history(trajectory):
+    """Trajektoria (dni x przedziały) z integrate_batch w formacie stats_history (liczebności zaokrąglone)."""
+    rounded = np.rint(trajectory).astype(np.int64)
+    return [dict(zip(COMPARTMENT_NAMES, row.tolist()), day=day) for day, row in enumerate(rounded)]
+
+class OdeCompartments:
+    """Pojedyncza trajektoria modelu ODE liczona dzień po dniu w DiseaseSimulation (jak model zagregowany).
+
+    Parametry są odczytywane co dzień, więc zmiany interwencji w trakcie symulacji działają od następnego dnia.
+    """
+
+    def __init__(self, population_size, initial_infected, seir=False):
+        self.population_size = population_size
+        self.seir = seir
+        self.state = _initial_state(population_size, initial_infected, seir, 1)
+        self.day = 0
+
+    @classmethod
+    def from_state(cls, state):
+        """Odtwarza model z get_state()."""
+        model = cls(state["population_size"], 0, state["seir"])
+        model.state[:, 0] = state["state"]
+        model.day = state["day"]
+        return model
+
+    def get_state(self):
+        """Stan układu jako typy Pythona (do zapisu w JSON)."""
+        return {"engine": "ode", "population_size": self.population_size, "seir": self.seir,
+                "state": self.state[:, 0].tolist(), "day": self.day}
+
+    def step(self, config, step=None):
+        """Całkuje jeden dzień z bieżącymi parametrami konfiguracji."""
+        steps = max(1, math.ceil(1 / (step or config.get("ode_step", ODE_STEP)) - 1e-9))
+        _rk4_day(self.state, ode_rates(config, self.population_size, self.seir), self.seir, steps)
+        self.day += 1
+
+    def counts(self):
+        #Wartości średniopolowe zaokrąglone do liczby osób - zgodne z pozostałymi modelami
+        counts = np.rint(_counts(self.state)[:, 0]).astype(np.int64)
+        return dict(zip(COMPARTMENT_NAMES, counts.tolist()))
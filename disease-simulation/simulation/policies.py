@@ -0,0 +1,116 @@
+#Rodzaje polityk i sterowane przez nie parametry konfiguracji
+POLICY_SETTINGS = {"lockdown": "social_distancing", "quarantine": "quarantine_infected"}
+
+class Policy:
+    """Interwencja włączana i wyłączana na granicy dni na podstawie liczebności przedziałów.
+
+    Polityka z progiem (threshold) jest uruchamiana, gdy udział osób w przedziale measure
+    osiągnie próg, i wyłączana dopiero po spadku do progu release (histereza - brak
+    przełączania co dzień wokół progu) i po co najmniej min_duration dniach. delay opóźnia
+    wejście w życie o podaną liczbę dni od przekroczenia progu. Bez progu polityka działa
+    od dnia start_day + delay; end_day kończy ją niezależnie od liczebności.
+    """
+
+    def __init__(self, spec, config):
+        kind = spec.get("type", "lockdown")
+        self.name = spec.get("name", kind)
+        self.setting = spec.get("setting", POLICY_SETTINGS.get(kind))
+        if self.setting is None:
+            raise ValueError(f"nieznany rodzaj polityki: {kind}")
+        self.value = spec.get("value", True)
+        self.measure = spec.get("measure", "infected")
+        #Blokada domyślnie korzysta z lockdown_threshold z konfiguracji
+        default_threshold = config.get("lockdown_threshold") if kind == "lockdown" else None
+        self.threshold = spec.get("threshold", default_threshold)
+        self.release = spec.get("release", self.threshold / 2 if self.threshold is not None else None)
+        self.delay = spec.get("delay", 0)
+        self.min_duration = spec.get("min_duration", 0)
+        self.start_day = spec.get("start_day", 0)
+        self.end_day = spec.get("end_day")
+
+        #Dzień przekroczenia progu (oczekiwanie na wejście w życie) i dzień włączenia polityki
+        self.triggered_day = None
+        self.active_since = None
+
+    @property
+    def active(self):
+        return self.active_since is not None
+
+    def update(self, day, fraction):
+        """Stan polityki w danym dniu przy udziale fraction osób w przedziale measure."""
+        if day < self.start_day or (self.end_day is not None and day >= self.end_day):
+            self.triggered_day = self.active_since = None
+            return False
+        if self.active:
+            released = self.release is not None and fraction <= self.release
+            if released and day - self.active_since >= self.min_duration:
+                self.active_since = None
+            return self.active
+
+        if self.triggered_day is None and (self.threshold is None or fraction >= self.threshold):
+            self.triggered_day = day
+        if self.triggered_day is not None and day >= self.triggered_day + self.delay:
+            self.triggered_day = None
+            self.active_since = day
+        return self.active
+
+class PolicyEngine:
+    """Polityki z config["policies"] oceniane na początku każdego dnia symulacji.
+
+    Korzystają z liczebności przedziałów ostatniego dnia (utrzymywanych przyrostowo), więc
+    ocena nie przegląda populacji. Konfiguracja jest zmieniana tylko przy włączeniu lub
+    wyłączeniu polityki: włączenie zapamiętuje bieżącą wartość parametru, a wyłączenie ją
+    przywraca, o ile parametr nie został w międzyczasie zmieniony ręcznie (set_control,
+    suwaki wizualizacji) - ręczne zmiany nie są nadpisywane.
+    """
+
+    def __init__(self, specs, config):
+        self.policies = [Policy(spec, config) for spec in specs]
+        #Wartości parametrów sprzed włączenia polityk i wartości ustawione przez aktywne polityki
+        self.baseline = {}
+        self.applied = {}
+        #Zmiany stanu polityk: [dzień, nazwa, czy aktywna]
+        self.events = []
+
+    def get_state(self):
+        """Stan polityk jako typy Pythona (do zapisu w JSON)."""
+        return {
+            "baseline": self.baseline,
+            "applied": self.applied,
+            "policies": [[policy.triggered_day, policy.active_since] for policy in self.policies],
+            "events": self.events,
+        }
+
+    def set_state(self, state):
+        if len(state["policies"]) != len(self.policies):
+            return  #Inny zestaw polityk (np. scenariusz rozgałęziony z punktu kontrolnego) - start od początku
+        for policy, (triggered_day, active_since) in zip(self.policies, state["policies"]):
+            policy.triggered_day, policy.active_since = triggered_day, active_since
+        self.applied = dict(state.get("applied", {policy.setting: policy.value for policy in self.policies if policy.active}))
+        self.baseline = {setting: state["baseline"].get(setting) for setting in self.applied}
+        self.events = [list(event) for event in state["events"]]
+
+    def evaluate(self, day, stats, config):
+        """Aktualizuje polityki na podstawie statystyk poprzedniego dnia i zmienia w config parametry włączonych i wyłączonych polityk."""
+        values = {}
+        for policy in self.policies:
+            was_active = policy.active
+            if policy.update(day, stats[policy.measure] / config["population_size"]):
+                values[policy.setting] = policy.value
+            if policy.active != was_active:
+                self.events.append([day, policy.name, policy.active])
+
+        for setting in [setting for setting in self.applied if setting not in values]:
+            #Wyłączenie - przywrócenie wartości sprzed polityki, chyba że zmieniono ją ręcznie
+            if config.get(setting) == self.applied.pop(setting):
+                config[setting] = self.baseline[setting]
+            del self.baseline[setting]
+        for setting, value in values.items():
+            if setting not in self.applied:
+                self.baseline[setting] = config.get(setting)
+            if self.applied.get(setting) != value:
+                config[setting] = self.applied[setting] = value
+
+    def active(self):
+        """Nazwy aktywnych polityk."""
+        return [policy.name for policy in self.policies if policy.active]
@@ -0,0 +1,130 @@
+import contextlib
+import json
+import time
+import tracemalloc
+
+class ProfileMetrics:
+    """Pomiary etapów symulacji: jeden rekord na etap i dzień.
+
+    Rekord zawiera dzień, nazwę etapu, początek i czas trwania (ns), liczbę przetworzonych
+    osób oraz (opcjonalnie) szczytową ilość pamięci przydzielonej w trakcie etapu.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def summary(self):
+        """Sumy dla każdego etapu: liczba wywołań, czas [s], osoby, szczytowa pamięć [B]."""
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record["phase"], {"calls": 0, "seconds": 0.0, "agents": 0, "allocated_bytes": 0})
+            total["calls"] += 1
+            total["seconds"] += record["duration_ns"] / 1e9
+            total["agents"] += record["agents"]
+            total["allocated_bytes"] = max(total["allocated_bytes"], record["allocated_bytes"] or 0)
+        return totals
+
+    def to_prometheus(self, prefix="simulation_phase"):
+        """Sumy etapów w tekstowym formacie ekspozycji Prometheusa."""
+        metrics = (
+            ("calls_total", "counter", "Liczba wykonań etapu", "calls"),
+            ("seconds_total", "counter", "Łączny czas etapu w sekundach", "seconds"),
+            ("agents_total", "counter", "Łączna liczba osób przetworzonych w etapie", "agents"),
+            ("allocated_bytes_max", "gauge", "Największa pamięć przydzielona w trakcie etapu", "allocated_bytes"),
+        )
+        summary = self.summary()
+        lines = []
+        for suffix, kind, description, key in metrics:
+            name = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for phase, total in summary.items():
+                lines.append(f'{name}{{phase="{phase}"}} {total[key]}')
+        return "\n".join(lines) + "\n"
+
+    def to_chrome_trace(self):
+        """Zdarzenia w formacie Chrome Trace (chrome://tracing, Perfetto, speedscope)."""
+        events = [{
+            "name": record["phase"],
+            "ph": "X",
+            "ts": record["start_ns"] / 1000,
+            "dur": record["duration_ns"] / 1000,
+            "pid": 0,
+            "tid": 0,
+            "args": {"day": record["day"], "agents": record["agents"], "allocated_bytes": record["allocated_bytes"]}
+        } for record in self.records]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_prometheus(self, path):
+        with open(path, "w") as file:
+            file.write(self.to_prometheus())
+
+    def write_chrome_trace(self, path):
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
+
+class NullProfiler:
+    """Profiler wyłączony - etapy nie są mierzone (domyślnie)."""
+
+    enabled = False
+
+    def __init__(self):
+        self.day = 0
+        self.metrics = ProfileMetrics()
+        self._context = contextlib.nullcontext()
+
+    def phase(self, name, agents=0):
+        return self._context
+
+class PhaseProfiler:
+    """Pomiar czasu, liczby osób i (opcjonalnie) pamięci każdego etapu dnia symulacji.
+
+    Etapy mogą być zagnieżdżone (np. dzień -> algorytm -> transmisja). Pamięć jest mierzona
+    przez tracemalloc (obejmuje też tablice NumPy), co wyraźnie spowalnia symulację,
+    dlatego jest włączana osobno.
+    """
+
+    enabled = True
+
+    def __init__(self, track_allocations=False):
+        self.day = 0
+        self.metrics = ProfileMetrics()
+        self.track_allocations = track_allocations
+        #Otwarte etapy: [pamięć na początku, największa pamięć zaobserwowana w zagnieżdżonych etapach]
+        self._open = []
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def phase(self, name, agents=0):
+        frame = None
+        if self.track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            #Szczyt sprzed zagnieżdżonego etapu jest zachowywany w etapach zewnętrznych przed jego wyzerowaniem
+            for outer in self._open:
+                outer[1] = max(outer[1], peak)
+            tracemalloc.reset_peak()
+            frame = [current, current]
+            self._open.append(frame)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            allocated = None
+            if frame is not None:
+                self._open.pop()
+                peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+                for outer in self._open:
+                    outer[1] = max(outer[1], peak)
+                allocated = peak - frame[0]
+            self.metrics.records.append({
+                "day": self.day, "phase": name, "start_ns": start, "duration_ns": duration,
+                "agents": int(agents), "allocated_bytes": allocated
+            })
+
+def create_profiler(config):
+    """Profiler wybrany w konfiguracji - domyślnie wyłączony."""
+    if config.get("profile", False):
+        return PhaseProfiler(track_allocations=config.get("profile_allocations", False))
+    return NullProfiler()
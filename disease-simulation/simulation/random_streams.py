@@ -0,0 +1,24 @@
+import numpy as np
+
+#Podsystemy symulacji z własnymi, niezależnymi strumieniami liczb losowych
+STREAM_NAMES = ("initialization", "movement", "transmission", "vaccination")
+
+class RandomStreams:
+    """Niezależne generatory numpy.random.Generator wyprowadzone z jednego ziarna przez SeedSequence."""
+
+    def __init__(self, seed=None):
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+        children = self.seed_sequence.spawn(len(STREAM_NAMES))
+        for name, child in zip(STREAM_NAMES, children):
+            setattr(self, name, np.random.Generator(np.random.PCG64(child)))
+
+    def get_state(self):
+        """Stan wszystkich generatorów (np. do zapisu punktu kontrolnego)."""
+        return {name: getattr(self, name).bit_generator.state for name in STREAM_NAMES}
+
+    def set_state(self, state):
+        for name in STREAM_NAMES:
+            getattr(self, name).bit_generator.state = state[name]
@@ -0,0 +1,33 @@
+#Wspólne wyprowadzenie parametrów przejść dla modeli przedziałowych (SIR/SEIR)
+import numpy as np
+
+#Dzienne prawdopodobieństwo przejścia exposed -> infected w modelu SEIR
+EXPOSED_TO_INFECTED = 0.2
+
+def contact_reduction(config):
+    """Współczynnik redukcji kontaktów wynikający z aktywnych interwencji."""
+    reduction = 1.0
+    if config["social_distancing"]:
+        reduction *= 0.5
+    if config.get("quarantine_infected", False):
+        reduction *= 0.2
+    return reduction
+
+def transmission_beta(config, population_size):
+    """Prawdopodobieństwo zarażenia w jednym kontakcie podatnego z jednym chorym (beta)."""
+    beta = config["infection_rate"] * config["contacts_per_day"] / population_size
+    return beta * contact_reduction(config)
+
+def daily_hazard(probability):
+    """Intensywność (na dzień) procesu Poissona, który zachodzi w ciągu dnia z danym prawdopodobieństwem.
+
+    Działa także na tablicach prawdopodobieństw (np. partia parametrów modelu ODE).
+    """
+    #Pewne zdarzenie (prawdopodobieństwo 1) - skończona, bardzo duża intensywność
+    return -np.log1p(-np.minimum(probability, 1 - 1e-12))
+
+def infection_probability(beta, infected):
+    """Dzienna szansa zarażenia podatnej osoby przy danej liczbie chorych."""
+    if infected <= 0:
+        return 0.0
+    return 1 - (1 - beta) ** infected
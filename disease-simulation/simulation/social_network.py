@@ -0,0 +1,185 @@
+import numpy as np
+
+#Promień stałych kontaktów w sieci małego świata (sąsiedzi i-5..i+5)
+RING_RADIUS = 5
+#Odsetek średniej liczby kontaktów przeznaczony na losowe dalekie połączenia
+LONG_LINK_FRACTION = 0.3
+
+class SocialNetwork:
+    """Sieć kontaktów w formacie CSR: kontakty osoby i to indices[indptr[i]:indptr[i+1]]."""
+
+    def __init__(self, indptr, indices):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+
+    @classmethod
+    def from_edges(cls, source, target, size):
+        """Buduje sieć z listy krawędzi skierowanych (source -> target)."""
+        source = np.asarray(source, dtype=np.int64)
+        target = np.asarray(target, dtype=np.int64)
+        order = np.argsort(source, kind="stable")
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(source, minlength=size))))
+        return cls(indptr, target[order])
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def degree(self):
+        return np.diff(self.indptr)
+
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+def _distinct_rows(draw, rows, width):
+    """Losuje macierz (rows x width) wartości różnych w obrębie wiersza - powtórzenia są losowane ponownie."""
+    values = draw(np.arange(rows).repeat(width)).reshape(rows, width)
+    while True:
+        order = np.argsort(values, axis=1)
+        ordered = np.take_along_axis(values, order, axis=1)
+        duplicate = np.zeros_like(values, dtype=bool)
+        np.put_along_axis(duplicate, order[:, 1:], ordered[:, 1:] == ordered[:, :-1], axis=1)
+        row, col = np.nonzero(duplicate)
+        if len(row) == 0:
+            return values
+        values[row, col] = draw(row)
+
+def small_world_network(size, avg_connections, rng=None):
+    """Sieć małego świata: stali sąsiedzi i-5..i+5 oraz int(0.3 * avg_connections) losowych dalekich połączeń."""
+    rng = rng if rng is not None else np.random.default_rng()
+    ids = np.arange(size)
+    low = np.maximum(0, ids - RING_RADIUS)
+    high = np.minimum(size, ids + RING_RADIUS + 1)
+    window = high - low  #Liczba osób w oknie sąsiadów łącznie z samą osobą
+    ring_count = window - 1
+    long_count = np.minimum(int(avg_connections * LONG_LINK_FRACTION), size - window)
+    indptr = np.concatenate(([0], np.cumsum(ring_count + long_count)))
+    indices = np.empty(indptr[-1], dtype=np.int64)
+
+    #Stali sąsiedzi (np. rodzina, współpracownicy) - w kolejności rosnących indeksów
+    offsets = np.concatenate((np.arange(-RING_RADIUS, 0), np.arange(1, RING_RADIUS + 1)))
+    ring = ids[:, None] + offsets[None, :]
+    valid = (ring >= 0) & (ring < size)
+    rank = np.cumsum(valid, axis=1) - 1
+    rows = np.broadcast_to(ids[:, None], ring.shape)
+    indices[indptr[rows[valid]] + rank[valid]] = ring[valid]
+
+    #Losowe dalekie połączenia (znajomi, przypadkowi ludzie) - losowanie spoza okna z odrzucaniem powtórzeń
+    width = int(long_count.max()) if size > 0 else 0
+    if width > 0:
+        full = ids[long_count == width]
+
+        def draw(row):
+            person = full[row]
+            value = rng.integers(0, size - window[person])
+            return value + np.where(value >= low[person], window[person], 0)
+
+        long_links = _distinct_rows(draw, len(full), width)
+        indices[(indptr[full] + ring_count[full])[:, None] + np.arange(width)] = long_links
+
+        #Bardzo małe populacje - za mało kandydatów, by wylosować pełną liczbę połączeń
+        for person in ids[long_count < width]:
+            candidates = np.concatenate((np.arange(0, low[person]), np.arange(high[person], size)))
+            start = indptr[person] + ring_count[person]
+            indices[start:indptr[person + 1]] = rng.choice(candidates, long_count[person], replace=False)
+
+    return SocialNetwork(indptr, indices)
+
+def _undirected(source, target, size):
+    return SocialNetwork.from_edges(np.concatenate((source, target)), np.concatenate((target, source)), size)
+
+def watts_strogatz_network(size, k, rewire_prob, rng=None):
+    """Sieć Wattsa-Strogatza: pierścień z k najbliższymi sąsiadami i przepinaniem krawędzi z prawdopodobieństwem p."""
+    rng = rng if rng is not None else np.random.default_rng()
+    half = max(1, k // 2)
+    if size <= 2 * half + 1:
+        raise ValueError("populacja za mała dla sieci Wattsa-Strogatza o zadanym stopniu")
+    source = np.repeat(np.arange(size), half)
+    target = (source + np.tile(np.arange(1, half + 1), size)) % size
+
+    #Przepinanie - nowy koniec krawędzi losowany ponownie, dopóki tworzy pętlę lub powtórzoną krawędź
+    pending = np.flatnonzero(rng.random(len(source)) < rewire_prob)
+    while len(pending) > 0:
+        target[pending] = rng.integers(0, size, len(pending))
+        key = np.minimum(source, target) * size + np.maximum(source, target)
+        _, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+        conflict = (source[pending] == target[pending]) | (counts[inverse[pending]] > 1)
+        pending = pending[conflict]
+
+    return _undirected(source, target, size)
+
+def _distinct_in_rows(values, width):
+    """Pozycje (w spłaszczonej tablicy) powtórzeń wartości w obrębie wierszy o długości width."""
+    values = values.reshape(-1, width)
+    order = np.argsort(values, axis=1)
+    ordered = np.take_along_axis(values, order, axis=1)
+    duplicate = np.zeros_like(values, dtype=bool)
+    np.put_along_axis(duplicate, order[:, 1:], ordered[:, 1:] == ordered[:, :-1], axis=1)
+    return np.flatnonzero(duplicate.ravel())
+
+def barabasi_albert_network(size, m, rng=None):
+    """Sieć Barabásiego-Alberta: każda nowa osoba łączy się z m różnymi osobami proporcjonalnie do ich stopnia.
+
+    Wektorowa wersja losowania z listy końców krawędzi (metoda Batagelja-Brandesa). Lista zaczyna się
+    od osób 0..m-1, a każda kolejna osoba v dopisuje blok 2m pozycji: m celów i m razy siebie. Cel krawędzi
+    osoby v to losowa pozycja listy sprzed dopisania v - pozycja celu wcześniejszej krawędzi oznacza
+    jej cel. Osoby są przetwarzane w podwajających się grupach: wskazania na wcześniejsze grupy są już
+    rozstrzygnięte, więc łańcuchy wskazań i ponowne losowania powtórzonych celów obejmują tylko bieżącą grupę.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    m = max(1, m)
+    if size <= m:
+        raise ValueError("populacja musi być większa niż liczba połączeń nowej osoby")
+    nodes = np.arange(m, size)
+    target = np.empty(len(nodes) * m, dtype=np.int64)
+    first = m
+    while first < size:
+        last = min(2 * first, size)
+        #Krawędzie grupy osób first..last-1 i długość listy końców w chwili dołączenia każdej z nich
+        edges = slice((first - m) * m, (last - m) * m)
+        available = np.repeat(m + 2 * m * (nodes[first - m:last - m] - m), m)
+        drawn = (rng.random(len(available)) * available).astype(np.int64)
+        start = 0
+        while start is not None:
+            #Krawędzie zależą tylko od wcześniejszych, więc po zmianie losowania wystarczy rozstrzygnąć dalsze
+            pending = np.arange(start, len(drawn))
+            position = drawn[pending]
+            while len(pending) > 0:
+                block, offset = np.divmod(position - m, 2 * m)
+                chained = (position >= m) & (offset < m)
+                edge = block * m + offset
+                #Pozycje osób i celów wcześniejszych grup są rozstrzygnięte od razu
+                done = ~chained | (edge < edges.start)
+                value = np.where(position >= m, m + block, position)
+                value[chained & done] = target[edge[chained & done]]
+                target[edges.start + pending[done]] = value[done]
+                pending, position = pending[~done], drawn[edge[~done] - edges.start]
+            #Powtórzone cele w obrębie osoby są losowane ponownie
+            repeated = _distinct_in_rows(target[edges], m)
+            drawn[repeated] = (rng.random(len(repeated)) * available[repeated]).astype(np.int64)
+            start = int(repeated.min()) if len(repeated) > 0 else None
+        first = last
+    return _undirected(np.repeat(nodes, m), target, size)
+
+def load_edge_list(path, size, undirected=True):
+    """Wczytuje sieć z pliku tekstowego z parami indeksów osób w wierszach."""
+    edges = np.loadtxt(path, dtype=np.int64, comments="#", ndmin=2)
+    if edges.shape[0] > 0 and (edges.min() < 0 or edges.max() >= size):
+        raise ValueError(f"lista krawędzi {path} zawiera indeksy spoza populacji 0..{size - 1}")
+    source, target = edges[:, 0], edges[:, 1]
+    if undirected:
+        return _undirected(source, target, size)
+    return SocialNetwork.from_edges(source, target, size)
+
+def create_network(config, size, rng=None):
+    """Tworzy sieć kontaktów o topologii wybranej w konfiguracji."""
+    topology = config.get("network_topology", "small_world")
+    avg_connections = config["contacts_per_day"]
+    if topology == "small_world":
+        return small_world_network(size, avg_connections, rng)
+    if topology == "watts_strogatz":
+        return watts_strogatz_network(size, avg_connections, config.get("network_rewire_prob", 0.1), rng)
+    if topology == "barabasi_albert":
+        return barabasi_albert_network(size, avg_connections // 2, rng)
+    if topology == "edge_list":
+        return load_edge_list(config["network_edge_list"], size)
+    raise ValueError(f"nieznana topologia sieci: {topology}")
@@ -0,0 +1,126 @@
+import numpy as np
+
+#Rundy metody odrzucania w sample_neighbours przed dokładnym losowaniem z query_radius
+SAMPLING_ROUNDS = 32
+
+class SpatialGrid:
+    """Jednorodna siatka komórek do szybkiego wyszukiwania sąsiadów w przestrzeni 2D."""
+
+    def __init__(self, cell_size=5.0, bounds=(100, 100)):
+        self.cell_size = float(cell_size)
+        self.bounds = bounds
+        #Liczba komórek w każdym wymiarze (co najmniej jedna)
+        self.n_cols = max(1, int(np.ceil(bounds[0] / self.cell_size)))
+        self.n_rows = max(1, int(np.ceil(bounds[1] / self.cell_size)))
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self._order = np.empty(0, dtype=np.int64)
+        self._cell_start = np.zeros(self.n_cols * self.n_rows + 1, dtype=np.int64)
+
+    def _cell_coords(self, x, y):
+        col = np.clip((np.asarray(x) // self.cell_size).astype(np.int64), 0, self.n_cols - 1)
+        row = np.clip((np.asarray(y) // self.cell_size).astype(np.int64), 0, self.n_rows - 1)
+        return col, row
+
+    def rebuild(self, x, y):
+        """Przebudowuje indeks na podstawie aktualnych pozycji (wywoływane po ruchu osób)."""
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        col, row = self._cell_coords(self.x, self.y)
+        cells = row * self.n_cols + col
+        #Sortowanie stabilne - w obrębie komórki indeksy pozostają rosnące
+        self._order = np.argsort(cells, kind="stable")
+        counts = np.bincount(cells, minlength=self.n_cols * self.n_rows)
+        self._cell_start = np.concatenate(([0], np.cumsum(counts)))
+
+    def query_radius(self, px, py, radius):
+        """Zwraca rosnąco posortowane indeksy punktów w odległości mniejszej niż radius."""
+        reach = int(np.ceil(radius / self.cell_size))
+        #Pojedynczy punkt - obliczenia skalarne są tu szybsze niż numpy
+        col = min(max(int(px // self.cell_size), 0), self.n_cols - 1)
+        row = min(max(int(py // self.cell_size), 0), self.n_rows - 1)
+
+        chunks = []
+        for r in range(max(0, row - reach), min(self.n_rows, row + reach + 1)):
+            base = r * self.n_cols
+            first = base + max(0, col - reach)
+            last = base + min(self.n_cols - 1, col + reach)
+            #Komórki w jednym wierszu siatki leżą obok siebie w tablicy _order
+            chunks.append(self._order[self._cell_start[first]:self._cell_start[last + 1]])
+
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.sort(np.concatenate(chunks))
+        distance = np.sqrt((self.x[candidates] - px)**2 + (self.y[candidates] - py)**2)
+        return candidates[distance < radius]
+
+    def sample_neighbours(self, px, py, counts, weights, rng, radius):
+        """Losuje (z powtórzeniami) counts[k] osób w odległości mniejszej niż radius od punktu (px[k], py[k]).
+
+        Szansa wyboru osoby jest proporcjonalna do weights (waga 0 - osoba nie może zostać wybrana).
+        Otoczenie punktu w siatce to kilka ciągłych zakresów w tablicy _order (wiersze komórek), więc
+        wszystkie losowania korzystają z metody odrzucania wektorowo: osoba z otoczenia wybrana
+        jednostajnie (sumy skumulowane długości zakresów) jest przyjmowana z szansą waga / największa
+        waga, o ile leży w promieniu. Losowania nierozstrzygnięte po SAMPLING_ROUNDS rundach (np. punkt
+        bez nikogo w promieniu) są liczone dokładnie z query_radius - sumy skumulowane wag i searchsorted.
+        Zwraca pary (numer punktu, indeks wybranej osoby); losowania bez nikogo w promieniu są pomijane.
+        """
+        reach = int(np.ceil(radius / self.cell_size))
+        px, py = np.asarray(px, dtype=float), np.asarray(py, dtype=float)
+        sorted_weights = weights[self._order]
+        sorted_x, sorted_y = self.x[self._order], self.y[self._order]
+        col, row = self._cell_coords(px, py)
+        #Punkty w kolejności komórek - kolejne odczyty trafiają w pobliskie fragmenty tablic (pamięć podręczna)
+        points = np.argsort(row * self.n_cols + col, kind="stable")
+        px, py, col, row = px[points], py[points], col[points], row[points]
+
+        #Zakresy komórek kolejnych wierszy otoczenia (punkty x wiersze) - w każdym wierszu tylko kolumny
+        #przecinające koło o promieniu radius (mniej odrzuconych losowań niż dla pełnego kwadratu komórek)
+        rows = row[:, None] + np.arange(-reach, reach + 1)
+        gap = np.maximum(0.0, np.maximum(rows * self.cell_size - py[:, None], py[:, None] - (rows + 1) * self.cell_size))
+        half_width = np.sqrt(np.maximum(radius**2 - gap**2, 0.0))
+        inside = (rows >= 0) & (rows < self.n_rows) & (gap < radius)
+        first, last = self._cell_coords(px[:, None] - half_width, 0)[0], self._cell_coords(px[:, None] + half_width, 0)[0]
+        rows = np.clip(rows, 0, self.n_rows - 1) * self.n_cols
+        start = self._cell_start[rows + first]
+        size = np.where(inside, self._cell_start[rows + last + 1] - start, 0)
+        #Spłaszczone tablice zakresów (punkt * liczba wierszy + wiersz): koniec zakresu w numeracji osób
+        #otoczenia i przesunięcie zamieniające tę numerację na pozycję w _order
+        width = size.shape[1]
+        segment_end = np.cumsum(size, axis=1)
+        total = segment_end[:, -1]
+        shift = (start - (segment_end - size)).ravel()
+        segment_end = segment_end.ravel()
+
+        counts = np.where(total > 0, np.asarray(counts)[points], 0)
+        source = np.repeat(np.arange(len(points)), counts)
+        partners = np.full(len(source), -1, dtype=np.int64)
+        limit = sorted_weights.max(initial=0.0)
+        pending = np.arange(len(source))
+        for _ in range(SAMPLING_ROUNDS):
+            if len(pending) == 0:
+                break
+            point = source[pending]
+            #Osoba z otoczenia wybrana jednostajnie: numer w otoczeniu, wiersz według sum długości zakresów
+            k = (rng.random(len(pending)) * total[point]).astype(np.int64)
+            base = point * width
+            segment = base.copy()
+            for j in range(width - 1):
+                segment += k >= segment_end[base + j]
+            candidate = shift[segment] + k
+            accepted = rng.random(len(pending)) * limit < sorted_weights[candidate]
+            accepted &= (sorted_x[candidate] - px[point])**2 + (sorted_y[candidate] - py[point])**2 < radius**2
+            partners[pending[accepted]] = self._order[candidate[accepted]]
+            pending = pending[~accepted]
+
+        #Pozostałe losowania - dokładnie, z osób w promieniu (zwykle nieliczne punkty)
+        for point in np.unique(source[pending]):
+            draws = pending[source[pending] == point]
+            neighbours = self.query_radius(px[point], py[point], radius)
+            cumulative = np.cumsum(weights[neighbours])
+            if len(neighbours) == 0 or cumulative[-1] <= 0:
+                continue
+            chosen = np.searchsorted(cumulative, rng.random(len(draws)) * cumulative[-1], side="right")
+            partners[draws] = neighbours[np.minimum(chosen, len(neighbours) - 1)]
+        found = partners >= 0
+        return points[source[found]], partners[found]
@@ -0,0 +1,181 @@
+import csv
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from config import SIMULATION_CONFIG
+from models.population_arrays import COMPARTMENT_NAMES
+from simulation.ensemble import run_replicate
+
+#Klucze konfiguracji, które nie wpływają na wynik symulacji (pomijane w kluczu pamięci podręcznej)
+NON_RESULT_KEYS = (
+    "plot_results", "save_to_file", "real_time_visualization", "heatmap_threshold", "export_path", "export_fps",
+    "replicates", "workers", "quiet", "debug_consistency_checks", "profile", "profile_allocations",
+    "profile_prometheus", "profile_trace",
+    "checkpoint_path", "checkpoint_interval",
+    "output_path", "snapshot_path", "snapshot_interval", "keep_history"
+)
+
+#Ziarno planu bez "seed" w pliku i bez --seed - stałe, aby ponowne uruchomienie trafiało w pamięć podręczną
+DEFAULT_SWEEP_SEED = 0
+
+def normalize_config(config):
+    """Pełna konfiguracja (uzupełniona domyślnymi wartościami) bez kluczy niewpływających na wynik."""
+    merged = dict(SIMULATION_CONFIG, **config)
+    normalized = {}
+    for key in sorted(merged):
+        if key in NON_RESULT_KEYS:
+            continue
+        value = merged[key]
+        #Typy NumPy (np. z planu hiperkostki łacińskiej) zamieniamy na typy Pythona
+        normalized[key] = value.item() if isinstance(value, np.generic) else value
+    return normalized
+
+def config_key(config, seed):
+    """Skrót SHA-256 znormalizowanej konfiguracji i ziarna - klucz wyniku w pamięci podręcznej."""
+    payload = json.dumps({"config": normalize_config(config), "seed": int(seed)}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def grid_design(base_config, parameters):
+    """Wszystkie kombinacje wartości parametrów (iloczyn kartezjański)."""
+    names = list(parameters)
+    return [dict(base_config, **dict(zip(names, values)))
+            for values in itertools.product(*(parameters[name] for name in names))]
+
+def latin_hypercube_design(base_config, ranges, samples, seed=None):
+    """Plan hiperkostki łacińskiej - każdy przedział [min, max] podzielony na samples warstw."""
+    rng = np.random.default_rng(seed)
+    points = [dict(base_config) for _ in range(samples)]
+    for name, (low, high) in ranges.items():
+        #Jedna losowa wartość z każdej warstwy, warstwy w losowej kolejności
+        strata = (rng.permutation(samples) + rng.random(samples)) / samples
+        values = low + strata * (high - low)
+        integer = isinstance(base_config.get(name, SIMULATION_CONFIG.get(name)), int)
+        for point, value in zip(points, values):
+            point[name] = int(round(value)) if integer else float(value)
+    return points
+
+class ResultCache:
+    """Wyniki pojedynczych przebiegów zapisane na dysku, po jednym pliku .npz na klucz."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+    def get(self, key):
+        with np.load(self.path(key)) as data:
+            return data["trajectory"]
+
+    def put(self, key, trajectory, config, seed, sweep_seed=None):
+        """Zapis atomowy - przerwany zapis nie zostawia uszkodzonego wpisu.
+
+        sweep_seed: ziarno planu, z którego wyprowadzono seed (do odtworzenia przebiegu).
+        """
+        metadata = json.dumps({"config": normalize_config(config), "seed": int(seed), "sweep_seed": sweep_seed},
+                              sort_keys=True)
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(handle, "wb") as file:
+            np.savez(file, trajectory=trajectory, metadata=np.array(metadata))
+        os.replace(temporary, self.path(key))
+
+class SweepResult:
+    """Trajektorie (powtórzenia x dni x przedziały) dla każdego punktu planu."""
+
+    def __init__(self, points, trajectories):
+        self.points = points
+        self.trajectories = trajectories
+
+    def summary_rows(self, parameters):
+        """Wiersze podsumowania: wartości parametrów oraz mediany końcowych liczebności przedziałów."""
+        rows = []
+        for point, trajectories in zip(self.points, self.trajectories):
+            final = np.median(trajectories[:, -1, :], axis=0)
+            row = {name: point[name] for name in parameters}
+            row.update({name: float(final[k]) for k, name in enumerate(COMPARTMENT_NAMES)})
+            rows.append(row)
+        return rows
+
+    def write_csv(self, path, parameters):
+        rows = self.summary_rows(parameters)
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(parameters) + list(COMPARTMENT_NAMES))
+            writer.writeheader()
+            writer.writerows(rows)
+
+class SweepRunner:
+    """Równoległe przeliczanie planu parametrów z pamięcią podręczną wyników na dysku."""
+
+    def __init__(self, points, replicates=1, workers=None, cache_dir="sweep_cache", seed=DEFAULT_SWEEP_SEED):
+        self.points = points
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = ResultCache(cache_dir)
+        #Te same ziarna dla każdego punktu i każdego uruchomienia - rozszerzony lub wznowiony plan
+        #korzysta z już policzonych wyników
+        self.seed = DEFAULT_SWEEP_SEED if seed is None else int(seed)
+        children = np.random.SeedSequence(self.seed).spawn(replicates)
+        self.seeds = [int(child.generate_state(1)[0]) for child in children]
+
+    def pending_tasks(self):
+        """Przebiegi, których nie ma jeszcze w pamięci podręcznej (po awarii - tylko brakujące)."""
+        tasks = []
+        for point in self.points:
+            for seed in self.seeds:
+                key = config_key(point, seed)
+                if key not in self.cache:
+                    tasks.append((key, point, seed))
+        return tasks
+
+    def run(self, progress=None):
+        tasks = self.pending_tasks()
+        if self.workers == 1:
+            for done, (key, point, seed) in enumerate(tasks, start=1):
+                self.cache.put(key, run_replicate(point, seed), point, seed, self.seed)
+                if progress is not None:
+                    progress(done, len(tasks))
+        elif tasks:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(run_replicate, point, seed): (key, point, seed)
+                           for key, point, seed in tasks}
+                #Każdy wynik trafia na dysk od razu po obliczeniu
+                for done, future in enumerate(as_completed(futures), start=1):
+                    key, point, seed = futures[future]
+                    self.cache.put(key, future.result(), point, seed, self.seed)
+                    if progress is not None:
+                        progress(done, len(tasks))
+
+        trajectories = [
+            np.stack([self.cache.get(config_key(point, seed)) for seed in self.seeds])
+            for point in self.points
+        ]
+        return SweepResult(self.points, trajectories)
+
+def load_sweep_spec(path, base_config):
+    """Wczytuje plan z pliku JSON: {"grid": {...}} lub {"latin_hypercube": {...}, "samples": N}.
+
+    Ziarno planu: "seed" z pliku, inaczej seed z konfiguracji (--seed), inaczej DEFAULT_SWEEP_SEED -
+    zapisywane w spec["seed"] i używane zarówno do planu hiperkostki, jak i do ziaren powtórzeń.
+    """
+    with open(path) as file:
+        spec = json.load(file)
+    seed = base_config.get("seed")
+    spec["seed"] = spec.get("seed", DEFAULT_SWEEP_SEED if seed is None else seed)
+    if "grid" in spec:
+        parameters = list(spec["grid"])
+        points = grid_design(base_config, spec["grid"])
+    elif "latin_hypercube" in spec:
+        parameters = list(spec["latin_hypercube"])
+        points = latin_hypercube_design(base_config, spec["latin_hypercube"], spec["samples"], spec["seed"])
+    else:
+        raise ValueError(f"plik {path} nie zawiera planu 'grid' ani 'latin_hypercube'")
+    return spec, parameters, points
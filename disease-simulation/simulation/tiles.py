@@ -0,0 +1,359 @@
+import heapq
+import multiprocessing
+import os
+import traceback
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+from models.population_arrays import PopulationArrays, COMPARTMENT_NAMES, SUSCEPTIBLE, INFECTED, RECOVERED, DECEASED
+from simulation.spatial_grid import SpatialGrid
+
+#Atrybuty osób umieszczane w pamięci współdzielonej - tylko te, których używa ruch i algorytm standardowy
+SHARED_ARRAYS = ("x", "y", "speed", "direction", "movement_pattern", "status", "days_infected", "immune_days")
+
+#Parametry konfiguracji przekazywane procesom kafelków na początku każdego dnia
+TILE_PARAMETERS = (
+    "infection_rate", "recovery_rate", "mortality_rate", "immunity_period",
+    "vaccination_rate", "vaccination_effectiveness"
+)
+
+def _halo_bit(dx, dy):
+    #Bit maski strefy duchów odpowiadający kafelkowi sąsiedniemu w kierunku (dx, dy)
+    return (dy + 1) * 3 + (dx + 1)
+
+class TileLayout:
+    """Podział płaszczyzny na prostokątne kafelki (kolumny x wiersze, możliwie kwadratowe).
+
+    Każda osoba należy do kafelka, w którym się znajduje. Osoby bliżej niż radius od krawędzi
+    kafelka są dodatkowo duchami w kafelkach sąsiednich - maska halo ma ustawiony bit kierunku
+    każdego takiego sąsiada. Kafelki nie mogą być węższe niż radius, więc zasięg zarażenia
+    nie wykracza poza bezpośrednich sąsiadów.
+    """
+
+    def __init__(self, tiles, bounds=(100, 100), radius=5):
+        self.tiles = tiles
+        self.rows = max(d for d in range(1, int(np.sqrt(tiles)) + 1) if tiles % d == 0)
+        self.cols = tiles // self.rows
+        self.bounds = bounds
+        self.radius = radius
+        self.width = bounds[0] / self.cols
+        self.height = bounds[1] / self.rows
+        if min(self.width, self.height) < radius:
+            raise ValueError(f"kafelki {self.cols}x{self.rows} są węższe niż promień zarażenia ({radius}) - zmniejsz liczbę kafelków")
+
+    def assign(self, x, y):
+        """Kafelek-właściciel i maska kafelków sąsiednich, w których osoba jest duchem."""
+        col = np.clip((x // self.width).astype(np.int64), 0, self.cols - 1)
+        row = np.clip((y // self.height).astype(np.int64), 0, self.rows - 1)
+        owner = (row * self.cols + col).astype(np.int16)
+
+        near = {
+            (-1, 0): (x - col * self.width <= self.radius) & (col > 0),
+            (1, 0): ((col + 1) * self.width - x <= self.radius) & (col < self.cols - 1),
+            (0, -1): (y - row * self.height <= self.radius) & (row > 0),
+            (0, 1): ((row + 1) * self.height - y <= self.radius) & (row < self.rows - 1),
+        }
+        halo = np.zeros(len(x), dtype=np.uint16)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx == 0 and dy == 0:
+                    continue
+                mask = np.ones(len(x), dtype=bool)
+                if dx != 0:
+                    mask &= near[(dx, 0)]
+                if dy != 0:
+                    mask &= near[(0, dy)]
+                halo |= mask.astype(np.uint16) << _halo_bit(dx, dy)
+        return owner, halo
+
+    def neighbours(self, tile):
+        """Kafelki sąsiadujące z tile (także po przekątnej)."""
+        col, row = tile % self.cols, tile // self.cols
+        return [r * self.cols + c for r in range(max(row - 1, 0), min(row + 2, self.rows))
+                for c in range(max(col - 1, 0), min(col + 2, self.cols)) if (r, c) != (row, col)]
+
+    def ghosts(self, tile, owner, halo, candidates=None):
+        """Osoby z kafelków sąsiednich leżące w strefie duchów kafelka tile (rosnąco).
+
+        candidates: osoby do sprawdzenia (np. osoby brzegowe sąsiadów), domyślnie cała populacja.
+        """
+        if candidates is None:
+            candidates = np.flatnonzero(halo != 0)
+        candidates = np.sort(candidates[(halo[candidates] != 0) & (owner[candidates] != tile)])
+        source = owner[candidates].astype(np.int64)
+        dx = tile % self.cols - source % self.cols
+        dy = tile // self.cols - source // self.cols
+        adjacent = (np.abs(dx) <= 1) & (np.abs(dy) <= 1)
+        bit = np.where(adjacent, _halo_bit(dx, dy), 0)
+        return candidates[adjacent & ((halo[candidates] >> bit.astype(np.uint16)) & 1 == 1)]
+
+def _attach(specs):
+    """Widoki tablic w pamięci współdzielonej (w procesie kafelka)."""
+    memory = {name: shared_memory.SharedMemory(name=spec[0]) for name, spec in specs.items()}
+    arrays = {name: np.ndarray(spec[2], dtype=spec[1], buffer=memory[name].buf) for name, spec in specs.items()}
+    return memory, arrays
+
+def _segment(array, sizes, lengths, tile):
+    #Fragment wspólnej tablicy zapisany przez kafelek - fragmenty leżą kolejno, o długościach sizes
+    start = int(sizes[:tile].sum())
+    return array[start:start + int(lengths[tile])]
+
+def _tile_day(tile, own, layout, pop, shared, rng, params, barrier):
+    """Jeden dzień algorytmu standardowego dla osób kafelka - etapy rozdzielone barierami wszystkich kafelków.
+
+    own: posortowane indeksy osób kafelka, utrzymywane przez proces kafelka między dniami - koszt dnia
+    zależy od liczby osób kafelka, migrantów i osób brzegowych sąsiadów, a nie od wielkości populacji.
+    Zwraca wyniki dnia i zaktualizowane own.
+    """
+    owner, halo, flags = shared["owner"], shared["halo"], shared["neighbour_infected"]
+    before, after = shared["tile_sizes"]
+    neighbours = layout.neighbours(tile)
+
+    #Etap 1: ruch osób kafelka i ich przypisanie do kafelków po ruchu; osoby opuszczające kafelek
+    #trafiają do skrzynki migrantów (fragment o długości liczby osób kafelka przed ruchem)
+    before[tile] = len(own)
+    barrier.wait()
+    pop.move(bounds=layout.bounds, rng=rng, indices=own)
+    new_owner, new_halo = layout.assign(pop.x[own], pop.y[own])
+    owner[own] = new_owner
+    halo[own] = new_halo
+    leaving = new_owner != tile
+    migrated = int(np.count_nonzero(leaving))
+    shared["outbox_sizes"][tile] = migrated
+    _segment(shared["outbox"], before, before, tile)[:migrated] = own[leaving]
+    own = own[~leaving]
+    barrier.wait()
+
+    #Etap 2: przyjęcie migrantów - dzienny krok (do 3.5) jest krótszy od kafelka, więc pochodzą od sąsiadów
+    arrivals = np.concatenate([own[:0]] + [_segment(shared["outbox"], before, shared["outbox_sizes"], neighbour)
+                                           for neighbour in neighbours])
+    arrivals = np.sort(arrivals[owner[arrivals] == tile])
+    own = np.insert(own, np.searchsorted(own, arrivals), arrivals)
+    #Osoby brzegowe kafelka (w strefie duchów sąsiadów) są publikowane po ustaleniu liczebności wszystkich kafelków
+    border = own[halo[own] != 0]
+    after[tile] = len(own)
+    shared["border_sizes"][tile] = len(border)
+    barrier.wait()
+    _segment(shared["border"], after, after, tile)[:len(border)] = border
+    barrier.wait()
+
+    #Duchy - osoby brzegowe sąsiadów; ich stan jest kopiowany, zanim właściciele go zmienią
+    candidates = np.concatenate([own[:0]] + [_segment(shared["border"], after, shared["border_sizes"], neighbour)
+                                             for neighbour in neighbours])
+    ghosts = layout.ghosts(tile, owner, halo, candidates)
+    local = np.concatenate((own, ghosts))
+    local_status = pop.status[local].copy()
+    barrier.wait()
+
+    #Etap 3: szczepienia, transmisja, wyzdrowienia i odporność (zmieniane są tylko osoby kafelka)
+    n_own = len(own)
+    if params["vaccination_rate"] > 0:
+        susceptible = own[local_status[:n_own] == SUSCEPTIBLE]
+        daily_vaccinations = int(params["vaccination_rate"] * len(susceptible) / 100)
+        if daily_vaccinations > 0:
+            vaccinated = rng.choice(susceptible, min(daily_vaccinations, len(susceptible)), replace=False)
+            vaccinated = vaccinated[rng.random(len(vaccinated)) < params["vaccination_effectiveness"]]
+            pop.status[vaccinated] = RECOVERED
+            pop.immune_days[vaccinated] = 10000  #Długotrwała odporność szczepionkowa
+            local_status[np.searchsorted(own, vaccinated)] = RECOVERED
+    recovered = own[pop.status[own] == RECOVERED]
+
+    grid = SpatialGrid(cell_size=layout.radius, bounds=layout.bounds)
+    grid.rebuild(pop.x[local], pop.y[local])
+    #Chorzy w kolejności indeksów (own jest posortowane) - jak w algorytmie standardowym
+    pending = list(np.flatnonzero(local_status[:n_own] == INFECTED))
+    cross_infections = 0
+    while pending:
+        k = heapq.heappop(pending)
+        i = own[k]
+        others = grid.query_radius(grid.x[k], grid.y[k], layout.radius)
+        others = others[(local_status[others] == SUSCEPTIBLE) & (others != k)]
+        if len(others) > 0:
+            distance = np.sqrt((grid.x[others] - grid.x[k])**2 + (grid.y[others] - grid.y[k])**2)
+            infection_chance = params["infection_rate"] * (10 / (distance + 1))**2
+            newly_infected = others[rng.random(len(others)) < infection_chance]
+            local_status[newly_infected] = INFECTED
+            infected_here = newly_infected[newly_infected < n_own]
+            pop.status[own[infected_here]] = INFECTED
+            for j in infected_here[infected_here > k]:
+                heapq.heappush(pending, j)
+            #Duchy zarażone w tym kafelku - zgłoszenie dla ich właściciela
+            infected_ghosts = local[newly_infected[newly_infected >= n_own]]
+            flags[infected_ghosts] = 1
+            cross_infections += len(infected_ghosts)
+
+        #Wyzdrowienie lub śmierć
+        pop.days_infected[i] += 1
+        if rng.random() < params["mortality_rate"]:
+            pop.status[i] = DECEASED
+        elif rng.random() < params["recovery_rate"]:
+            pop.status[i] = RECOVERED
+            pop.immune_days[i] = params["immunity_period"]
+            pop.days_infected[i] = 0
+
+    expired = recovered[pop.immune_days[recovered] == 0]
+    pop.immune_days[recovered[pop.immune_days[recovered] > 0]] -= 1
+    pop.status[expired] = SUSCEPTIBLE  #Utrata odporności
+    barrier.wait()
+
+    #Etap 4: zarażenia zgłoszone przez sąsiednie kafelki (tylko osoby wciąż podatne)
+    reported = own[flags[own] != 0]
+    flags[reported] = 0
+    pop.status[reported[pop.status[reported] == SUSCEPTIBLE]] = INFECTED
+
+    counts = np.bincount(pop.status[own], minlength=len(COMPARTMENT_NAMES))
+    return {"counts": counts.tolist(), "migrated": migrated, "ghosts": len(ghosts), "cross_infections": cross_infections}, own
+
+def _tile_worker(tile, own, layout, specs, seed, random_state, barrier, connection):
+    """Proces kafelka: czeka na parametry dnia, liczy dzień i odsyła liczebności przedziałów swoich osób."""
+    memory, arrays = _attach(specs)
+    pop = PopulationArrays(0)
+    for name in SHARED_ARRAYS:
+        setattr(pop, name, arrays[name])
+    pop.size = len(pop.x)
+    rng = np.random.Generator(np.random.PCG64(seed))
+    if random_state is not None:
+        rng.bit_generator.state = random_state
+
+    while True:
+        params = connection.recv()
+        if params is None:
+            break
+        try:
+            result, own = _tile_day(tile, own, layout, pop, arrays, rng, params, barrier)
+            result["random"] = rng.bit_generator.state
+        except Exception:
+            #Przerwanie bariery zwalnia pozostałe kafelki czekające na ten proces
+            barrier.abort()
+            result = {"error": traceback.format_exc()}
+        connection.send(result)
+    del pop, arrays
+    for block in memory.values():
+        block.close()
+
+def _release(owner, workers, memory):
+    #Zatrzymanie procesów i zwolnienie pamięci współdzielonej (także przy zamykaniu interpretera)
+    if os.getpid() != owner:
+        return  #Kopia domeny odziedziczona przez proces potomny (fork) - zasoby należą do procesu głównego
+    for process, connection in workers:
+        try:
+            connection.send(None)
+        except (OSError, ValueError):
+            pass
+        process.join(timeout=1)
+        if process.is_alive():
+            process.terminate()
+    workers.clear()
+    for block in memory:
+        try:
+            block.close()
+        except BufferError:
+            pass  #Tablice populacji wciąż wskazują na blok - pamięć zostanie zwolniona razem z nimi
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+    memory.clear()
+
+class TiledDomain:
+    """Płaszczyzna podzielona na kafelki liczone równolegle przez osobne procesy (algorytm standardowy).
+
+    Tablice osób są przenoszone do multiprocessing.shared_memory - populacja w procesie głównym
+    i procesy kafelków widzą te same dane bez kopiowania. Dzień składa się z etapów rozdzielonych
+    barierą: ruch osób kafelka i migracja do nowych właścicieli, kopia stanu duchów (osób z sąsiednich
+    kafelków w odległości do promienia zarażenia od krawędzi), transmisja wewnątrz kafelka oraz
+    zastosowanie zarażeń duchów zgłoszonych przez sąsiadów. Zarażenia przez granicę kafelków
+    działają więc od następnego dnia - poza tym dzień przebiega jak w standard_algorithm.
+    """
+
+    def __init__(self, population, tiles, seed_sequence, radius, bounds=(100, 100), random_states=None):
+        self.layout = TileLayout(tiles, bounds, radius)
+        self.population = population
+        self.seeds = seed_sequence.spawn(tiles)
+        #Stan generatorów kafelków po ostatnim dniu (zapisywany w punkcie kontrolnym)
+        self.random_states = random_states
+        self._memory = []
+        self._workers = []
+        self.specs = {}
+        for name in SHARED_ARRAYS:
+            setattr(population, name, self._share(name, getattr(population, name)))
+        owner, halo = self.layout.assign(population.x, population.y)
+        self._share("owner", owner)
+        self._share("halo", halo)
+        self._share("neighbour_infected", np.zeros(len(population), dtype=np.uint8))
+        #Skrzynka migrantów i osoby brzegowe - każdy kafelek zapisuje we własnym fragmencie
+        self._share("outbox", np.zeros(len(population), dtype=np.int64))
+        self._share("border", np.zeros(len(population), dtype=np.int64))
+        #Liczebności kafelków przed ruchem i po migracji
+        self._share("tile_sizes", np.zeros((2, tiles), dtype=np.int64))
+        for name in ("outbox_sizes", "border_sizes"):
+            self._share(name, np.zeros(tiles, dtype=np.int64))
+        #Osoby każdego kafelka (rosnąco) - dalej procesy kafelków aktualizują je tylko o migrantów
+        order = np.argsort(owner, kind="stable")
+        self.members = np.split(order, np.cumsum(np.bincount(owner, minlength=tiles))[:-1])
+        n = len(COMPARTMENT_NAMES)
+        self.tile_counts = np.bincount(owner.astype(np.int64) * n + population.status, minlength=tiles * n).reshape(tiles, n)
+        #Statystyki ostatniego dnia: migracje, duchy i zarażenia przez granice kafelków
+        self.last_day = {"migrated": 0, "ghosts": 0, "cross_infections": 0}
+        self._finalizer = weakref.finalize(self, _release, os.getpid(), self._workers, self._memory)
+
+    def _share(self, name, array):
+        block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        self._memory.append(block)
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        view[:] = array
+        self.specs[name] = (block.name, array.dtype.str, array.shape)
+        return view
+
+    def start(self):
+        """Uruchamia procesy kafelków (przy pierwszym dniu symulacji)."""
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(self.layout.tiles)
+        for tile in range(self.layout.tiles):
+            parent, child = context.Pipe()
+            random_state = self.random_states[tile] if self.random_states is not None else None
+            process = context.Process(
+                target=_tile_worker,
+                args=(tile, self.members[tile], self.layout, self.specs, self.seeds[tile], random_state, barrier, child),
+                daemon=True
+            )
+            process.start()
+            self._workers.append((process, parent))
+
+    def simulate_day(self, config):
+        if not self._workers:
+            self.start()
+        params = {name: config[name] for name in TILE_PARAMETERS}
+        for _, connection in self._workers:
+            connection.send(params)
+        results = [connection.recv() for _, connection in self._workers]
+        errors = [result["error"] for result in results if "error" in result]
+        if errors:
+            self.close()
+            raise RuntimeError("błąd w procesie kafelka:\n" + errors[0])
+
+        self.tile_counts = np.array([result["counts"] for result in results])
+        self.random_states = [result["random"] for result in results]
+        self.last_day = {key: sum(result[key] for result in results) for key in self.last_day}
+
+    def counts(self):
+        sizes = self.tile_counts.sum(axis=0)
+        return {name: int(sizes[code]) for code, name in enumerate(COMPARTMENT_NAMES)}
+
+    def check_consistency(self):
+        """Sprawdza zgodność liczników kafelków z pełnym przeliczeniem populacji (tryb diagnostyczny)."""
+        expected = np.bincount(self.population.status, minlength=len(COMPARTMENT_NAMES))
+        if not np.array_equal(self.tile_counts.sum(axis=0), expected):
+            raise RuntimeError(f"liczniki kafelków {self.tile_counts.sum(axis=0).tolist()} != {expected.tolist()}")
+
+    def close(self):
+        """Zatrzymuje procesy kafelków (pamięć współdzielona pozostaje do zwolnienia populacji)."""
+        for process, connection in self._workers:
+            connection.send(None)
+            process.join()
+        self._workers.clear()
+
+    def release(self):
+        """Zatrzymuje procesy kafelków i usuwa bloki pamięci współdzielonej (domena nie nadaje się już do użycia)."""
+        self._finalizer()
@@ -0,0 +1,186 @@
+import collections
+
+import numpy as np
+from models.population_arrays import SUSCEPTIBLE, INFECTED, RECOVERED, DECEASED
+
+#Domyślne parametry kampanii szczepień (config["vaccination_campaign"] nadpisuje wybrane z nich)
+CAMPAIGN_DEFAULTS = {
+    "daily_doses": 100,              #Liczba dawek podawanych dziennie (pierwsze i drugie razem)
+    "priority": "sociability",       #Kolejność osób: "sociability" (najbardziej towarzyskie najpierw) lub "random"
+    "start_day": 0,                  #Dzień rozpoczęcia kampanii
+    "second_dose_interval": 0,       #Odstęp drugiej dawki w dniach (0 - schemat jednodawkowy)
+    "first_dose_effectiveness": None,  #Skuteczność po pierwszej dawce (None - vaccination_effectiveness)
+    "waning_period": 0,              #Średni czas ochrony po szczepieniu w dniach (0 - ochrona bez wygasania)
+}
+PRIORITIES = ("sociability", "random")
+
+#Odporność szczepionkowa bez wygasania (jak w DiseaseSimulation._apply_vaccinations)
+LONG_PROTECTION = 10000
+
+class VaccinationCampaign:
+    """Kampania szczepień z dzienną liczbą dawek, kolejnością priorytetów i drugimi dawkami.
+
+    Kolejność osób jest ustalana raz na początku kampanii, a wskaźnik przesuwa się po niej
+    w miarę podawania dawek, więc koszt dnia jest proporcjonalny do liczby dawek (i osób
+    wracających do podatnych), a nie do wielkości populacji. Pierwszą dawkę otrzymują osoby
+    podatne; osoby chore, narażone lub odporne w swojej kolejce są odkładane, a gdy znów staną się
+    podatne (symulacja zgłasza je przez requeue), dostają dawkę przed dalszą częścią kolejki.
+    Chronieni przechodzą do ozdrowieńców
+    z odpornością losowaną z rozkładu wykładniczego o średniej waning_period, więc skuteczność
+    maleje wykładniczo z czasem od szczepienia.
+    """
+
+    def __init__(self, population, settings, rng):
+        self.settings = dict(CAMPAIGN_DEFAULTS, **settings)
+        if self.settings["priority"] not in PRIORITIES:
+            raise ValueError(f"nieznany priorytet kampanii szczepień: {self.settings['priority']}")
+        if self.settings["priority"] == "sociability":
+            #Stabilne sortowanie - przy równej towarzyskości decyduje indeks osoby
+            self.order = np.argsort(-population.sociability, kind="stable")
+        else:
+            self.order = rng.permutation(len(population))
+        self._init_queues(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        #Pozycja w kolejce pierwszych dawek
+        self.position = 0
+        #Liczba dawek każdej osoby
+        self.doses = np.zeros(len(population), dtype=np.int8)
+        #Kohorty oczekujące na drugą dawkę: (dzień podania, indeksy osób), od najwcześniejszej
+        self.second_doses = collections.deque()
+
+    @classmethod
+    def from_state(cls, population, settings, state):
+        """Odtwarza kampanię z get_state() (zapisaną w punkcie kontrolnym)."""
+        campaign = cls.__new__(cls)
+        campaign.settings = dict(CAMPAIGN_DEFAULTS, **settings)
+        campaign.order = np.array(state["order"], dtype=np.int64)
+        campaign.position = int(state["position"])
+        campaign.doses = np.array(state["doses"], dtype=np.int8)
+        deferred = np.array(state.get("deferred", []), dtype=np.int64)
+        if "ready" in state:
+            ready = np.array(state["ready"], dtype=np.int64)
+        else:
+            #Starsze punkty kontrolne - odłożeni, którzy już są podatni, czekają na dawkę
+            ready = deferred[campaign._susceptible(population, deferred)]
+        campaign._init_queues(deferred, ready)
+        offsets = np.concatenate(([0], np.cumsum(state["second_sizes"])))
+        campaign.second_doses = collections.deque(
+            (int(day), np.array(state["second_members"][start:end], dtype=np.int64))
+            for day, start, end in zip(state["second_days"], offsets[:-1], offsets[1:])
+        )
+        return campaign
+
+    def _init_queues(self, deferred, ready):
+        #Miejsce każdej osoby w kolejności priorytetów
+        self.rank = np.empty(len(self.order), dtype=np.int64)
+        self.rank[self.order] = np.arange(len(self.order))
+        #Osoby z kolejki niepodatne w swojej kolejce (odłożone do powrotu do podatnych)
+        self.waiting = np.zeros(len(self.order), dtype=np.bool_)
+        self.waiting[deferred] = True
+        #Odłożeni zgłoszeni jako znów podatni - w kolejności priorytetów
+        self.ready = ready
+
+    @property
+    def deferred(self):
+        """Odłożeni (również zgłoszeni jako gotowi) w kolejności priorytetów - przegląda całą populację."""
+        waiting = np.flatnonzero(self.waiting)
+        return waiting[np.argsort(self.rank[waiting], kind="stable")]
+
+    def get_state(self):
+        """Kolejka priorytetów, liczby dawek i kohorty drugich dawek jako tablice NumPy."""
+        cohorts = list(self.second_doses)
+        return {
+            "order": self.order,
+            "position": np.array(self.position),
+            "deferred": self.deferred,
+            "ready": self.ready,
+            "doses": self.doses,
+            "second_days": np.array([day for day, _ in cohorts], dtype=np.int64),
+            "second_sizes": np.array([len(members) for _, members in cohorts], dtype=np.int64),
+            "second_members": np.concatenate([members for _, members in cohorts] or [np.empty(0, dtype=np.int64)]),
+        }
+
+    def apply(self, population, day, effectiveness, rng):
+        """Podaje dawki zaplanowane na dany dzień - najpierw zaległe drugie dawki. Zwraca liczbę podanych dawek."""
+        settings = self.settings
+        if day < settings["start_day"]:
+            return 0
+        capacity = settings["daily_doses"]
+        first_effectiveness = settings["first_dose_effectiveness"]
+        if first_effectiveness is None:
+            first_effectiveness = effectiveness
+
+        given = 0
+        #Drugie dawki: podatni chronieni z prawdopodobieństwem warunkowym, tak by łączna skuteczność była równa effectiveness
+        boost = (effectiveness - first_effectiveness) / (1 - first_effectiveness) if first_effectiveness < 1 else 0.0
+        while given < capacity and self.second_doses and self.second_doses[0][0] <= day:
+            due, members = self.second_doses.popleft()
+            batch, rest = members[:capacity - given], members[capacity - given:]
+            if len(rest) > 0:
+                self.second_doses.appendleft((due, rest))
+            batch = self._eligible(population, batch)
+            self._vaccinate(population, batch, max(boost, 0.0), rng)
+            given += len(batch)
+
+        #Pierwsze dawki w kolejności priorytetów - najpierw odłożeni, którzy znów są podatni
+        scheduled = []
+        returned = []
+        while given < capacity and len(self.ready) > 0:
+            batch, self.ready = self.ready[:capacity - given], self.ready[capacity - given:]
+            #Ponownie narażeni lub chorzy czekają na kolejne zgłoszenie (pozostają odłożeni)
+            batch = batch[self._susceptible(population, batch)]
+            returned.append(batch)
+            given += len(batch)
+        if returned:
+            batch = np.concatenate(returned)
+            self.waiting[batch] = False
+            self._vaccinate(population, batch, first_effectiveness, rng)
+            scheduled.append(batch)
+        while given < capacity and self.position < len(self.order):
+            batch = self.order[self.position:self.position + capacity - given]
+            self.position += len(batch)
+            #Osoby niepodatne czekają na swoją kolej w odłożonych (zmarli są pomijani)
+            ready = self._susceptible(population, batch)
+            self.waiting[batch[~ready & (population.status[batch] != DECEASED)]] = True
+            batch = batch[ready]
+            self._vaccinate(population, batch, first_effectiveness, rng)
+            scheduled.append(batch)
+            given += len(batch)
+        if settings["second_dose_interval"] > 0 and scheduled:
+            self.second_doses.append((day + settings["second_dose_interval"], np.concatenate(scheduled)))
+        return given
+
+    def requeue(self, indices):
+        """Zgłasza osoby, które znów stały się podatne - odłożone z nich trafiają do kolejki gotowych."""
+        returned = indices[self.waiting[indices]]
+        if len(returned) == 0:
+            return
+        returned = returned[np.argsort(self.rank[returned], kind="stable")]
+        #Wstawienie z zachowaniem kolejności priorytetów (osoba zgłoszona ponownie nie jest dublowana)
+        returned = returned[~np.isin(returned, self.ready)]
+        positions = np.searchsorted(self.rank[self.ready], self.rank[returned])
+        self.ready = np.insert(self.ready, positions, returned)
+
+    def _susceptible(self, population, batch):
+        return (population.status[batch] == SUSCEPTIBLE) & ~population.exposed[batch]
+
+    def _eligible(self, population, batch):
+        status = population.status[batch]
+        return batch[(status != INFECTED) & (status != DECEASED)]
+
+    def _vaccinate(self, population, batch, effectiveness, rng):
+        self.doses[batch] += 1
+        protection = self._protection(len(batch), rng)
+        #Ozdrowieńcy (po chorobie lub wcześniejszej dawce) - dawka przedłuża odporność
+        recovered = population.status[batch] == RECOVERED
+        population.immune_days[batch[recovered]] = np.maximum(population.immune_days[batch[recovered]], protection[recovered])
+        #Podatni (bez narażonych w modelu SEIR) - ochrona z prawdopodobieństwem równym skuteczności dawki
+        candidates = (population.status[batch] == SUSCEPTIBLE) & ~population.exposed[batch]
+        protected = candidates & (rng.random(len(batch)) < effectiveness)
+        population.set_status(batch[protected], RECOVERED)
+        population.immune_days[batch[protected]] = protection[protected]
+
+    def _protection(self, count, rng):
+        waning_period = self.settings["waning_period"]
+        if waning_period <= 0:
+            return np.full(count, LONG_PROTECTION, dtype=np.int32)
+        return np.maximum(1, np.rint(rng.exponential(waning_period, count))).astype(np.int32)
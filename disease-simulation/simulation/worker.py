@@ -0,0 +1,67 @@
+import queue
+import threading
+
+#Atrybuty osób kopiowane do migawek przekazywanych do wizualizacji
+SNAPSHOT_ATTRIBUTES = ("x", "y", "status", "days_infected")
+
+class SimulationWorker(threading.Thread):
+    """Symulacja liczona w osobnym wątku, publikująca migawki każdego dnia do ograniczonej kolejki.
+
+    Wizualizacja odbiera migawki we własnym tempie (drain), a zmiany ustawień interwencji
+    (set_control) są stosowane dopiero na granicy dni, więc dzień jest zawsze liczony
+    ze spójną konfiguracją.
+    """
+
+    def __init__(self, simulation, max_snapshots=4):
+        super().__init__(daemon=True)
+        self.simulation = simulation
+        self.snapshots = queue.Queue(maxsize=max_snapshots)
+        self._controls = {}
+        self._controls_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def set_control(self, name, value):
+        """Zmienia parametr konfiguracji od następnego dnia symulacji (bezpieczne z innego wątku)."""
+        with self._controls_lock:
+            self._controls[name] = value
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        simulation = self.simulation
+        self._publish()
+        while simulation.day < simulation.config["simulation_days"] and not self._stop_event.is_set():
+            #Granica dni - zastosowanie zmian ustawień zgłoszonych w trakcie poprzedniego dnia
+            with self._controls_lock:
+                controls, self._controls = self._controls, {}
+            simulation.config.update(controls)
+
+            simulation.simulate_day()
+            simulation.record_stats()
+            self._publish()
+
+    def _publish(self):
+        pop = self.simulation.population
+        snapshot = {name: getattr(pop, name).copy() for name in SNAPSHOT_ATTRIBUTES}
+        snapshot["stats"] = dict(self.simulation.stats_history[-1])
+        #Pełna kolejka wstrzymuje symulację, dopóki wizualizacja nie odbierze migawek (żaden dzień nie ginie)
+        while not self._stop_event.is_set():
+            try:
+                self.snapshots.put(snapshot, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def drain(self):
+        """Wszystkie migawki oczekujące w kolejce (bez czekania), od najstarszej."""
+        snapshots = []
+        while True:
+            try:
+                snapshots.append(self.snapshots.get_nowait())
+            except queue.Empty:
+                return snapshots
+
+    def finished(self):
+        """Czy symulacja się zakończyła, a wszystkie migawki zostały odebrane."""
+        return not self.is_alive() and self.snapshots.empty()
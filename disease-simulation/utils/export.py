@@ -0,0 +1,158 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+#Kolumny tablicy statystyk używanej przez eksport (jak historia w wizualizacji na żywo)
+EXPORT_STATS = ("day", "susceptible", "infected", "recovered", "deceased")
+#Rozdzielczość zapisywanych klatek
+EXPORT_DPI = 80
+EXPORT_FIGSIZE = (16, 7)
+#Szybka kompresja PNG - klatki są plikami pośrednimi dla GIF/MP4
+PNG_COMPRESS_LEVEL = 1
+
+def stats_array(stats_history):
+    """Statystyki w tablicy (dni x EXPORT_STATS) - przekazywane do procesów renderujących."""
+    return np.array([[stats[name] for name in EXPORT_STATS] for stats in stats_history], dtype=np.int64)
+
+def frame_path(directory, day):
+    return os.path.join(directory, f"frame_{day:04d}.png")
+
+#Stan procesu renderującego - figura tworzona raz na proces i używana dla wszystkich jego klatek
+_worker = {}
+
+def _init_worker(snapshot_path, stats, heatmap_threshold):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from utils.output_sinks import load_agent_snapshots
+    from utils.visualization import BASE_COLORS, PopulationRenderer
+
+    days, snapshots = load_agent_snapshots(snapshot_path)
+    population_size = snapshots.shape[1]
+
+    plt.style.use('dark_background')
+    fig, (ax_main, ax_stats) = plt.subplots(1, 2, figsize=EXPORT_FIGSIZE, gridspec_kw={'width_ratios': [2, 1]})
+    fig.suptitle('Symulacja Rozprzestrzeniania się Choroby', fontsize=18, color='white')
+    ax_main.set_title('Rozmieszczenie Populacji', fontsize=14, color='white')
+    ax_main.set_xlim(0, 100)
+    ax_main.set_ylim(0, 100)
+    ax_main.set_facecolor('#111111')
+    renderer = PopulationRenderer(ax_main, population_size, heatmap_threshold=heatmap_threshold)
+    day_text = ax_main.text(2, 95, '', fontsize=12, color='white')
+
+    ax_stats.set_title('Przebieg epidemii', fontsize=14, color='white')
+    ax_stats.set_xlabel('Dzień', color='white')
+    ax_stats.set_ylabel('Liczba osób', color='white')
+    ax_stats.set_facecolor('#111111')
+    ax_stats.grid(True, alpha=0.3)
+    ax_stats.set_xlim(0, max(stats[-1, 0], 1))
+    ax_stats.set_ylim(0, population_size)
+    labels = ('Podatni', 'Zarażeni', 'Ozdrowieńcy', 'Zmarli')
+    lines = [ax_stats.plot([], [], '-', color=BASE_COLORS[name], linewidth=2, label=label)[0]
+             for name, label in zip(EXPORT_STATS[1:], labels)]
+    ax_stats.legend(loc='upper right')
+    fig.tight_layout()
+
+    #Tło (osie, opisy, legenda) rysowane raz - w każdej klatce tylko zmienne elementy na jego kopii
+    artists = [renderer.artist, day_text] + lines
+    for artist in artists:
+        artist.set_animated(True)
+    fig.set_dpi(EXPORT_DPI)
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+
+    _worker.update(days=days, snapshots=snapshots, stats=stats, figure=fig, background=background,
+                   artists=artists, renderer=renderer, lines=lines, day_text=day_text)
+
+def _render_frames(slots, directory):
+    """Renderuje klatki dla podanych pozycji w pliku migawek (w procesie roboczym)."""
+    from PIL import Image
+    days, snapshots, stats = _worker["days"], _worker["snapshots"], _worker["stats"]
+    canvas = _worker["figure"].canvas
+    for slot in slots:
+        day = int(days[slot])
+        snapshot = snapshots[slot]
+        _worker["renderer"].update(snapshot["x"], snapshot["y"], snapshot["status"], snapshot["days_infected"])
+        shown = stats[stats[:, 0] <= day]
+        for column, line in enumerate(_worker["lines"], start=1):
+            line.set_data(shown[:, 0], shown[:, column])
+        _worker["day_text"].set_text(f'Dzień: {day}')
+
+        canvas.restore_region(_worker["background"])
+        for artist in _worker["artists"]:
+            artist.axes.draw_artist(artist)
+        image = np.asarray(canvas.buffer_rgba())[:, :, :3]
+        Image.fromarray(image).save(frame_path(directory, day), compress_level=PNG_COMPRESS_LEVEL)
+    return len(slots)
+
+def render_frames(snapshot_path, stats, directory, workers=None, heatmap_threshold=None, progress=None):
+    """Renderuje migawki osób do plików PNG równolegle w wielu procesach (backend Agg, bez ekranu).
+
+    Każdy proces otwiera plik migawek mapowany w pamięci i rysuje przydzieloną część dni.
+    Zwraca listę ścieżek klatek w kolejności dni.
+    """
+    from utils.output_sinks import load_agent_snapshots
+    from utils.visualization import HEATMAP_THRESHOLD
+
+    days, _ = load_agent_snapshots(snapshot_path)
+    slots = np.flatnonzero(days >= 0)
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(directory, exist_ok=True)
+    heatmap_threshold = heatmap_threshold if heatmap_threshold is not None else HEATMAP_THRESHOLD
+
+    #Kilka paczek na proces - równomierne obciążenie przy różnym czasie rysowania klatek
+    chunks = [chunk for chunk in np.array_split(slots, workers * 4) if len(chunk) > 0]
+    initargs = (snapshot_path, stats, heatmap_threshold)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+        done = 0
+        for rendered in executor.map(_render_frames, chunks, [directory] * len(chunks)):
+            done += rendered
+            if progress is not None:
+                progress(done, len(slots))
+    return [frame_path(directory, int(days[slot])) for slot in slots]
+
+def write_gif(frames, path, fps, colors=64):
+    """Składa klatki w GIF ze wspólną paletą (z pierwszej i ostatniej klatki) - bez osobnej kwantyzacji każdej klatki."""
+    from PIL import Image
+    images = [Image.open(frame).convert("RGB") for frame in frames]
+    sample = Image.fromarray(np.vstack((np.asarray(images[0]), np.asarray(images[-1]))))
+    palette = sample.quantize(colors=colors, method=Image.Quantize.MEDIANCUT)
+    images = [image.quantize(palette=palette, dither=Image.Dither.NONE) for image in images]
+    images[0].save(path, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0, optimize=False)
+
+def _find_ffmpeg():
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("zapis MP4 wymaga programu ffmpeg (dostępne bez niego: katalog klatek PNG lub .gif)")
+    return ffmpeg
+
+def write_mp4(directory, path, fps):
+    ffmpeg = _find_ffmpeg()
+    subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps), "-pattern_type", "glob",
+         "-i", os.path.join(directory, "frame_*.png"), "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+         "-pix_fmt", "yuv420p", path],
+        check=True
+    )
+
+def export_animation(snapshot_path, stats, output, fps=10, workers=None, heatmap_threshold=None, progress=None):
+    """Eksport animacji z zapisanych migawek: katalog klatek PNG, plik .gif lub .mp4 (wg rozszerzenia)."""
+    extension = os.path.splitext(output)[1].lower()
+    if extension not in ("", ".gif", ".mp4"):
+        raise ValueError(f"nieznany format eksportu: {output} (dostępne: katalog, .gif, .mp4)")
+    if extension == ".mp4":
+        _find_ffmpeg()  #Brak ffmpeg zgłaszany przed renderowaniem klatek
+    if extension == "":
+        return render_frames(snapshot_path, stats, output, workers, heatmap_threshold, progress)
+
+    with tempfile.TemporaryDirectory() as directory:
+        frames = render_frames(snapshot_path, stats, directory, workers, heatmap_threshold, progress)
+        if extension == ".gif":
+            write_gif(frames, output, fps)
+        else:
+            write_mp4(directory, output, fps)
+    return [output]
@@ -0,0 +1,272 @@
+import csv
+import os
+import numpy as np
+from models.population_arrays import COMPARTMENT_NAMES
+
+#Kolumny dziennych statystyk zapisywanych przez ujścia
+STATS_COLUMNS = ("day",) + COMPARTMENT_NAMES
+
+#Atrybuty osób zapisywane w migawkach (nazwa, typ w pliku)
+SNAPSHOT_FIELDS = (
+    ("x", np.float32), ("y", np.float32), ("status", np.int8), ("exposed", np.bool_), ("days_infected", np.int32)
+)
+
+def _import_pyarrow():
+    #pyarrow jest potrzebny tylko dla formatów Parquet i Arrow
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("zapis w formacie Parquet/Arrow wymaga pakietu pyarrow (pip install pyarrow)") from error
+    return pyarrow
+
+class OutputSink:
+    """Ujście wyników - otrzymuje statystyki każdego dnia zaraz po ich wyliczeniu."""
+
+    def write(self, stats, simulation):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class CsvStatsSink(OutputSink):
+    """Dzienne liczebności przedziałów dopisywane do pliku CSV (wiersz jest zapisywany na dysk od razu).
+
+    Przy wznawianiu symulacji (resume) wiersze sprzed wznowionego dnia pozostają w pliku,
+    a późniejsze (zapisane po ostatnim punkcie kontrolnym) są zastępowane nowymi.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.file = None
+        self.writer = None
+        if not (resume and os.path.exists(path)):
+            self._create([])
+
+    def _create(self, rows):
+        #Nowa zawartość powstaje obok i zastępuje plik atomowo - przerwanie nie gubi wcześniejszych wierszy
+        with open(self.path + ".tmp", "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(STATS_COLUMNS)
+            writer.writerows(rows)
+        os.replace(self.path + ".tmp", self.path)
+        self.file = open(self.path, "a", newline="")
+        self.writer = csv.writer(self.file)
+
+    def _reopen(self, day):
+        with open(self.path, newline="") as file:
+            rows = list(csv.reader(file))
+        if not rows or tuple(rows[0]) != STATS_COLUMNS:
+            raise ValueError(f"plik statystyk {self.path} nie pasuje do wznawianej symulacji")
+        self._create([row for row in rows[1:] if int(row[0]) < day])
+
+    def write(self, stats, simulation):
+        if self.file is None:
+            self._reopen(stats["day"])
+        self.writer.writerow([stats[name] for name in STATS_COLUMNS])
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+class _ArrowStatsSink(OutputSink):
+    """Wspólna część ujść pyarrow - statystyki buforowane i zapisywane partiami po batch_days dni.
+
+    Przy wznawianiu symulacji (resume) wiersze sprzed wznowionego dnia są wczytywane z istniejącego
+    pliku i zapisywane ponownie na początku nowego, późniejsze są zastępowane nowymi.
+    """
+
+    def __init__(self, path, batch_days, resume=False):
+        self.pyarrow = _import_pyarrow()
+        self.schema = self.pyarrow.schema([(name, self.pyarrow.int64()) for name in STATS_COLUMNS])
+        self.path = path
+        self.batch_days = batch_days
+        self.buffer = []
+        self.writer = None
+        if not (resume and os.path.exists(path)):
+            self._open_writer()
+
+    def _reopen(self, day):
+        table = self._read_existing()
+        if table.schema.names != list(STATS_COLUMNS):
+            raise ValueError(f"plik statystyk {self.path} nie pasuje do wznawianej symulacji")
+        columns = [table.column(name).to_numpy() for name in STATS_COLUMNS]
+        self.buffer = np.column_stack(columns)[columns[0] < day].tolist()
+        self._open_writer()
+
+    def write(self, stats, simulation):
+        if self.writer is None:
+            self._reopen(stats["day"])
+        self.buffer.append([stats[name] for name in STATS_COLUMNS])
+        if len(self.buffer) >= self.batch_days:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        columns = np.array(self.buffer, dtype=np.int64).T
+        self._write_batch(self.pyarrow.record_batch(list(columns), schema=self.schema))
+        self.buffer = []
+
+    def _open_writer(self):
+        raise NotImplementedError
+
+    def _read_existing(self):
+        raise NotImplementedError
+
+    def _write_batch(self, batch):
+        raise NotImplementedError
+
+class ParquetStatsSink(_ArrowStatsSink):
+    """Statystyki w pliku Parquet - jedna grupa wierszy na partię; plik jest czytelny po zamknięciu."""
+
+    def __init__(self, path, batch_days=30, resume=False):
+        super().__init__(path, batch_days, resume)
+
+    def _open_writer(self):
+        self.writer = self.pyarrow.parquet.ParquetWriter(self.path, self.schema)
+
+    def _read_existing(self):
+        return self.pyarrow.parquet.read_table(self.path)
+
+    def _write_batch(self, batch):
+        self.writer.write_batch(batch)
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.flush()
+        self.writer.close()
+
+class ArrowStatsSink(_ArrowStatsSink):
+    """Statystyki w strumieniu Arrow IPC - zapisane partie można czytać jeszcze w trakcie symulacji."""
+
+    def __init__(self, path, batch_days=1, resume=False):
+        super().__init__(path, batch_days, resume)
+
+    def _open_writer(self):
+        self.file = self.pyarrow.OSFile(self.path, "wb")
+        self.writer = self.pyarrow.ipc.new_stream(self.file, self.schema)
+
+    def _read_existing(self):
+        with self.pyarrow.OSFile(self.path, "rb") as file:
+            return self.pyarrow.ipc.open_stream(file).read_all()
+
+    def _write_batch(self, batch):
+        self.writer.write_batch(batch)
+        self.file.flush()
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.flush()
+        self.writer.close()
+        self.file.close()
+
+def snapshot_days_path(path):
+    """Plik z numerami dni zapisanych migawek (obok pliku migawek)."""
+    root, extension = os.path.splitext(path)
+    return f"{root}_days{extension or '.npy'}"
+
+class AgentSnapshotSink(OutputSink):
+    """Migawki atrybutów wszystkich osób co every dni w pliku .npy mapowanym w pamięci.
+
+    Plik ma kształt (liczba migawek x populacja) i jest tworzony od razu w pełnym rozmiarze.
+    Dzień migawki trafia do pliku *_days.npy dopiero po jej zapisaniu, więc czytelnik
+    (load_agent_snapshots) może bezpiecznie używać migawek z dniem różnym od -1.
+    Przy wznawianiu symulacji (resume) istniejący plik jest otwierany do dopisywania - migawki
+    sprzed punktu kontrolnego pozostają, a plik jest powiększany, jeśli przebieg wydłużono.
+    """
+
+    def __init__(self, path, every, fields=SNAPSHOT_FIELDS, resume=False):
+        self.path = path
+        self.every = every
+        self.resume = resume
+        self.dtype = np.dtype([(name, dtype) for name, dtype in fields])
+        self.snapshots = None
+        self.days = None
+
+    def _open(self, simulation):
+        capacity = simulation.config["simulation_days"] // self.every + 1
+        shape = (capacity, len(simulation.population))
+        days_path = snapshot_days_path(self.path)
+        if self.resume and os.path.exists(self.path) and os.path.exists(days_path):
+            self._reopen(shape, days_path)
+            return
+        self.snapshots = np.lib.format.open_memmap(self.path, mode="w+", dtype=self.dtype, shape=shape)
+        self.days = np.lib.format.open_memmap(days_path, mode="w+", dtype=np.int64, shape=(capacity,))
+        self.days[:] = -1
+        self.days.flush()
+
+    def _reopen(self, shape, days_path):
+        snapshots = np.lib.format.open_memmap(self.path, mode="r+")
+        days = np.lib.format.open_memmap(days_path, mode="r+")
+        if snapshots.dtype != self.dtype or snapshots.shape[1] != shape[1] or len(days) != len(snapshots):
+            raise ValueError(f"plik migawek {self.path} nie pasuje do wznawianej symulacji")
+        if len(snapshots) < shape[0]:
+            #Przebieg wydłużony po wznowieniu - większy plik z przepisanymi migawkami zastępuje poprzedni
+            grown = np.lib.format.open_memmap(self.path + ".tmp", mode="w+", dtype=self.dtype, shape=shape)
+            grown[:len(snapshots)] = snapshots
+            grown.flush()
+            grown_days = np.full(shape[0], -1, dtype=np.int64)
+            grown_days[:len(days)] = days
+            del snapshots, days, grown
+            os.replace(self.path + ".tmp", self.path)
+            np.save(days_path, grown_days)
+            snapshots = np.lib.format.open_memmap(self.path, mode="r+")
+            days = np.lib.format.open_memmap(days_path, mode="r+")
+        self.snapshots, self.days = snapshots, days
+
+    def write(self, stats, simulation):
+        day = stats["day"]
+        if day % self.every != 0:
+            return
+        if simulation.aggregate is not None:
+            raise ValueError("migawki osób są niedostępne w modelu zagregowanym")
+        if self.snapshots is None:
+            self._open(simulation)
+        slot = day // self.every
+        if slot >= len(self.days):
+            return  #Dni poza zakresem zaplanowanym przy tworzeniu pliku
+
+        snapshot = self.snapshots[slot]
+        for name in self.dtype.names:
+            snapshot[name] = getattr(simulation.population, name)
+        self.snapshots.flush()
+        self.days[slot] = day
+        self.days.flush()
+
+    def close(self):
+        #Zamknięcie mapowania - dane są już zapisane w pliku
+        self.snapshots = None
+        self.days = None
+
+def load_agent_snapshots(path):
+    """Otwiera migawki bez kopiowania: (dni migawek, tablica migawek x osoby mapowana w pamięci).
+
+    Dzień -1 oznacza migawkę, która nie została jeszcze zapisana.
+    """
+    days = np.array(np.load(snapshot_days_path(path), mmap_mode="r"))
+    return days, np.load(path, mmap_mode="r")
+
+def create_sinks(config):
+    """Ujścia wybrane w konfiguracji - format statystyk wynika z rozszerzenia pliku output_path."""
+    sinks = []
+    output_path = config.get("output_path")
+    resume = bool(config.get("resume"))
+    if output_path:
+        extension = os.path.splitext(output_path)[1].lower()
+        if extension == ".csv":
+            sinks.append(CsvStatsSink(output_path, resume=resume))
+        elif extension == ".parquet":
+            sinks.append(ParquetStatsSink(output_path, resume=resume))
+        elif extension in (".arrow", ".arrows"):
+            sinks.append(ArrowStatsSink(output_path, resume=resume))
+        else:
+            raise ValueError(f"nieznany format pliku wyników: {output_path} (dostępne: .csv, .parquet, .arrow)")
+    if config.get("snapshot_path"):
+        sinks.append(AgentSnapshotSink(config["snapshot_path"], config.get("snapshot_interval", 10),
+                                       resume=resume))
+    return sinks
@@ -1,8 +1,114 @@
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import numpy as np
-from matplotlib.widgets import Button, Slider, RadioButtons
+from matplotlib.widgets import Button, Slider
 import matplotlib.patches as patches
+import itertools
+from matplotlib.colors import ListedColormap, to_rgb
+from models.population_arrays import INFECTED, RECOVERED, DECEASED
+from simulation.worker import SimulationWorker
+
+#Kolory dla różnych stanów z gradientem dla zarażonych
+BASE_COLORS = {
+    'susceptible': '#3498db',  #Niebieski
+    'infected': '#e74c3c',     #Czerwony
+    'recovered': '#2ecc71',    #Zielony
+    'deceased': '#7f8c8d'      #Szary
+}
+
+#Gradient zarażonych od jasno- do ciemnoczerwonego - jeden odcień na dzień infekcji (maks. 14 dni)
+INFECTION_SHADE_DAYS = 14
+_progress = np.arange(INFECTION_SHADE_DAYS + 1) / INFECTION_SHADE_DAYS
+_infected_shades = np.column_stack((0.9 - 0.5 * _progress, 0.2 - 0.2 * _progress, 0.2 - 0.2 * _progress))
+
+#Mapa kolorów indeksowana kodem koloru: podatni, odcienie zarażonych, ozdrowieńcy, zmarli
+STATUS_CMAP = ListedColormap(np.vstack((
+    to_rgb(BASE_COLORS['susceptible']), _infected_shades, to_rgb(BASE_COLORS['recovered']), to_rgb(BASE_COLORS['deceased'])
+)))
+#Kod koloru dla statusu (zarażeni: kod pierwszego odcienia + dni infekcji)
+COLOR_INDEX = np.zeros(4, dtype=np.int16)
+COLOR_INDEX[INFECTED] = 1
+COLOR_INDEX[RECOVERED] = INFECTION_SHADE_DAYS + 2
+COLOR_INDEX[DECEASED] = INFECTION_SHADE_DAYS + 3
+#Rozmiar kropki dla statusu - rozmiar zarażonych rośnie wraz z czasem infekcji, zmarli są mniejsi
+POINT_SIZE = np.array([30.0, 30.0, 30.0, 20.0])
+INFECTED_SIZE_GROWTH = 40.0
+
+#Liczba osób, powyżej której zamiast kropek rysowana jest mapa gęstości
+HEATMAP_THRESHOLD = 20000
+#Liczba komórek mapy gęstości w każdym wymiarze
+HEATMAP_BINS = 100
+#Kolory statusów (RGB) mieszane w komórkach mapy gęstości
+STATUS_RGB = np.array([to_rgb(BASE_COLORS[name]) for name in ('susceptible', 'infected', 'recovered', 'deceased')])
+
+class PopulationRenderer:
+    """Widok rozmieszczenia populacji aktualizowany bezpośrednio z tablic NumPy.
+    
+    Do HEATMAP_THRESHOLD osób rysowane są kropki (pozycje, kody kolorów i rozmiary w tablicach
+    przydzielonych raz), powyżej - obraz gęstości: jasność komórki to liczba osób,
+    a barwa to mieszanka kolorów statusów w proporcji do ich liczebności.
+    """
+    
+    def __init__(self, ax, size, bounds=(100, 100), heatmap_threshold=HEATMAP_THRESHOLD, bins=HEATMAP_BINS):
+        self.size = size
+        self.bounds = bounds
+        self.heatmap = size > heatmap_threshold
+        if self.heatmap:
+            self.bins = bins
+            self._image = np.zeros((bins, bins, 3))
+            self.artist = ax.imshow(self._image, extent=(0, bounds[0], 0, bounds[1]), origin='lower',
+                                    interpolation='nearest', aspect='auto')
+            self._cells = np.empty(size, dtype=np.int64)
+            self._cell_y = np.empty(size, dtype=np.int64)
+        else:
+            self._offsets = np.zeros((size, 2))
+            self._colors = np.zeros(size, dtype=np.int16)
+            self._sizes = np.zeros(size)
+            self._shade = np.zeros(size, dtype=np.int32)
+            self.artist = ax.scatter(self._offsets[:, 0], self._offsets[:, 1], c=self._colors, s=self._sizes,
+                                     cmap=STATUS_CMAP, vmin=-0.5, vmax=STATUS_CMAP.N - 0.5,
+                                     alpha=0.7, edgecolors='white')
+    
+    def update(self, x, y, status, days_infected):
+        """Odświeża widok na podstawie tablic pozycji, statusów i dni infekcji."""
+        if self.heatmap:
+            self._update_heatmap(x, y, status)
+        else:
+            self._update_scatter(x, y, status, days_infected)
+        return self.artist
+    
+    def _update_scatter(self, x, y, status, days_infected):
+        self._offsets[:, 0] = x
+        self._offsets[:, 1] = y
+        infected = status == INFECTED
+        np.minimum(days_infected, INFECTION_SHADE_DAYS, out=self._shade)
+        self._shade *= infected
+        np.take(COLOR_INDEX, status, out=self._colors)
+        self._colors += self._shade
+        np.take(POINT_SIZE, status, out=self._sizes)
+        self._sizes += self._shade * (INFECTED_SIZE_GROWTH / INFECTION_SHADE_DAYS)
+        
+        self.artist.set_offsets(self._offsets)
+        self.artist.set_array(self._colors)
+        self.artist.set_sizes(self._sizes)
+    
+    def _update_heatmap(self, x, y, status):
+        #Indeks komórki (wiersz y, kolumna x) i statusu dla każdej osoby
+        bins = self.bins
+        np.multiply(x, bins / self.bounds[0], out=self._cells, casting='unsafe')
+        np.clip(self._cells, 0, bins - 1, out=self._cells)
+        np.multiply(y, bins / self.bounds[1], out=self._cell_y, casting='unsafe')
+        np.clip(self._cell_y, 0, bins - 1, out=self._cell_y)
+        self._cells += self._cell_y * bins
+        self._cells *= len(STATUS_RGB)
+        self._cells += status
+        counts = np.bincount(self._cells, minlength=bins * bins * len(STATUS_RGB)).reshape(bins, bins, -1)
+        
+        total = counts.sum(axis=2, keepdims=True)
+        brightness = np.sqrt(total / max(total.max(), 1))
+        np.divide(counts @ STATUS_RGB, np.maximum(total, 1), out=self._image)
+        self._image *= brightness
+        self.artist.set_data(self._image)
 
 def plot_simulation_results(stats_history, config):
     days = [stat["day"] for stat in stats_history]
@@ -48,34 +154,7 @@ def create_real_time_visualization(simulation):
     #Dodanie tytułu i informacji
     fig.suptitle('Symulacja Rozprzestrzeniania się Choroby', fontsize=20, color='white')
     
-    # --- DODANE: informacja o limicie populacji ---
-    population_limit = 2000
-    if simulation.config["population_size"] > population_limit:
-        ax_main.text(
-            50, 50,
-            f"Graficzna wizualizacja dostępna tylko dla populacji do {population_limit} osób.\n"
-            f"Aktualna populacja: {simulation.config['population_size']}",
-            color="red", fontsize=18, ha='center', va='center', bbox=dict(facecolor='black', alpha=0.7)
-        )
-        plt.draw()
-        plt.pause(5)
-        plt.close(fig)
-        return None
-    elif simulation.config["population_size"] > 0.8 * population_limit:
-        ax_main.text(
-            50, 5,
-            f"Uwaga: graficzna wizualizacja działa optymalnie do {population_limit} osób.",
-            color="orange", fontsize=12, ha='center', va='bottom', bbox=dict(facecolor='black', alpha=0.5)
-        )
-    # --- KONIEC DODANEGO ---
-    
-    #Kolory dla różnych stanów z gradientem dla zarażonych
-    base_colors = {
-        'susceptible': '#3498db',  #Niebieski
-        'infected': '#e74c3c',     #Czerwony
-        'recovered': '#2ecc71',    #Zielony
-        'deceased': '#7f8c8d'      #Szary
-    }
+    base_colors = BASE_COLORS
     
     #Ustawienia głównego obszaru symulacji
     ax_main.set_title('Rozmieszczenie Populacji', fontsize=16, color='white')
@@ -97,8 +176,11 @@ def create_real_time_visualization(simulation):
     day_text = ax_main.text(5, 95, '', fontsize=12, color='white')
     stats_text = ax_main.text(5, 90, '', fontsize=10, color='white')
     
-    #Inicjalizacja wykresu kropek
-    scatter = ax_main.scatter([], [], c=[], s=[], alpha=0.7, edgecolors='white')
+    #Widok populacji - kropki lub mapa gęstości dla dużych populacji
+    renderer = PopulationRenderer(
+        ax_main, len(simulation.population),
+        heatmap_threshold=simulation.config.get("heatmap_threshold", HEATMAP_THRESHOLD)
+    )
     
     #Ustawienia wykresu statystyk
     ax_stats.set_title('Przebieg epidemii', fontsize=16, color='white')
@@ -116,12 +198,9 @@ def create_real_time_visualization(simulation):
     deceased_line, = ax_stats.plot([], [], '-', color=base_colors['deceased'], linewidth=2, label='Zmarli')
     ax_stats.legend()
     
-    #Dane dla wykresów
-    days_data = []
-    susceptible_data = []
-    infected_data = []
-    recovered_data = []
-    deceased_data = []
+    #Dane dla wykresów - tablice na wszystkie dni przydzielone raz
+    history = np.zeros((simulation.config["simulation_days"] + 1, 5), dtype=np.int64)
+    history_length = 0
     
     #Ustawienia limitów osi
     ax_stats.set_xlim(0, simulation.config["simulation_days"])
@@ -137,6 +216,9 @@ def create_real_time_visualization(simulation):
     ax_vaccination = plt.axes([0.6, 0.05, 0.15, 0.07])
     slider_vaccination = Slider(ax_vaccination, 'Szczepienia', 0, 1, valinit=0, valstep=0.01)
     
+    #Symulacja liczona w osobnym wątku - okno odbiera migawki we własnym tempie
+    worker = SimulationWorker(simulation)
+    
     #Aktualne ustawienia symulacji
     simulation_settings = {
         'social_distancing': False,
@@ -144,77 +226,54 @@ def create_real_time_visualization(simulation):
         'vaccination_rate': 0
     }
     
+    #Zmiany ustawień trafiają do wątku symulacji i obowiązują od następnego dnia
     def update_social_distance(event):
         simulation_settings['social_distancing'] = not simulation_settings['social_distancing']
-        simulation.config["social_distancing"] = simulation_settings['social_distancing']
+        worker.set_control("social_distancing", simulation_settings['social_distancing'])
         btn_social_dist.label.set_text(f'Dystans społeczny: {"WŁ" if simulation_settings["social_distancing"] else "WYŁ"}')
         btn_social_dist.color = 'darkgreen' if simulation_settings["social_distancing"] else 'darkred'
         
     def update_quarantine(event):
         simulation_settings['quarantine'] = not simulation_settings['quarantine']
-        simulation.config["quarantine_infected"] = simulation_settings['quarantine']
+        worker.set_control("quarantine_infected", simulation_settings['quarantine'])
         btn_quarantine.label.set_text(f'Kwarantanna: {"WŁ" if simulation_settings["quarantine"] else "WYŁ"}')
         btn_quarantine.color = 'darkgreen' if simulation_settings["quarantine"] else 'darkred'
     
     def update_vaccination(val):
         simulation_settings['vaccination_rate'] = val
-        simulation.config["vaccination_rate"] = val
+        worker.set_control("vaccination_rate", val)
     
     btn_social_dist.on_clicked(update_social_distance)
     btn_quarantine.on_clicked(update_quarantine)
     slider_vaccination.on_changed(update_vaccination)
     
+    artists = (renderer.artist, susceptible_line, infected_line, recovered_line, deceased_line, day_text, stats_text)
+    
     def update(frame):
-        #Aktualizacja symulacji
-        if frame > 0:
-            simulation.simulate_day()
-            simulation.record_stats()
-        
-        #Aktualizacja wykresu kropek
-        x = [person.x for person in simulation.population]
-        y = [person.y for person in simulation.population]
+        #Wszystkie migawki opublikowane od poprzedniej klatki - statystyki z każdej, widok z ostatniej
+        snapshots = worker.drain()
+        if not snapshots:
+            if worker.finished():
+                ani.event_source.stop()
+            return artists
         
-        #Kolorowanie osób na podstawie statusu, z gradientem dla zarażonych
-        colors = []
-        sizes = []
+        nonlocal history_length
+        for snapshot in snapshots:
+            stats = snapshot["stats"]
+            if history_length < len(history):
+                history[history_length] = [stats["day"], stats["susceptible"], stats["infected"], stats["recovered"], stats["deceased"]]
+                history_length += 1
         
-        for person in simulation.population:
-            if person.status == "infected":
-                #Gradient od jasnoczerwonego do ciemnoczerwonego w zależności od czasu infekcji
-                infection_progress = min(person.days_infected / 14.0, 1.0)  #Normalizacja do max 14 dni
-                r = 0.9 - 0.5 * infection_progress  #Od jasnego do ciemnego czerwonego
-                g = 0.2 - 0.2 * infection_progress
-                b = 0.2 - 0.2 * infection_progress
-                colors.append((r, g, b))
-                #Rozmiar rośnie wraz z czasem infekcji
-                sizes.append(30 + 40 * infection_progress)
-            elif person.status == "susceptible":
-                colors.append(base_colors['susceptible'])
-                sizes.append(30)
-            elif person.status == "recovered":
-                colors.append(base_colors['recovered'])
-                sizes.append(30)
-            else:  #deceased
-                colors.append(base_colors['deceased'])
-                sizes.append(20)  #Mniejszy rozmiar dla zmarłych
-                
-        scatter.set_offsets(np.c_[x, y])
-        scatter.set_color(colors)
-        scatter.set_sizes(sizes)
+        #Aktualizacja widoku populacji bezpośrednio z tablic
+        latest = snapshots[-1]
+        renderer.update(latest["x"], latest["y"], latest["status"], latest["days_infected"])
         
         #Aktualizacja wykresu statystyk
-        stats = simulation.stats_history[-1]
-        
-        days_data.append(stats["day"])
-        susceptible_data.append(stats["susceptible"])
-        infected_data.append(stats["infected"])
-        recovered_data.append(stats["recovered"])
-        deceased_data.append(stats["deceased"])
-        
-        susceptible_line.set_data(days_data, susceptible_data)
-        infected_line.set_data(days_data, infected_data)
-        recovered_line.set_data(days_data, recovered_data)
-        deceased_line.set_data(days_data, deceased_data)
+        shown = history[:history_length]
+        susceptible_line.set_data(shown[:, 0], shown[:, 1])
+        infected_line.set_data(shown[:, 0], shown[:, 2])
+        recovered_line.set_data(shown[:, 0], shown[:, 3])
+        deceased_line.set_data(shown[:, 0], shown[:, 4])
         
         #Aktualizacja informacji tekstowych
         day_text.set_text(f'Dzień: {stats["day"]}')
@@ -226,15 +285,48 @@ def create_real_time_visualization(simulation):
         stats_info += f'Zmarli: {stats["deceased"]} ({stats["deceased"]/simulation.config["population_size"]:.1%})'
         stats_text.set_text(stats_info)
         
-        return scatter, susceptible_line, infected_line, recovered_line, deceased_line, day_text, stats_text
+        return artists
     
     ani = animation.FuncAnimation(
-        fig, update, frames=simulation.config["simulation_days"]+1,
-        interval=35, blit=True, repeat=False  
+        fig, update, frames=itertools.count(), init_func=lambda: artists,
+        interval=35, blit=True, repeat=False, cache_frame_data=False
     )
     
+    #Zamknięcie okna kończy wątek symulacji
+    fig.canvas.mpl_connect('close_event', lambda event: worker.stop())
+    worker.start()
+    
     plt.tight_layout()
     plt.subplots_adjust(top=0.9, bottom=0.15)
     plt.show()
     
     return ani
+
+def plot_ensemble_bands(result, config, quantiles=(0.05, 0.5, 0.95)):
+    """Wykres median i pasm kwantyli dla serii powtórzeń symulacji."""
+    bands = result.quantile_bands(quantiles)
+    days = result.start_day + np.arange(result.trajectories.shape[1])
+    labels = {
+        'susceptible': ('Podatni', 'blue'),
+        'infected': ('Zarażeni', 'red'),
+        'recovered': ('Ozdrowieńcy', 'green'),
+        'deceased': ('Zmarli', 'black')
+    }
+    
+    plt.figure(figsize=(12, 8))
+    for name, (label, color) in labels.items():
+        low, median, high = bands[name]
+        plt.fill_between(days, low, high, color=color, alpha=0.2)
+        plt.plot(days, median, label=label, color=color)
+    
+    plt.title(f'Symulacja rozprzestrzeniania się choroby - {result.trajectories.shape[0]} powtórzeń '
+              f'(mediana i pasmo {quantiles[0]:.0%}-{quantiles[-1]:.0%})')
+    plt.xlabel('Dzień')
+    plt.ylabel('Liczba osób')
+    plt.legend()
+    plt.grid(True)
+    
+    if config["save_to_file"]:
+        plt.savefig('simulation_ensemble.png')
+    else:
+        plt.show()